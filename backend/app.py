@@ -9,6 +9,21 @@ from pathlib import Path as _Path
 from dotenv import load_dotenv as _load_dotenv
 _load_dotenv(_Path(__file__).resolve().parent / '.env', override=True)
 
+# Logging: records are queued and written by a listener thread, so job and
+# request threads never block on stream writes
+import atexit as _atexit
+import logging as _logging
+import logging.handlers as _log_handlers
+import queue as _queue
+from config import LOG_LEVEL as _LOG_LEVEL
+_log_queue = _queue.SimpleQueue()
+_log_stream = _logging.StreamHandler()
+_log_stream.setFormatter(_logging.Formatter('%(levelname)s:%(name)s:%(message)s'))
+_log_listener = _log_handlers.QueueListener(_log_queue, _log_stream)
+_logging.basicConfig(level=_LOG_LEVEL, handlers=[_log_handlers.QueueHandler(_log_queue)])
+_log_listener.start()
+_atexit.register(_log_listener.stop)
+
 from flask import Flask, request, jsonify, send_from_directory, send_file, Response
 from flask_cors import CORS
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
@@ -4052,17 +4067,22 @@ def auto_initialize():
                 # PostgreSQL: Add columns if not exist
                 conn.execute(text("ALTER TABLE keywords ADD COLUMN IF NOT EXISTS translations_json TEXT"))
                 conn.execute(text("ALTER TABLE keywords ADD COLUMN IF NOT EXISTS translations_updated_at TIMESTAMP"))
-                conn.execute(text("ALTER TABLE articles ALTER COLUMN url TYPE VARCHAR(2000)"))
-                conn.execute(text("ALTER TABLE articles ALTER COLUMN image_url TYPE VARCHAR(2000)"))
+                # TEXT (no length cap, no rewrite from VARCHAR); no btree indexes the
+                # full url once migrate_article_url_hash.py has run
+                conn.execute(text("ALTER TABLE articles ALTER COLUMN url TYPE TEXT, ALTER COLUMN image_url TYPE TEXT"))
+                # Backfilled, made NOT NULL and unique per user by migrate_article_url_hash.py
+                conn.execute(text("ALTER TABLE articles ADD COLUMN IF NOT EXISTS url_hash BIGINT"))
                 conn.execute(text("ALTER TABLE sources ALTER COLUMN url TYPE VARCHAR(2000)"))
                 # Widen daily_briefs.date_key for keyword-specific cache keys (YYYY-MM-DD:keyword)
                 conn.execute(text("ALTER TABLE daily_briefs ALTER COLUMN date_key TYPE VARCHAR(100)"))
                 # Exports file_data for Render compatibility
                 conn.execute(text("ALTER TABLE exports ADD COLUMN IF NOT EXISTS file_data BYTEA"))
-                # Migrate articles unique constraint: url-only → (url, user_id)
+                # Migrate articles unique constraint: url-only → per-user. Databases
+                # still on uq_article_url_user move to url_hash via migrate_article_url_hash.py
                 result = conn.execute(text("""
-                    SELECT 1 FROM pg_constraint 
-                    WHERE conname = 'uq_article_url_user' AND conrelid = 'articles'::regclass
+                    SELECT 1 FROM pg_indexes
+                    WHERE tablename = 'articles'
+                      AND indexname IN ('uq_article_url_user', 'uq_articles_url_hash_user')
                 """))
                 if not result.fetchone():
                     # Drop old unique on url alone (may have different names)
@@ -4077,8 +4097,8 @@ def auto_initialize():
                         END $$;
                     """))
                     conn.execute(text("DROP INDEX IF EXISTS ix_articles_url"))
-                    conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS uq_article_url_user ON articles(url, user_id)"))
-                    print("[INIT] ✅ PostgreSQL articles unique constraint migrated to (url, user_id)")
+                    conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS uq_articles_url_hash_user ON articles(url_hash, user_id)"))
+                    print("[INIT] ✅ PostgreSQL articles unique constraint migrated to (url_hash, user_id)")
                 conn.commit()
                 print("[INIT] ✅ PostgreSQL columns migrated")
             else:
@@ -4099,23 +4119,45 @@ def auto_initialize():
                     conn.commit()
                     print("[INIT] ✅ SQLite exports file_data column migrated")
                 
-                # Migrate articles unique constraint: url-only → (url, user_id)
-                # SQLite can't ALTER constraints, so we must recreate the table
+                # articles.url_hash: add, backfill and make unique per user
+                result = conn.execute(text("PRAGMA table_info(articles)"))
+                article_columns = [row[1] for row in result]
+                if article_columns and 'url_hash' not in article_columns:
+                    conn.execute(text("ALTER TABLE articles ADD COLUMN url_hash BIGINT"))
+                    conn.commit()
+                    print("[INIT] ✅ SQLite articles url_hash column migrated")
+                if article_columns:
+                    from models import url_hash as _url_hash
+                    unhashed = conn.execute(text("SELECT id, url FROM articles WHERE url_hash IS NULL")).all()
+                    if unhashed:
+                        conn.execute(
+                            text("UPDATE articles SET url_hash = :url_hash WHERE id = :id"),
+                            [{'id': row.id, 'url_hash': _url_hash(row.url)} for row in unhashed]
+                        )
+                        print(f"[INIT] ✅ SQLite articles url_hash backfilled ({len(unhashed)} rows)")
+                    conn.execute(text("DROP INDEX IF EXISTS ix_articles_url_hash_user"))
+                    conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS uq_articles_url_hash_user ON articles(url_hash, user_id)"))
+                    conn.commit()
+                
+                # Migrate articles uniqueness from url / (url, user_id) to the
+                # (url_hash, user_id) index above. A UNIQUE table constraint can't
+                # be dropped in SQLite, so that case recreates the table
                 result = conn.execute(text("PRAGMA index_list(articles)"))
-                indexes = [(row[1], row[2]) for row in result]
-                has_new_composite = False
+                indexes = [(row[1], row[2], row[3]) for row in result]
                 needs_migration = False
-                for idx_name, idx_unique in indexes:
+                for idx_name, idx_unique, idx_origin in indexes:
                     if idx_unique:
                         idx_info = conn.execute(text(f"PRAGMA index_info('{idx_name}')"))
                         idx_cols = [r[2] for r in idx_info]
-                        if idx_cols == ['url']:
-                            needs_migration = True
-                        if set(idx_cols) == {'url', 'user_id'}:
-                            has_new_composite = True
+                        if idx_cols in (['url'], ['url', 'user_id']):
+                            if idx_origin == 'c':
+                                conn.execute(text(f"DROP INDEX IF EXISTS {idx_name}"))
+                                conn.commit()
+                            else:
+                                needs_migration = True
                 
-                if needs_migration and not has_new_composite:
-                    print("[INIT] Migrating articles table: url unique → (url, user_id) composite...")
+                if needs_migration:
+                    print("[INIT] Migrating articles table: url unique → (url_hash, user_id)...")
                     # Get actual columns from existing table
                     col_result = conn.execute(text("PRAGMA table_info(articles)"))
                     old_cols = [row[1] for row in col_result]
@@ -4132,7 +4174,7 @@ def auto_initialize():
                         elif c == 'source_name':
                             col_defs.append('source_name VARCHAR(200) NOT NULL')
                         elif c == 'url':
-                            col_defs.append('url VARCHAR(2000) NOT NULL')
+                            col_defs.append('url TEXT NOT NULL')
                         elif c == 'title_original':
                             col_defs.append('title_original TEXT NOT NULL')
                         elif c == 'user_id':
@@ -4147,20 +4189,19 @@ def auto_initialize():
                             col_defs.append(f'{c} VARCHAR(20)')
                         elif c == 'source_id':
                             col_defs.append(f'{c} INTEGER')
+                        elif c == 'url_hash':
+                            col_defs.append(f'{c} BIGINT NOT NULL')
                         else:
                             col_defs.append(f'{c} TEXT')
-                    col_defs.append('UNIQUE(url, user_id)')
                     create_sql = f"CREATE TABLE articles ({', '.join(col_defs)})"
                     conn.execute(text(create_sql))
                     conn.execute(text("CREATE INDEX IF NOT EXISTS ix_articles_user_id ON articles(user_id)"))
                     conn.execute(text(f"INSERT INTO articles ({col_list}) SELECT {col_list} FROM _articles_old_migration"))
                     conn.execute(text("DROP TABLE _articles_old_migration"))
+                    # After the drop: the old table's index still holds this name until then
+                    conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS uq_articles_url_hash_user ON articles(url_hash, user_id)"))
                     conn.commit()
-                    print("[INIT] ✅ SQLite articles unique constraint migrated to (url, user_id)")
-                elif not has_new_composite:
-                    conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS uq_article_url_user ON articles(url, user_id)"))
-                    conn.commit()
-                    print("[INIT] ✅ SQLite articles composite index created")
+                    print("[INIT] ✅ SQLite articles unique constraint migrated to (url_hash, user_id)")
     except Exception as e:
         print(f"[INIT] ⚠️ Column migration note: {str(e)[:100]}")
 
@@ -4170,14 +4211,24 @@ def auto_initialize():
         with engine.connect() as conn:
             _perf_indexes = [
                 ("ix_articles_country",         "articles", "country"),
-                ("ix_articles_url",             "articles", "url"),
                 ("ix_articles_source_name",     "articles", "source_name"),
                 ("ix_articles_keyword_original", "articles", "keyword_original"),
                 ("ix_articles_sentiment_label", "articles", "sentiment_label"),
                 ("ix_articles_created_at",      "articles", "created_at"),
                 ("ix_articles_country_url",     "articles", "country, url"),
                 ("ix_articles_country_created",  "articles", "country, created_at DESC"),
+                ("ix_articles_user_created",    "articles", "user_id, created_at"),
+                ("ix_articles_user_kw_created", "articles", "user_id, keyword_original, created_at"),
+                ("ix_monitor_jobs_user_status", "monitor_jobs", "user_id, status"),
+                ("ix_monitor_jobs_user_created", "monitor_jobs", "user_id, created_at"),
+                ("ix_keywords_text_ar",         "keywords", "text_ar"),
+                ("ix_sources_country_name",     "sources", "country_name"),
             ]
+            if engine.dialect.name != 'postgresql':
+                # Duplicate lookups go through uq_articles_url_hash_user; PostgreSQL
+                # drops these CONCURRENTLY in migrate_increase_url_columns.py
+                conn.execute(_idx_text("DROP INDEX IF EXISTS ix_articles_url"))
+                conn.execute(_idx_text("DROP INDEX IF EXISTS ix_articles_url_hash"))
             created = 0
             for idx_name, table, cols in _perf_indexes:
                 try:
@@ -3,6 +3,25 @@ Arabic text normalization utilities
 Normalizes Arabic text for better matching across different spellings
 """
 import re
+from functools import lru_cache
+
+# One str.translate pass instead of six re.sub passes
+_ARABIC_NORMALIZATION_TABLE = str.maketrans({
+    # Various forms of alef -> simple alef
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا',
+    # Alef maksura -> yaa
+    'ى': 'ي',
+    # Taa marbuta -> haa
+    'ة': 'ه',
+    # Diacritics (harakat, incl. tanween) \u064B-\u065F and tatweel \u0640 removed
+    **{chr(c): None for c in range(0x064B, 0x0660)},
+    '\u0640': None,
+})
+
+# Keywords and variants are short and repeat every run; article-sized
+# texts are normalized directly so they don't crowd the cache
+_CACHED_MAX_LEN = 200
+
 
 def normalize_arabic(text):
     """
@@ -14,6 +33,8 @@ def normalize_arabic(text):
     5. Removing tanween (double diacritics)
     6. Removing tatweel/kashida
     
+    Short texts (keywords) are memoized - the function is pure.
+    
     Args:
         text: Arabic text to normalize
         
@@ -22,26 +43,14 @@ def normalize_arabic(text):
     """
     if not text:
         return text
-    
-    # Convert various forms of alef to simple alef
-    text = re.sub('[أإآ]', 'ا', text)
-    
-    # Convert alef maksura to yaa
-    text = re.sub('ى', 'ي', text)
-    
-    # Convert taa marbuta to haa
-    text = re.sub('ة', 'ه', text)
-    
-    # Remove Arabic diacritics (harakat) - \u064B-\u065F
-    text = re.sub('[\u064B-\u065F]', '', text)
-    
-    # Remove tatweel (kashida) - \u0640
-    text = re.sub('\u0640', '', text)
-    
-    # Remove tanween (double diacritics for nunation)
-    text = re.sub('[\u064B-\u064D]', '', text)
-    
-    return text.strip()
+    if len(text) <= _CACHED_MAX_LEN:
+        return _normalize_arabic_cached(text)
+    return text.translate(_ARABIC_NORMALIZATION_TABLE).strip()
+
+
+@lru_cache(maxsize=8192)
+def _normalize_arabic_cached(text):
+    return text.translate(_ARABIC_NORMALIZATION_TABLE).strip()
 
 
 def is_persian_text(text):
@@ -10,12 +10,22 @@ import sys
 import os
 import gc
 import asyncio
-from typing import List, Dict, Tuple, Optional
-from async_rss_fetcher import AsyncRSSFetcher
-from multilingual_matcher import match_article_against_keywords, detect_article_language
+import atexit
+import concurrent.futures
+import threading
+from typing import List, Dict, Tuple, Optional, Callable
+from async_rss_fetcher import AsyncRSSFetcher, get_shared_session, close_shared_session
+from multilingual_matcher import (
+    match_article_against_keywords,
+    detect_article_language,
+    compile_keyword_expansions,
+)
 from translation_cache import translate_article_to_arabic
-from match_context_extractor import extract_all_match_contexts, translate_snippet_preserve_keyword
-from models import Article
+from match_context_extractor import (
+    extract_all_match_contexts,
+    translate_snippets_batch,
+)
+from models import Article, url_hash
 from datetime import datetime
 import json
 from dateutil import parser as date_parser
@@ -51,10 +61,42 @@ def parse_published_date(date_value) -> Optional[datetime]:
     return None
 
 
+_io_loop: Optional[asyncio.AbstractEventLoop] = None
+_io_loop_lock = threading.Lock()
+
+
+def _get_io_loop() -> asyncio.AbstractEventLoop:
+    """
+    Get the persistent event loop that runs all RSS fetching.
+    
+    The loop lives on its own daemon thread for the life of the process,
+    so every monitoring batch and job shares one aiohttp session (open
+    connections, DNS cache) instead of building and tearing down a loop
+    per batch.
+    """
+    global _io_loop
+    with _io_loop_lock:
+        if _io_loop is None or _io_loop.is_closed():
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, daemon=True, name="monitor-io-loop").start()
+            atexit.register(_shutdown_io_loop, loop)
+            _io_loop = loop
+        return _io_loop
+
+
+def _shutdown_io_loop(loop: asyncio.AbstractEventLoop):
+    """Close the shared session and stop the I/O loop at interpreter exit"""
+    try:
+        asyncio.run_coroutine_threadsafe(close_shared_session(), loop).result(timeout=5)
+    except Exception:
+        pass
+    loop.call_soon_threadsafe(loop.stop)
+
+
 def fetch_feeds_sync(sources: List[Dict], max_concurrent=50) -> Tuple[List[Dict], List[Dict]]:
     """
     Synchronous wrapper for async RSS fetching
-    Suitable for use in Flask routes
+    Suitable for use in Flask routes and job threads
     
     Args:
         sources: List of source dicts with 'url', 'name', 'country_name'
@@ -62,26 +104,25 @@ def fetch_feeds_sync(sources: List[Dict], max_concurrent=50) -> Tuple[List[Dict]
         
     Returns:
         Tuple of (results, articles)
+    
+    Raises:
+        concurrent.futures.TimeoutError: the fetch outlived a monitoring
+        job (JobExecutor.JOB_TIMEOUT_SECONDS); it is cancelled on the loop
     """
+    from job_executor import JobExecutor
+    
     async def _fetch():
         fetcher = AsyncRSSFetcher(max_concurrent=max_concurrent)
-        return await fetcher.fetch_all_feeds(sources)
+        return await fetcher.fetch_all_feeds(sources, session=await get_shared_session())
     
-    # Run async function in event loop
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
+    # Run on the shared I/O loop and block this thread until done; other
+    # callers share the loop, so don't hold a job thread past its timeout
+    future = asyncio.run_coroutine_threadsafe(_fetch(), _get_io_loop())
     try:
-        results, articles = loop.run_until_complete(_fetch())
-        return results, articles
-    finally:
-        # Cancel all pending tasks to avoid 'Task was destroyed' warnings
-        pending = asyncio.all_tasks(loop)
-        for task in pending:
-            task.cancel()
-        if pending:
-            loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
-        loop.run_until_complete(loop.shutdown_asyncgens())
-        loop.close()
+        return future.result(timeout=JobExecutor.JOB_TIMEOUT_SECONDS)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise
 
 
 def match_articles_with_keywords(
@@ -116,6 +157,9 @@ def match_articles_with_keywords(
             }
         articles_by_source[source_name]['articles'].append(article)
     
+    # Variants/patterns depend only on the keywords - build them once
+    compiled_keywords = compile_keyword_expansions(keyword_expansions)
+    
     # Process each source's articles
     for source_name, data in articles_by_source.items():
         source = data['source']
@@ -142,7 +186,8 @@ def match_articles_with_keywords(
             matched = match_article_against_keywords(
                 article,
                 keyword_expansions,
-                source_name=source_name
+                source_name=source_name,
+                compiled_keywords=compiled_keywords
             )
             
             if matched:
@@ -187,6 +232,9 @@ def match_articles_with_keywords_with_stats(
             }
         articles_by_source[source_name]['articles'].append(article)
     
+    # Variants/patterns depend only on the keywords - build them once
+    compiled_keywords = compile_keyword_expansions(keyword_expansions)
+    
     # Process each source's articles
     for source_name, data in articles_by_source.items():
         source = data['source']
@@ -213,7 +261,8 @@ def match_articles_with_keywords_with_stats(
             matched = match_article_against_keywords(
                 article,
                 keyword_expansions,
-                source_name=source_name
+                source_name=source_name,
+                compiled_keywords=compiled_keywords
             )
             
             if matched:
@@ -228,30 +277,14 @@ def match_articles_with_keywords_with_stats(
     return matches, keyword_stats
 
 
-def save_matched_articles_sync(
-    db,
-    matches: List[Tuple],
-    apply_limit: bool = True,
-    save_all: bool = False,
-    user_id: Optional[int] = None,
-) -> Tuple[List[int], Dict]:
+def _apply_save_limit(matches: List[Tuple], apply_limit: bool, save_all: bool):
     """
-    Save matched articles to database with translations.
+    Apply MAX_ARTICLES_PER_RUN (with balancing) to a list of matches.
     
-    Applies balancing strategy if configured and limit is active.
-    
-    Args:
-        db: Database session
-        matches: List of (article, source, matched_keywords) tuples
-        apply_limit: Whether to apply MAX_ARTICLES_PER_RUN limit
-        save_all: Override to save all matches regardless of limit
-        
     Returns:
-        Tuple of (saved_ids, stats_dict)
+        Tuple of (matches, limit, balance_stats)
     """
     original_count = len(matches)
-    saved_ids = []
-    duplicates = 0
     
     # Determine if we should limit and balance
     limit = config.get_effective_save_limit() if (apply_limit and not save_all) else None
@@ -275,31 +308,137 @@ def save_matched_articles_sync(
         balance_stats = None
     
     print()
+    return matches, limit, balance_stats
+
+
+def _prepare_article_row(article: Dict, source: Dict, matched_keywords: List[Dict], user_id: Optional[int]) -> Dict:
+    """
+    Translate one matched article and build its Article column values.
     
-    for article, source, matched_keywords in matches:
-        print(f"   📝 Processing: {article['title'][:60]}...")
-        
-        # Detect language
-        detected_lang = detect_article_language(article['title'], article['summary'])
-        print(f"      🌍 Language: {detected_lang}")
+    Args:
+        article: Fetched article dict
+        source: Source dict
+        matched_keywords: Matches from the matcher
+        user_id: Owner of the saved row
         
-        # Translate to Arabic FIRST (before duplicate check)
-        translation_result = translate_article_to_arabic(
-            article['title'],
-            article['summary'],
-            detected_lang
+    Returns:
+        Dict of Article column values
+    """
+    # Detect language
+    detected_lang = detect_article_language(article['title'], article['summary'])
+    print(f"      🌍 Language: {detected_lang}")
+    
+    # Translate to Arabic
+    translation_result = translate_article_to_arabic(
+        article['title'],
+        article['summary'],
+        detected_lang
+    )
+    
+    title_ar = translation_result['title_ar']
+    summary_ar = translation_result['summary_ar']
+    translation_status = translation_result['overall_status']
+    
+    print(f"      🔄 Translation: {translation_status}")
+    
+    # Get primary keyword
+    primary_keyword = matched_keywords[0]['keyword_ar']
+    
+    # Extract match context (for display in UI)
+    # Using 20 words before and after (~2 lines of context)
+    match_contexts = extract_all_match_contexts(article, matched_keywords, words_before=20, words_after=20)
+    
+    # Translate match contexts to Arabic while replacing keyword with Arabic version.
+    # All snippets of the article are translated together (see translate_snippets_batch).
+    to_translate = []
+    for context in match_contexts:
+        snippet = context.get('full_snippet', '')
+        context['full_snippet_ar'] = snippet  # Already Arabic, empty, or translation failed
+        if snippet and detected_lang != 'ar':
+            to_translate.append(context)
+    
+    if to_translate:
+        translated_snippets = translate_snippets_batch(
+            [context['full_snippet'] for context in to_translate],
+            # The actual matched keyword (original language)
+            [context.get('preserve_text', '') for context in to_translate],
+            detected_lang,
+            'ar',
+            # Arabic keyword replaces the matched (e.g. English) one
+            keywords_ar=[context.get('keyword_ar', '') for context in to_translate]
         )
+        for context, translated_snippet in zip(to_translate, translated_snippets):
+            preserve_text = context.get('preserve_text', '')
+            context['full_snippet_ar'] = translated_snippet
+            context['original_matched_text'] = preserve_text
+            print(f"      🔄 Translated context: **{preserve_text}** → **{context.get('keyword_ar', '')}**")
+    
+    # Prepare keywords info with match context
+    keywords_info = json.dumps({
+        'primary': primary_keyword,
+        'all_matched': [m['keyword_ar'] for m in matched_keywords],
+        'match_details': matched_keywords,
+        'match_contexts': match_contexts  # Added: context snippets (original + Arabic) for UI display
+    }, ensure_ascii=False)
+    
+    return dict(
+        country=source['country_name'],
+        source_name=source['name'],
+        url=article['url'],
+        url_hash=url_hash(article['url']),
+        title_original=article['title'],
+        summary_original=article['summary'],
+        original_language=detected_lang,
+        image_url=article.get('image_url'),
+        title_ar=title_ar,
+        summary_ar=summary_ar,
+        arabic_text=f"{title_ar} {summary_ar}",
+        keyword=primary_keyword,  # Arabic keyword for filtering
+        keyword_original=primary_keyword,
+        keywords_translations=keywords_info,
+        sentiment_label="محايد",
+        sentiment_score=None,
+        # Parse published date (convert from ISO string to datetime object)
+        published_at=parse_published_date(article.get('published_at')),
+        fetched_at=datetime.utcnow(),
+        user_id=user_id,
+    )
+
+
+def save_matched_articles_sync(
+    db,
+    matches: List[Tuple],
+    apply_limit: bool = True,
+    save_all: bool = False,
+    user_id: Optional[int] = None,
+) -> Tuple[List[int], Dict]:
+    """
+    Save matched articles to database with translations.
+    
+    Applies balancing strategy if configured and limit is active.
+    
+    Args:
+        db: Database session
+        matches: List of (article, source, matched_keywords) tuples
+        apply_limit: Whether to apply MAX_ARTICLES_PER_RUN limit
+        save_all: Override to save all matches regardless of limit
         
-        title_ar = translation_result['title_ar']
-        summary_ar = translation_result['summary_ar']
-        translation_status = translation_result['overall_status']
-        
-        print(f"      🔄 Translation: {translation_status}")
+    Returns:
+        Tuple of (saved_ids, stats_dict)
+    """
+    original_count = len(matches)
+    saved_ids = []
+    duplicates = 0
+    
+    matches, limit, balance_stats = _apply_save_limit(matches, apply_limit, save_all)
+    
+    for article, source, matched_keywords in matches:
+        print(f"   📝 Processing: {article['title'][:60]}...")
         
         # STRICT duplicate check: URL + user_id (composite unique constraint)
         # Rule: If URL exists for this user → skip (true duplicate)
         #       If URL is new for this user → save
-        dup_filter = [Article.url == article['url']]
+        dup_filter = [Article.url_hash == url_hash(article['url']), Article.url == article['url']]
         if user_id is not None:
             dup_filter.append(Article.user_id == user_id)
         url_duplicate = db.query(Article).filter(*dup_filter).first()
@@ -312,74 +451,7 @@ def save_matched_articles_sync(
             continue
         
         # If we reach here: URL is unique → SAVE IT (even if title similar to other articles)
-        
-        # Get primary keyword
-        primary_keyword = matched_keywords[0]['keyword_ar']
-        
-        # Extract match context (for display in UI)
-        # Using 20 words before and after (~2 lines of context)
-        match_contexts = extract_all_match_contexts(article, matched_keywords, words_before=20, words_after=20)
-        
-        # Translate match contexts to Arabic while replacing keyword with Arabic version
-        for context in match_contexts:
-            snippet = context.get('full_snippet', '')
-            preserve_text = context.get('preserve_text', '')  # The actual matched keyword (original language)
-            keyword_arabic = context.get('keyword_ar', '')  # The Arabic version of the keyword
-            
-            if snippet and detected_lang != 'ar':
-                try:
-                    # Use special translation that replaces **keyword** with **Arabic keyword**
-                    translated_snippet = translate_snippet_preserve_keyword(
-                        snippet, 
-                        preserve_text, 
-                        detected_lang, 
-                        'ar',
-                        keyword_ar=keyword_arabic  # Pass Arabic keyword to replace English one
-                    )
-                    
-                    context['full_snippet_ar'] = translated_snippet
-                    context['original_matched_text'] = preserve_text
-                    
-                    print(f"      🔄 Translated context: **{preserve_text}** → **{keyword_arabic}**")
-                    
-                except Exception as e:
-                    print(f"      ⚠️  Failed to translate context snippet: {e}")
-                    context['full_snippet_ar'] = snippet  # Use original if translation fails
-            else:
-                context['full_snippet_ar'] = snippet  # Already Arabic or empty
-        
-        # Prepare keywords info with match context
-        keywords_info = json.dumps({
-            'primary': primary_keyword,
-            'all_matched': [m['keyword_ar'] for m in matched_keywords],
-            'match_details': matched_keywords,
-            'match_contexts': match_contexts  # Added: context snippets (original + Arabic) for UI display
-        }, ensure_ascii=False)
-        
-        # Parse published date (convert from ISO string to datetime object)
-        published_datetime = parse_published_date(article.get('published_at'))
-        
-        # Save to database
-        new_article = Article(
-            country=source['country_name'],
-            source_name=source['name'],
-            url=article['url'],
-            title_original=article['title'],
-            summary_original=article['summary'],
-            original_language=detected_lang,
-            image_url=article.get('image_url'),
-            title_ar=title_ar,
-            summary_ar=summary_ar,
-            arabic_text=f"{title_ar} {summary_ar}",
-            keyword=primary_keyword,  # Arabic keyword for filtering
-            keyword_original=primary_keyword,
-            keywords_translations=keywords_info,
-            sentiment_label="محايد",
-            sentiment_score=None,
-            published_at=published_datetime,  # ← Now it's a datetime object!
-            fetched_at=datetime.utcnow(),
-            user_id=user_id,
-        )
+        new_article = Article(**_prepare_article_row(article, source, matched_keywords, user_id))
         
         db.add(new_article)
         db.commit()
@@ -407,11 +479,108 @@ def save_matched_articles_sync(
     return saved_ids, stats
 
 
+def save_matched_articles_batched(
+    db,
+    matches: List[Tuple],
+    batch_size: int = 500,
+    apply_limit: bool = True,
+    save_all: bool = False,
+    user_id: Optional[int] = None,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+) -> Tuple[List[int], Dict]:
+    """
+    Batched version of save_matched_articles_sync.
+    
+    Per chunk of batch_size matches: one query finds the URLs already
+    saved, the rest are translated and written with one ORM bulk INSERT
+    (executemany + RETURNING id, so callers still get the new ids).
+    Everything is committed once at the end.
+    
+    Args:
+        db: Database session
+        matches: List of (article, source, matched_keywords) tuples
+        batch_size: Matches per chunk
+        apply_limit: Whether to apply MAX_ARTICLES_PER_RUN limit
+        save_all: Override to save all matches regardless of limit
+        user_id: Owner of the saved rows
+        on_progress: Optional callback(done, total) after each chunk
+        
+    Returns:
+        Tuple of (saved_ids, stats_dict) - same shape as save_matched_articles_sync
+    """
+    from sqlalchemy import select, insert
+    
+    insert_returning_ids = insert(Article).returning(Article.id, sort_by_parameter_order=True)
+    original_count = len(matches)
+    saved_ids = []
+    duplicates = 0
+    seen_urls = set()
+    
+    matches, limit, balance_stats = _apply_save_limit(matches, apply_limit, save_all)
+    
+    for chunk_start in range(0, len(matches), batch_size):
+        chunk = matches[chunk_start:chunk_start + batch_size]
+        
+        # STRICT duplicate check: URL + user_id, one query per chunk
+        # Probed by 8-byte url_hash; returned URLs are compared exactly
+        urls = {article['url'] for article, _, _ in chunk}
+        dup_query = select(Article.url).where(Article.url_hash.in_({url_hash(url) for url in urls}))
+        if user_id is not None:
+            dup_query = dup_query.where(Article.user_id == user_id)
+        seen_urls.update(url for url in db.execute(dup_query).scalars() if url in urls)
+        
+        rows = []
+        for article, source, matched_keywords in chunk:
+            if article['url'] in seen_urls:
+                duplicates += 1
+                continue
+            seen_urls.add(article['url'])
+            print(f"   📝 Processing: {article['title'][:60]}...")
+            rows.append(_prepare_article_row(article, source, matched_keywords, user_id))
+        
+        if rows:
+            try:
+                with db.begin_nested():
+                    saved_ids.extend(db.scalars(insert_returning_ids, rows).all())
+            except Exception as e:
+                # A concurrent writer got some URL first: fall back to row by row
+                print(f"   ⚠️  Bulk insert failed ({str(e)[:80]}), retrying row by row")
+                for row in rows:
+                    try:
+                        with db.begin_nested():
+                            saved_ids.extend(db.scalars(insert_returning_ids, [row]).all())
+                    except Exception:
+                        duplicates += 1
+        
+        if on_progress:
+            on_progress(min(chunk_start + batch_size, len(matches)), len(matches))
+    
+    db.commit()
+    
+    print(f"\n{'='*80}")
+    print(f"Summary: Saved {len(saved_ids)} new articles")
+    if duplicates > 0:
+        print(f"         Skipped {duplicates} duplicates (URL already in database)")
+    print(f"{'='*80}\n")
+    
+    stats = {
+        'total_matched': original_count,
+        'total_saved': len(saved_ids),
+        'duplicates_skipped': duplicates,
+        'limit_applied': limit is not None,
+        'save_limit': limit,
+        'balancing_stats': balance_stats
+    }
+    
+    return saved_ids, stats
+
+
 def run_optimized_monitoring(
     sources: List[Dict],
     keyword_expansions: List[Dict],
     max_concurrent: int = 50,
-    max_per_source: int = 30
+    max_per_source: int = 30,
+    on_matches: Optional[Callable[[List], None]] = None
 ) -> Dict:
     """
     Run complete monitoring pipeline with async fetching, health tracking, and full stats.
@@ -423,6 +592,9 @@ def run_optimized_monitoring(
         keyword_expansions: List of keyword expansions
         max_concurrent: Max concurrent RSS fetches
         max_per_source: Max articles per source
+        on_matches: Optional callback receiving each batch's matches as soon as
+            they're found. When given, matches are streamed to it instead of
+            being collected, and the result's 'matches' list is empty.
         
     Returns:
         Comprehensive stats dict including:
@@ -460,6 +632,7 @@ def run_optimized_monitoring(
     # Initialize aggregated results
     all_results = []
     all_matches = []
+    total_matches = 0
     total_fetched = 0
     keyword_stats = {exp.get('original_ar', exp.get('keyword_ar', 'Unknown')): 0 
                      for exp in keyword_expansions}
@@ -506,7 +679,13 @@ def run_optimized_monitoring(
                 articles, keyword_expansions, max_per_source
             )
             
-            all_matches.extend(batch_matches)
+            total_matches += len(batch_matches)
+            if on_matches is not None:
+                # Stream: caller saves this batch now, we don't hold it
+                if batch_matches:
+                    on_matches(batch_matches)
+            else:
+                all_matches.extend(batch_matches)
             
             # Aggregate keyword stats
             for kw, count in batch_stats.items():
@@ -521,18 +700,19 @@ def run_optimized_monitoring(
         gc.collect()
         print(f"🧹 Memory cleaned after batch {batch_num + 1}")
     
-    # Print health report at end
+    # Persist pending health data and print report at end
     if health_tracker:
         try:
+            health_tracker.flush()
             health_tracker.print_health_report()
         except:
             pass
     
     print(f"\n{'='*80}")
-    print(f"✅ TOTAL: Fetched {total_fetched} articles, Found {len(all_matches)} matches")
+    print(f"✅ TOTAL: Fetched {total_fetched} articles, Found {total_matches} matches")
     print(f"{'='*80}")
     
-    if not all_matches:
+    if not total_matches:
         print("⚠️  No matching articles found!")
         return {
             'success': False,
@@ -550,25 +730,25 @@ def run_optimized_monitoring(
         print(f"   • {keyword_ar}: {count} matches")
         total_matches_check += count
     
-    print(f"\n📈 Total unique articles matched: {len(all_matches)}")
+    print(f"\n📈 Total unique articles matched: {total_matches}")
     print(f"📈 Total keyword matches (can be > articles): {total_matches_check}")
     
     # Acceptance rate check
-    acceptance_rate = (len(all_matches) / total_fetched * 100) if total_fetched else 0
-    print(f"📈 Acceptance rate: {acceptance_rate:.1f}% ({len(all_matches)}/{total_fetched})")
+    acceptance_rate = (total_matches / total_fetched * 100) if total_fetched else 0
+    print(f"📈 Acceptance rate: {acceptance_rate:.1f}% ({total_matches}/{total_fetched})")
     
     # Warning if suspiciously low
     if acceptance_rate < 1.0 and total_fetched > 100:
         print(f"\n⚠️  WARNING: Suspiciously low acceptance rate ({acceptance_rate:.2f}%)")
         print(f"   Total articles: {total_fetched}")
-        print(f"   Matched: {len(all_matches)}")
+        print(f"   Matched: {total_matches}")
         print(f"   Expected: At least 2-5% for typical keywords")
         print(f"   This might indicate a keyword matching issue!")
     
     return {
         'success': True,
         'total_fetched': total_fetched,
-        'total_matches': len(all_matches),
+        'total_matches': total_matches,
         'matches': all_matches,
         'fetch_results': all_results,
         'keyword_stats': keyword_stats,
@@ -304,12 +304,18 @@ class AsyncRSSFetcher:
                             []
                         )
     
-    async def fetch_all_feeds(self, sources: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+    async def fetch_all_feeds(
+        self,
+        sources: List[Dict],
+        session: Optional[aiohttp.ClientSession] = None
+    ) -> Tuple[List[Dict], List[Dict]]:
         """
         Fetch all RSS feeds concurrently
         
         Args:
             sources: List of source dicts with 'url', 'name', 'country_name'
+            session: Optional long-lived session to reuse (see get_shared_session);
+                a private one is created and closed when omitted
             
         Returns:
             Tuple of (results, all_articles)
@@ -332,14 +338,7 @@ class AsyncRSSFetcher:
         # Do NOT drop articles in the fetch/match phase
         seen_hashes = set()  # Kept for interface compatibility but not used
         
-        # Create aiohttp session with connection pooling
-        connector = aiohttp.TCPConnector(
-            limit=self.max_concurrent,
-            limit_per_host=5,  # Max 5 connections per domain
-            ttl_dns_cache=300  # DNS cache for 5 minutes
-        )
-        
-        async with aiohttp.ClientSession(connector=connector) as session:
+        async def _gather(session):
             # Create tasks for all sources
             tasks = [
                 self._fetch_single_feed(session, source, seen_hashes, semaphore)
@@ -347,7 +346,20 @@ class AsyncRSSFetcher:
             ]
             
             # Execute all tasks concurrently
-            results_list = await asyncio.gather(*tasks, return_exceptions=True)
+            return await asyncio.gather(*tasks, return_exceptions=True)
+        
+        if session is not None:
+            results_list = await _gather(session)
+        else:
+            # Create aiohttp session with connection pooling
+            connector = aiohttp.TCPConnector(
+                limit=self.max_concurrent,
+                limit_per_host=5,  # Max 5 connections per domain
+                ttl_dns_cache=300  # DNS cache for 5 minutes
+            )
+            
+            async with aiohttp.ClientSession(connector=connector) as session:
+                results_list = await _gather(session)
         
         # Process results
         results = []
@@ -383,6 +395,38 @@ class AsyncRSSFetcher:
         return results, all_articles
 
 
+# Long-lived session shared by every fetch on the monitor I/O loop
+_shared_session: Optional[aiohttp.ClientSession] = None
+
+
+async def get_shared_session() -> aiohttp.ClientSession:
+    """
+    Get the process-wide aiohttp session, creating it on first use.
+    
+    Must only be awaited on the one event loop that owns it (the monitor
+    I/O loop in async_monitor_wrapper); the connection pool and DNS cache
+    then carry over between batches and jobs.
+    """
+    global _shared_session
+    if _shared_session is None or _shared_session.closed:
+        _shared_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=200,
+                limit_per_host=8,
+                ttl_dns_cache=300  # DNS cache for 5 minutes
+            )
+        )
+    return _shared_session
+
+
+async def close_shared_session():
+    """Close the shared session (on its owning loop) at shutdown"""
+    global _shared_session
+    if _shared_session is not None and not _shared_session.closed:
+        await _shared_session.close()
+    _shared_session = None
+
+
 # Convenience function
 async def fetch_feeds_async(sources: List[Dict], max_concurrent=50) -> Tuple[List[Dict], List[Dict]]:
     """
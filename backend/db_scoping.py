@@ -10,8 +10,13 @@ Usage:
 IMPORTANT: All user-owned data MUST be filtered through these helpers
 to prevent data leakage between users.
 """
-from flask import abort
+import os
+from functools import lru_cache
+
+from flask import abort, g, has_app_context, has_request_context
 from flask_login import current_user
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, raiseload, with_loader_criteria
 
 
 # Tables that require user_id filtering (user-owned data)
@@ -38,8 +43,29 @@ SYSTEM_TABLES = {
     'audit_log',     # AuditLog (system/admin)
 }
 
+# In development, scoped queries raise on lazy relationship loads so N+1
+# patterns surface immediately instead of silently issuing extra SELECTs.
+RAISE_ON_LAZY_LOAD = os.getenv('FLASK_ENV') == 'development'
+
+
+@lru_cache(maxsize=128)
+def _user_id_column(Model):
+    """
+    Return Model's user_id column attribute, or None for models without one.
+    
+    Uses the mapper's prebuilt column collection (a dict membership test)
+    instead of hasattr(), and is cached per model class.
+    """
+    mapper = inspect(Model, raiseerr=False)
+    if mapper is None:
+        # Not a mapped class - fall back to plain attribute lookup
+        return getattr(Model, 'user_id', None)
+    if 'user_id' not in mapper.columns:
+        return None
+    return mapper.attrs['user_id'].class_attribute
+
 
-def scope_to_user(query, Model, user_id=None, force=True):
+def scope_to_user(query, Model, user_id=None, force=True, load_options=None):
     """
     Filter a query to only return records owned by the specified user.
     
@@ -48,6 +74,8 @@ def scope_to_user(query, Model, user_id=None, force=True):
         Model: The model class being queried
         user_id: User ID to filter by. If None, uses current_user.id
         force: If True, always apply filter even for admins (recommended for user data)
+        load_options: Loader options to apply (e.g. [selectinload(Model.rel)]).
+            If None and RAISE_ON_LAZY_LOAD is set, raiseload('*') is applied.
     
     Returns:
         Filtered query
@@ -67,13 +95,34 @@ def scope_to_user(query, Model, user_id=None, force=True):
             raise ValueError("User must be authenticated for user-scoped queries")
         user_id = current_user.id
     
+    if load_options is not None:
+        query = query.options(*load_options)
+    elif RAISE_ON_LAZY_LOAD:
+        query = query.options(raiseload('*', sql_only=True))
+    
     # Check if model has user_id column
-    if not hasattr(Model, 'user_id'):
+    user_id_col = _user_id_column(Model)
+    if user_id_col is None:
         # Model doesn't have user_id - likely a shared catalog table
         return query
     
     # Always filter by user_id for user-owned data
-    return query.filter(Model.user_id == user_id)
+    return query.filter(user_id_col == user_id)
+
+
+def _request_record_cache():
+    """
+    Per-request cache of records fetched by get_user_record_or_404.
+    
+    Lives on flask.g, so it is created fresh for every request and never
+    shared between requests. Returns None outside an app context.
+    """
+    if not has_app_context():
+        return None
+    cache = g.get('_record_cache')
+    if cache is None:
+        cache = g._record_cache = {}
+    return cache
 
 
 def get_user_record_or_404(db, Model, record_id, user_id=None):
@@ -104,11 +153,21 @@ def get_user_record_or_404(db, Model, record_id, user_id=None):
             abort(401, description="Authentication required")
         user_id = current_user.id
     
+    # A cached record is reused only while it is still attached to this
+    # session (deleting or expunging it, or using another session, misses)
+    cache = _request_record_cache()
+    cache_key = (Model.__tablename__, record_id, user_id)
+    if cache is not None:
+        cached = cache.get(cache_key)
+        if cached is not None and cached in db and cached not in db.deleted:
+            return cached
+    
     # Check if model has user_id column
-    if hasattr(Model, 'user_id'):
+    user_id_col = _user_id_column(Model)
+    if user_id_col is not None:
         record = db.query(Model).filter(
             Model.id == record_id,
-            Model.user_id == user_id
+            user_id_col == user_id
         ).first()
     else:
         # Model doesn't have user_id - just get by ID
@@ -117,6 +176,9 @@ def get_user_record_or_404(db, Model, record_id, user_id=None):
     if record is None:
         abort(404, description=f"{Model.__name__} not found")
     
+    if cache is not None:
+        cache[cache_key] = record
+    
     return record
 
 
@@ -178,6 +240,61 @@ def require_admin():
         abort(403, description="Admin access required")
 
 
+def _user_owned_models():
+    """Mapped classes whose table is listed in USER_OWNED_TABLES."""
+    from models import Base
+    return [
+        mapper.class_ for mapper in Base.registry.mappers
+        if mapper.local_table is not None
+        and mapper.local_table.name in USER_OWNED_TABLES
+    ]
+
+
+def _apply_user_scope(execute_state):
+    """do_orm_execute hook: add user_id criteria to SELECTs in a request."""
+    if not execute_state.is_select:
+        return
+    if execute_state.execution_options.get('skip_user_scope', False):
+        return
+    if not has_request_context() or not current_user.is_authenticated:
+        return
+    
+    user_id = current_user.id
+    execute_state.statement = execute_state.statement.options(*[
+        with_loader_criteria(
+            Model,
+            lambda cls: cls.user_id == user_id,
+            include_aliases=True
+        )
+        for Model in _SCOPED_MODELS
+    ])
+
+
+_SCOPED_MODELS = []
+
+
+def enable_automatic_user_scoping(session_cls=Session):
+    """
+    Scope every ORM SELECT on user-owned tables to current_user automatically.
+    
+    Registers a do_orm_execute listener that injects with_loader_criteria for
+    each model in USER_OWNED_TABLES, so a forgotten scope_to_user() can't
+    leak another user's rows. Only applies inside an authenticated request;
+    background jobs and scripts are unaffected. Opt out per query with
+    .execution_options(skip_user_scope=True) (e.g. admin listings).
+    
+    scope_to_user() stays valid alongside it - the extra filter is redundant
+    but harmless.
+    
+    Example:
+        from models import SessionLocal
+        enable_automatic_user_scoping(SessionLocal)
+    """
+    _SCOPED_MODELS[:] = _user_owned_models()
+    if not event.contains(session_cls, 'do_orm_execute', _apply_user_scope):
+        event.listen(session_cls, 'do_orm_execute', _apply_user_scope)
+
+
 # Alias for backward compatibility with existing scoped() function
 def scoped(query, Model, force_user_filter=True):
     """
@@ -2,9 +2,17 @@
 Pre-expand all existing keywords to 32 languages
 Run this ONCE after updating the system to populate the cache
 """
+import logging
+
+from sqlalchemy import func, select
+
+from config import LOG_LEVEL
 from models import init_db, get_db, Keyword
 from keyword_expansion import expand_keyword
 
+# keyword_expansion reports translation progress and failures via logging
+logging.basicConfig(level=LOG_LEVEL)
+
 # Initialize DB
 init_db()
 db = get_db()
@@ -15,25 +23,28 @@ print("="*80)
 print("\nThis will expand all existing keywords to 32 languages.")
 print("This only needs to be run once.\n")
 
-# Get all keywords
-keywords = db.query(Keyword).all()
+# Count up front; the keywords themselves are streamed below
+total_keywords = db.scalar(select(func.count(Keyword.id)))
 
-if not keywords:
+if not total_keywords:
     print("❌ No keywords found in database!")
     print("   → Add keywords via frontend first")
     db.close()
     exit(0)
 
-print(f"Found {len(keywords)} keywords to expand\n")
+print(f"Found {total_keywords} keywords to expand\n")
 
 success_count = 0
 partial_count = 0
 failed_count = 0
 
-for i, kw in enumerate(keywords, 1):
-    keyword_ar = kw.text_ar
-    
-    print(f"[{i}/{len(keywords)}] Expanding: {keyword_ar}")
+# Stream only the columns we need instead of loading every Keyword row
+keyword_rows = db.execute(
+    select(Keyword.id, Keyword.text_ar).execution_options(yield_per=200)
+)
+
+for i, (kw_id, keyword_ar) in enumerate(keyword_rows, 1):
+    print(f"[{i}/{total_keywords}] Expanding: {keyword_ar}")
     
     try:
         # Expand to 32 languages
@@ -62,9 +73,9 @@ print(f"""
 ⚠️  Partial: {partial_count} keywords
 ❌ Failed: {failed_count} keywords
 
-Total processed: {len(keywords)}
+Total processed: {total_keywords}
 
-{f"✅ All keywords expanded successfully!" if success_count == len(keywords) else ""}
+{f"✅ All keywords expanded successfully!" if success_count == total_keywords else ""}
 {f"⚠️  Some keywords partially expanded - check logs above" if partial_count > 0 else ""}
 {f"❌ Some keywords failed - check logs above" if failed_count > 0 else ""}
 
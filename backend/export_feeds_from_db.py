@@ -1,5 +1,8 @@
 from collections import defaultdict
 import json
+import sys
+
+from sqlalchemy import func
 
 from models import init_db, get_db, Country, Source
 
@@ -18,29 +21,37 @@ def main() -> None:
     init_db()
     db = get_db()
     try:
-        countries = db.query(Country).all()
-        sources = db.query(Source).all()
-
-        # Map country_id -> country_name (Arabic)
-        country_names = {c.id: c.name_ar for c in countries}
+        # One query: resolve each source's Arabic country name via a join
+        rows = (
+            db.query(
+                Source.name,
+                Source.url,
+                Source.enabled,
+                func.coalesce(Country.name_ar, Source.country_name, "غير معروف").label("country_name"),
+            )
+            .outerjoin(Country, Source.country_id == Country.id)
+            .yield_per(1000)
+        )
 
         verified_feeds = defaultdict(list)
 
-        for s in sources:
-            country_name = country_names.get(s.country_id, s.country_name or "غير معروف")
+        for name, url, enabled, country_name in rows:
             verified_feeds[country_name].append(
                 {
-                    "name": s.name,
-                    "url": s.url,
+                    "name": name,
+                    "url": url,
                     # reliability not stored in DB; default to "high" for now
                     "reliability": "high",
-                    "enabled": bool(s.enabled),
+                    "enabled": bool(enabled),
                 }
             )
 
         print("VERIFIED_FEEDS = ")
-        # json.dumps gives us nicely formatted UTF-8-safe output
-        print(json.dumps(verified_feeds, ensure_ascii=False, indent=4))
+        # Encode incrementally so the full JSON string is never built in memory
+        encoder = json.JSONEncoder(ensure_ascii=False, indent=4)
+        for chunk in encoder.iterencode(verified_feeds):
+            sys.stdout.write(chunk)
+        sys.stdout.write("\n")
     finally:
         db.close()
 
@@ -10,16 +10,38 @@ Features:
 - Health status categorization
 - Persistent storage (optional)
 """
-from typing import Dict, List
-from collections import defaultdict
+from typing import Dict, List, Optional
+from collections import Counter, defaultdict, OrderedDict
+from dataclasses import asdict, dataclass
 from datetime import datetime
+import heapq
 import json
 import os
 import logging
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 logger = logging.getLogger(__name__)
 
 
+@dataclass(slots=True)
+class SourceStats:
+    """Health metrics for a single RSS source (fixed layout, no per-instance dict)."""
+    total_runs: int = 0
+    successful_runs: int = 0
+    failed_runs: int = 0
+    empty_runs: int = 0
+    consecutive_empty: int = 0
+    last_success: Optional[str] = None
+    last_failure: Optional[str] = None
+    last_error: Optional[str] = None
+    total_articles_fetched: int = 0
+
+
 class FeedHealthTracker:
     """
     Track health metrics for RSS feeds.
@@ -27,6 +49,7 @@ class FeedHealthTracker:
     """
     
     MAX_SOURCES = 50  # Limit tracked sources to prevent RAM overflow
+    COMPACT_EVERY = 5  # Rewrite the snapshot after this many delta-log appends
     
     def __init__(self, persistence_file=None):
         """
@@ -36,16 +59,24 @@ class FeedHealthTracker:
             persistence_file: Optional file path for persistent storage
         """
         self.persistence_file = persistence_file
+        # Append-only log of per-batch deltas, replayed on top of the snapshot
+        self.delta_log_file = (
+            os.path.splitext(persistence_file)[0] + '.jsonl'
+            if persistence_file else None
+        )
+        self._dirty_count = 0
         self.stats = {
             'total_sources': 0,
             'successful': 0,
             'failed': 0,
             'empty': 0,
-            'per_source': {}  # source_name -> metrics (limited to MAX_SOURCES)
+            'per_source': OrderedDict()  # source_name -> SourceStats (LRU, limited to MAX_SOURCES)
         }
         
         # Load previous data if available
-        if persistence_file and os.path.exists(persistence_file):
+        if persistence_file and (
+            os.path.exists(persistence_file) or os.path.exists(self.delta_log_file)
+        ):
             self._load()
     
     def record_fetch_result(
@@ -53,7 +84,8 @@ class FeedHealthTracker:
         source_name: str,
         status: str,
         articles_count: int = 0,
-        error: str = None
+        error: str = None,
+        now: str = None
     ):
         """
         Record the result of a feed fetch.
@@ -63,49 +95,45 @@ class FeedHealthTracker:
             status: 'success', 'failed', or 'empty'
             articles_count: Number of articles fetched
             error: Error message if failed
+            now: ISO timestamp to record; computed if omitted (batch callers
+                pass one shared timestamp)
         """
+        per_source = self.stats['per_source']
+        
         # Initialize source if new (with size limit)
-        if source_name not in self.stats['per_source']:
+        if source_name not in per_source:
             # PHASE 3: Enforce size limit to prevent RAM overflow
-            if len(self.stats['per_source']) >= self.MAX_SOURCES:
-                # Remove oldest entry (by total_runs)
-                oldest = min(self.stats['per_source'].keys(),
-                    key=lambda k: self.stats['per_source'][k].get('total_runs', 0))
-                del self.stats['per_source'][oldest]
+            if len(per_source) >= self.MAX_SOURCES:
+                # Evict least recently updated source (O(1))
+                per_source.popitem(last=False)
             
-            self.stats['per_source'][source_name] = {
-                'total_runs': 0,
-                'successful_runs': 0,
-                'failed_runs': 0,
-                'empty_runs': 0,
-                'consecutive_empty': 0,
-                'last_success': None,
-                'last_failure': None,
-                'last_error': None,
-                'total_articles_fetched': 0
-            }
+            per_source[source_name] = SourceStats()
+        else:
+            # Promote so recently seen sources are not evicted
+            per_source.move_to_end(source_name)
         
-        source_stats = self.stats['per_source'][source_name]
-        source_stats['total_runs'] += 1
+        source_stats = per_source[source_name]
+        source_stats.total_runs += 1
         
-        now = datetime.utcnow().isoformat()
+        if now is None:
+            now = datetime.utcnow().isoformat()
         
         if status == 'success':
-            source_stats['successful_runs'] += 1
-            source_stats['last_success'] = now
-            source_stats['consecutive_empty'] = 0
-            source_stats['total_articles_fetched'] += articles_count
+            source_stats.successful_runs += 1
+            source_stats.last_success = now
+            source_stats.consecutive_empty = 0
+            source_stats.total_articles_fetched += articles_count
             
         elif status == 'empty':
-            source_stats['empty_runs'] += 1
-            source_stats['consecutive_empty'] += 1
-            source_stats['last_success'] = now  # Empty but successful fetch
+            source_stats.empty_runs += 1
+            source_stats.consecutive_empty += 1
+            source_stats.last_success = now  # Empty but successful fetch
             
         elif status == 'failed':
-            source_stats['failed_runs'] += 1
-            source_stats['last_failure'] = now
-            source_stats['last_error'] = error
-            source_stats['consecutive_empty'] += 1  # Count as empty too
+            source_stats.failed_runs += 1
+            source_stats.last_failure = now
+            source_stats.last_error = error
+            source_stats.consecutive_empty += 1  # Count as empty too
     
     def process_fetch_results(self, results: List[Dict]):
         """
@@ -121,55 +149,61 @@ class FeedHealthTracker:
                 - 'source' is the source name (not 'name')
         """
         try:
-            self.stats['total_sources'] = len(results)
-            self.stats['successful'] = 0
-            self.stats['failed'] = 0
-            self.stats['empty'] = 0
+            stats = self.stats
+            record = self.record_fetch_result
+            counts = Counter()
+            touched = {}  # Sources updated in this batch (ordered, unique)
+            now = datetime.utcnow().isoformat()  # One timestamp for the whole batch
             
             for result in results:
                 try:
+                    get = result.get
+                    
                     # Get source name (field is 'source', not 'name')
-                    source_name = result.get('source', result.get('name', 'Unknown'))
-                    status = result.get('status', 'failed')
+                    source_name = get('source') or get('name') or 'Unknown'
+                    status = get('status', 'failed')
                     
                     # IMPORTANT: 'articles' is an INTEGER count, not a list!
-                    articles_count = result.get('articles', 0)
+                    articles_count = get('articles', 0)
                     
                     # Handle case where articles might be a list (defensive)
                     if isinstance(articles_count, list):
                         articles_count = len(articles_count)
                     elif not isinstance(articles_count, int):
-                        logger.warning(f"⚠️  Unexpected articles type for {source_name}: {type(articles_count)}")
+                        logger.warning("⚠️  Unexpected articles type for %s: %s", source_name, type(articles_count))
                         articles_count = 0
                     
-                    error = result.get('error')
+                    touched[source_name] = None
                     
                     # Categorize based on status
-                    if status == 'success':
-                        if articles_count > 0:
-                            self.stats['successful'] += 1
-                            self.record_fetch_result(source_name, 'success', articles_count)
-                        else:
-                            self.stats['empty'] += 1
-                            self.record_fetch_result(source_name, 'empty', 0)
-                    elif status in ['cached', 'empty']:
-                        # Cached or explicitly empty (but successful fetch)
-                        self.stats['empty'] += 1
-                        self.record_fetch_result(source_name, 'empty', 0)
+                    if status == 'success' and articles_count > 0:
+                        counts['successful'] += 1
+                        record(source_name, 'success', articles_count, now=now)
+                    elif status in ('success', 'cached', 'empty'):
+                        # Successful fetch with no articles, cached or explicitly empty
+                        counts['empty'] += 1
+                        record(source_name, 'empty', 0, now=now)
                     else:
                         # Failed, timeout, or other errors
-                        self.stats['failed'] += 1
-                        self.record_fetch_result(source_name, 'failed', 0, error)
+                        counts['failed'] += 1
+                        record(source_name, 'failed', 0, get('error'), now=now)
                 
                 except Exception as e:
                     # Per-source error should not crash entire health tracking
                     logger.warning(f"⚠️  Error processing health for one source: {e}")
                     continue
             
-            # Persist if configured
+            stats['total_sources'] = len(results)
+            stats['successful'] = counts['successful']
+            stats['failed'] = counts['failed']
+            stats['empty'] = counts['empty']
+            
+            # Persist if configured: append this batch's delta, compact periodically
             if self.persistence_file:
                 try:
-                    self._save()
+                    self._append_delta(touched)
+                    if self._dirty_count >= self.COMPACT_EVERY:
+                        self.flush()
                 except Exception as e:
                     logger.warning(f"⚠️  Failed to persist health data: {e}")
         
@@ -200,30 +234,40 @@ class FeedHealthTracker:
             )
         }
     
-    def get_unhealthy_sources(self, threshold: int = 5) -> List[Dict]:
+    def get_unhealthy_sources(self, threshold: int = 5, limit: int = None) -> List[Dict]:
         """
         Get sources that are consistently empty or failing.
         
         Args:
             threshold: Number of consecutive empty runs to mark unhealthy
+            limit: If set, only return the `limit` worst sources
+                (most consecutive empty runs first)
             
         Returns:
             List of unhealthy source info dicts
         """
-        unhealthy = []
-        
-        for source_name, stats in self.stats['per_source'].items():
-            if stats['consecutive_empty'] >= threshold:
-                unhealthy.append({
-                    'name': source_name,
-                    'consecutive_empty': stats['consecutive_empty'],
-                    'total_runs': stats['total_runs'],
-                    'successful_runs': stats['successful_runs'],
-                    'last_success': stats['last_success'],
-                    'last_error': stats['last_error']
-                })
+        candidates = (
+            (source_name, stats)
+            for source_name, stats in self.stats['per_source'].items()
+            if stats.consecutive_empty >= threshold
+        )
+        if limit is not None:
+            # Top-K selection: O(N log K), no full sort
+            candidates = heapq.nlargest(
+                limit, candidates, key=lambda item: item[1].consecutive_empty
+            )
         
-        return unhealthy
+        return [
+            {
+                'name': source_name,
+                'consecutive_empty': stats.consecutive_empty,
+                'total_runs': stats.total_runs,
+                'successful_runs': stats.successful_runs,
+                'last_success': stats.last_success,
+                'last_error': stats.last_error
+            }
+            for source_name, stats in candidates
+        ]
     
     def get_source_health(self, source_name: str) -> Dict:
         """
@@ -241,15 +285,15 @@ class FeedHealthTracker:
         stats = self.stats['per_source'][source_name]
         
         # Determine health status
-        if stats['consecutive_empty'] >= 5:
+        if stats.consecutive_empty >= 5:
             status = 'unhealthy'
-            message = f"{stats['consecutive_empty']} consecutive empty runs"
-        elif stats['consecutive_empty'] >= 3:
+            message = f"{stats.consecutive_empty} consecutive empty runs"
+        elif stats.consecutive_empty >= 3:
             status = 'warning'
-            message = f"{stats['consecutive_empty']} consecutive empty runs"
-        elif stats['successful_runs'] > 0:
+            message = f"{stats.consecutive_empty} consecutive empty runs"
+        elif stats.successful_runs > 0:
             status = 'healthy'
-            message = f"{stats['successful_runs']}/{stats['total_runs']} successful runs"
+            message = f"{stats.successful_runs}/{stats.total_runs} successful runs"
         else:
             status = 'unknown'
             message = 'No successful runs yet'
@@ -258,7 +302,7 @@ class FeedHealthTracker:
             'name': source_name,
             'status': status,
             'message': message,
-            **stats
+            **asdict(stats)
         }
     
     def get_all_sources_health(self) -> List[Dict]:
@@ -291,29 +335,114 @@ class FeedHealthTracker:
         print(f"   Success rate: {summary['success_rate']:.1f}%")
         
         # Show unhealthy sources
-        unhealthy = self.get_unhealthy_sources(threshold=3)
-        if unhealthy:
-            print(f"\n⚠️  Unhealthy Sources ({len(unhealthy)}):")
-            for source in unhealthy[:10]:  # Show top 10
+        unhealthy_count = sum(
+            1 for stats in self.stats['per_source'].values()
+            if stats.consecutive_empty >= 3
+        )
+        if unhealthy_count:
+            print(f"\n⚠️  Unhealthy Sources ({unhealthy_count}):")
+            for source in self.get_unhealthy_sources(threshold=3, limit=10):  # Show top 10
                 print(f"   • {source['name']}: {source['consecutive_empty']} consecutive empty runs")
         else:
             print(f"\n✅ No unhealthy sources detected")
         
         print("="*80 + "\n")
     
+    def flush(self):
+        """Compact now: write a full snapshot and truncate the delta log."""
+        if self.persistence_file and self._dirty_count:
+            if self._save():
+                open(self.delta_log_file, 'w').close()
+                self._dirty_count = 0
+    
+    def _append_delta(self, source_names):
+        """
+        Append one batch worth of changes to the delta log.
+        
+        Writes the run summary plus the current stats of each source touched in
+        the batch, so the cost is O(batch) rather than O(total state).
+        """
+        stats = self.stats
+        per_source = stats['per_source']
+        entries = [{
+            'summary': {
+                'total_sources': stats['total_sources'],
+                'successful': stats['successful'],
+                'failed': stats['failed'],
+                'empty': stats['empty'],
+            }
+        }]
+        entries.extend(
+            {'source': name, 'stats': asdict(per_source[name])}
+            for name in source_names if name in per_source
+        )
+        
+        if HAS_ORJSON:
+            data = b''.join(orjson.dumps(entry) + b'\n' for entry in entries)
+        else:
+            data = ''.join(
+                json.dumps(entry, ensure_ascii=False) + '\n' for entry in entries
+            ).encode('utf-8')
+        
+        with open(self.delta_log_file, 'ab') as f:
+            f.write(data)
+        self._dirty_count += 1
+    
+    def _replay_delta_log(self):
+        """Apply delta-log entries written since the last snapshot."""
+        per_source = self.stats['per_source']
+        with open(self.delta_log_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Torn final line from an interrupted write
+                    logger.warning("Skipping corrupt feed health delta entry")
+                    continue
+                if 'summary' in entry:
+                    # One summary entry per appended batch
+                    self.stats.update(entry['summary'])
+                    self._dirty_count += 1
+                else:
+                    name = entry['source']
+                    per_source[name] = SourceStats(**entry['stats'])
+                    per_source.move_to_end(name)
+                    if len(per_source) > self.MAX_SOURCES:
+                        per_source.popitem(last=False)
+    
     def _save(self):
-        """Save health data to persistent storage."""
+        """Save health data to persistent storage (atomic temp file + rename)."""
         try:
-            with open(self.persistence_file, 'w', encoding='utf-8') as f:
-                json.dump(self.stats, f, indent=2, ensure_ascii=False)
+            if HAS_ORJSON:
+                # orjson serializes dataclasses natively
+                data = orjson.dumps(self.stats, option=orjson.OPT_NON_STR_KEYS)
+            else:
+                data = json.dumps(self.stats, ensure_ascii=False, default=asdict).encode('utf-8')
+            
+            tmp_path = self.persistence_file + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self.persistence_file)
+            return True
         except Exception as e:
             logger.warning(f"Failed to save health data: {e}")
+            return False
     
     def _load(self):
-        """Load health data from persistent storage."""
+        """Load health data from persistent storage (snapshot + delta log)."""
         try:
-            with open(self.persistence_file, 'r', encoding='utf-8') as f:
-                self.stats = json.load(f)
+            if os.path.exists(self.persistence_file):
+                with open(self.persistence_file, 'r', encoding='utf-8') as f:
+                    self.stats = json.load(f)
+                self.stats['per_source'] = OrderedDict(
+                    (name, SourceStats(**metrics))
+                    for name, metrics in self.stats.get('per_source', {}).items()
+                )
+            if os.path.exists(self.delta_log_file):
+                self._replay_delta_log()
         except Exception as e:
             logger.warning(f"Failed to load health data: {e}")
     
@@ -324,10 +453,12 @@ class FeedHealthTracker:
             'successful': 0,
             'failed': 0,
             'empty': 0,
-            'per_source': {}
+            'per_source': OrderedDict()
         }
-        if self.persistence_file and os.path.exists(self.persistence_file):
-            os.remove(self.persistence_file)
+        self._dirty_count = 0
+        for path in (self.persistence_file, self.delta_log_file):
+            if path and os.path.exists(path):
+                os.remove(path)
 
 
 # Global tracker instance
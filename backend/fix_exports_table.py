@@ -51,5 +51,11 @@ else:
     else:
         print("✅ file_data column already exists")
 
+# Compound index so ownership lookups (id + user_id) are a single index probe
+cursor.execute('CREATE INDEX IF NOT EXISTS ix_exports_user_id_id ON exports(user_id, id)')
+conn.commit()
+cursor.execute("EXPLAIN QUERY PLAN SELECT * FROM exports WHERE id = 1 AND user_id = 1")
+print(f"Ownership lookup plan: {[row[-1] for row in cursor.fetchall()]}")
+
 conn.close()
 print("Done!")
@@ -4,16 +4,36 @@ Run this to allow new code to work with existing schema
 """
 import sqlite3
 
+# Columns of the rebuilt articles table, in CREATE TABLE order
+ARTICLE_COLUMNS = (
+    "id, country, source_name, url, "
+    "title_original, summary_original, original_language, "
+    "title_ar, summary_ar, arabic_text, "
+    "keyword, keyword_original, keywords_translations, "
+    "sentiment, sentiment_label, sentiment_score, "
+    "published_at, fetched_at, created_at, "
+    "language"
+)
+
 def fix_schema():
-    conn = sqlite3.connect('ain_news.db')
+    # Autocommit mode: the whole migration runs in one explicit transaction
+    conn = sqlite3.connect('ain_news.db', isolation_level=None)
     cursor = conn.cursor()
     
     print("🔧 Fixing database schema...")
     
     try:
+        cursor.execute("BEGIN IMMEDIATE")
+        
         # SQLite doesn't support ALTER COLUMN, so we need to recreate the table
         print("📝 Creating new articles table with nullable columns...")
         
+        # Index (url, id) so the GROUP BY and the MAX(id) subqueries below are
+        # index probes instead of full table scans. It is dropped together with
+        # the old table at the end of the migration.
+        cursor.execute("CREATE INDEX IF NOT EXISTS ix_articles_url_id ON articles(url, id)")
+        cursor.execute("ANALYZE articles")
+
         # First, check if there are duplicates
         cursor.execute("SELECT url, COUNT(*) as count FROM articles GROUP BY url HAVING count > 1")
         duplicates = cursor.fetchall()
@@ -34,8 +54,6 @@ def fix_schema():
                 """, (url, url))
                 total_removed += cursor.rowcount
             
-            # COMMIT the deletions before proceeding
-            conn.commit()
             print(f"   ✅ Removed {total_removed} duplicate entries")
         
         # Create temporary table with correct schema
@@ -78,9 +96,9 @@ def fix_schema():
         
         # Copy data from old table to new, keeping only unique URLs (newest entry)
         print("   📋 Copying data (keeping unique URLs only)...")
-        cursor.execute("""
-            INSERT INTO articles_new 
-            SELECT * FROM articles a1
+        cursor.execute(f"""
+            INSERT INTO articles_new ({ARTICLE_COLUMNS})
+            SELECT {ARTICLE_COLUMNS} FROM articles a1
             WHERE a1.id = (
                 SELECT MAX(a2.id) 
                 FROM articles a2 
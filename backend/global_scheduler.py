@@ -12,14 +12,37 @@ SCALING: O(feeds × keywords) instead of O(users × feeds × keywords)
 - Memory: ~1 thread instead of ~40 threads
 - DB connections: 1 session per run, not 40 concurrent sessions
 """
+import logging
 import threading
-import time
 import gc
 import json
+import hashlib
+import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, List, Set, Tuple
+from sqlalchemy import select, text
 from utils import strip_html_tags
 
+logger = logging.getLogger(__name__)
+
+# Max URLs per IN (...) clause when preloading existing articles
+# (keeps us under SQLite/PostgreSQL bound-parameter limits)
+EXISTING_URL_CHUNK = 500
+
+# Threads used to translate/prepare matched articles in parallel (I/O-bound)
+PREPARE_WORKERS = 8
+
+# Leading 'YYYY-MM-DD' with optional 'THH:MM:SS' / ' HH:MM:SS'
+_DATE_RE = re.compile(r'^(\d{4})-(\d{2})-(\d{2})(?:[T ](\d{2}):(\d{2}):(\d{2}))?')
+
+# Key for the PostgreSQL session-level advisory lock that guards global runs
+GLOBAL_LOCK_KEY = 0xA1E5C4ED
+
+# Reuse the previous run's keyword expansions for at most this long, even if
+# the keyword set is unchanged (so TTL-expired translations still get refreshed)
+EXPANSION_CACHE_MAX_AGE = timedelta(hours=6)
+
 
 class GlobalMonitoringScheduler:
     """
@@ -34,29 +57,23 @@ class GlobalMonitoringScheduler:
     6. Match articles against all keyword expansions
     7. For each match: save article to EVERY user who has that keyword
     8. Release lock, sleep, repeat
-    """
-    _instance = None
-    _lock = threading.Lock()
     
-    def __new__(cls):
-        if cls._instance is None:
-            with cls._lock:
-                if cls._instance is None:
-                    cls._instance = super().__new__(cls)
-                    cls._instance._initialized = False
-        return cls._instance
+    Use the module-level `global_scheduler` instance - one per process.
+    """
     
     def __init__(self):
-        if self._initialized:
-            return
-        self._initialized = True
         self._interval = 1800  # 30 minutes
         self._running = False
         self._executing = False
         self._thread: Optional[threading.Thread] = None
         self._stop_event = threading.Event()
-        self._trigger_event = threading.Event()
+        # Set by both stop() and trigger_now() so the loop can block in a
+        # single wait() instead of polling every second
+        self._wake_event = threading.Event()
         self._status_lock = threading.Lock()
+        self._lock_conn = None  # Connection holding the PG advisory lock
+        # (content hash, built at, expansions) from the last run
+        self._expansion_cache: Tuple[str, Optional[datetime], List[Dict[str, Any]]] = ("", None, [])
         self._last_run: Optional[datetime] = None
         self._last_result: Optional[Dict[str, Any]] = None
         self._run_count = 0
@@ -114,12 +131,18 @@ class GlobalMonitoringScheduler:
                 return {"success": False, "message": "Global scheduler already running"}
             self._running = True
             self._stop_event.clear()
+            self._wake_event.clear()
             self._last_run = datetime.utcnow()
         
+        # Move everything alive at startup (modules, app, config) into the
+        # permanent generation so per-run collections don't rescan it
+        gc.collect()
+        gc.freeze()
+        
         self._thread = threading.Thread(target=self._run_loop, daemon=True)
         self._thread.start()
         
-        print(f"[GLOBAL-SCHED] Started - monitoring every {self._interval // 60} minutes for ALL users")
+        logger.info("[GLOBAL-SCHED] Started - monitoring every %s minutes for ALL users", self._interval // 60)
         return {"success": True, "message": f"Global scheduler started (every {self._interval // 60} min)"}
     
     def stop(self) -> Dict[str, Any]:
@@ -129,11 +152,12 @@ class GlobalMonitoringScheduler:
                 return {"success": False, "message": "Global scheduler not running"}
             self._running = False
             self._stop_event.set()
+            self._wake_event.set()
         
         if self._thread and self._thread.is_alive():
             self._thread.join(timeout=10)
         
-        print(f"[GLOBAL-SCHED] Stopped")
+        logger.info("[GLOBAL-SCHED] Stopped")
         return {"success": True, "message": "Global scheduler stopped"}
     
     def trigger_now(self) -> Dict[str, Any]:
@@ -146,16 +170,25 @@ class GlobalMonitoringScheduler:
         # Force-release any stale locks so the triggered run can proceed
         self._force_release_stale_locks()
         
-        print(f"[GLOBAL-SCHED] Triggered immediate run (cleared stale locks)")
-        self._trigger_event.set()
+        # Force a fresh expansion load (e.g. a keyword was just re-translated)
+        self._expansion_cache = ("", None, [])
+        
+        logger.info("[GLOBAL-SCHED] Triggered immediate run (cleared stale locks)")
+        self._wake_event.set()
         return {"success": True, "message": "Immediate run triggered"}
     
     def _force_release_stale_locks(self):
-        """Force-release any RUNNING global jobs that may be stale."""
+        """Force-release any RUNNING global jobs that may be stale.
+        
+        Only needed for the row-based lock (SQLite); on PostgreSQL the
+        advisory lock dies with its connection, so there is nothing to clear.
+        """
         from models import get_db, MonitorJob
         SYSTEM_USER_ID = 0
         db = get_db()
         try:
+            if db.get_bind().dialect.name == 'postgresql':
+                return
             stale_jobs = db.query(MonitorJob).filter(
                 MonitorJob.user_id == SYSTEM_USER_ID,
                 MonitorJob.status == 'RUNNING'
@@ -167,10 +200,10 @@ class GlobalMonitoringScheduler:
                     job.status = 'FAILED'
                     job.error_message = f'Force-released stale lock (age: {int(age)}s)'
                     job.finished_at = datetime.utcnow()
-                    print(f"[GLOBAL-SCHED] Force-released stale job {job.id} (age: {int(age)}s)")
+                    logger.info("[GLOBAL-SCHED] Force-released stale job %s (age: %ss)", job.id, int(age))
             db.commit()
         except Exception as e:
-            print(f"[GLOBAL-SCHED] Error releasing stale locks: {e}")
+            logger.warning("[GLOBAL-SCHED] Error releasing stale locks: %s", e)
             db.rollback()
         finally:
             db.close()
@@ -192,16 +225,11 @@ class GlobalMonitoringScheduler:
                 crash_count = 0  # Reset on success
                 
                 while not self._stop_event.is_set():
-                    self._trigger_event.clear()
-                    
                     # Wait for interval, interruptible by stop or trigger
-                    for _ in range(self._interval):
-                        if self._stop_event.is_set():
-                            return
-                        if self._trigger_event.is_set():
-                            self._trigger_event.clear()
-                            break
-                        time.sleep(1)
+                    self._wake_event.wait(timeout=self._interval)
+                    self._wake_event.clear()
+                    if self._stop_event.is_set():
+                        return
                     
                     if not self._running:
                         return
@@ -211,20 +239,16 @@ class GlobalMonitoringScheduler:
                     
             except Exception as e:
                 crash_count += 1
-                print(f"[GLOBAL-SCHED] ⚠️ THREAD CRASH #{crash_count}: {str(e)}")
-                import traceback
-                traceback.print_exc()
+                logger.exception("[GLOBAL-SCHED] ⚠️ THREAD CRASH #%s: %s", crash_count, e)
                 
                 if crash_count < MAX_CONSECUTIVE_CRASHES and not self._stop_event.is_set():
                     wait_secs = min(60 * crash_count, 300)  # Back off: 60s, 120s, 180s...
-                    print(f"[GLOBAL-SCHED] Auto-restarting in {wait_secs}s...")
-                    for _ in range(wait_secs):
-                        if self._stop_event.is_set():
-                            return
-                        time.sleep(1)
+                    logger.info("[GLOBAL-SCHED] Auto-restarting in %ss...", wait_secs)
+                    if self._stop_event.wait(timeout=wait_secs):
+                        return
         
         if crash_count >= MAX_CONSECUTIVE_CRASHES:
-            print(f"[GLOBAL-SCHED] ❌ FATAL: {MAX_CONSECUTIVE_CRASHES} consecutive crashes - thread stopped")
+            logger.error("[GLOBAL-SCHED] ❌ FATAL: %s consecutive crashes - thread stopped", MAX_CONSECUTIVE_CRASHES)
             with self._status_lock:
                 self._running = False
     
@@ -244,13 +268,14 @@ class GlobalMonitoringScheduler:
                 return True  # All good
             
             # Thread is dead but _running is True → crashed!
-            print(f"[GLOBAL-SCHED] ⚠️ WATCHDOG: Thread dead, restarting...")
+            logger.warning("[GLOBAL-SCHED] ⚠️ WATCHDOG: Thread dead, restarting...")
         
         # Restart (outside lock to avoid deadlock)
         self._stop_event.clear()
+        self._wake_event.clear()
         self._thread = threading.Thread(target=self._run_loop, daemon=True)
         self._thread.start()
-        print(f"[GLOBAL-SCHED] ✅ WATCHDOG: Thread restarted")
+        logger.info("[GLOBAL-SCHED] ✅ WATCHDOG: Thread restarted")
         return True
     
     # ── DB Lock (multi-worker safe) ───────────────────────────────────
@@ -258,57 +283,137 @@ class GlobalMonitoringScheduler:
     def _acquire_global_lock(self, db) -> Optional[int]:
         """
         Acquire a global DB lock for monitoring.
-        Uses MonitorJob with user_id=0 (system) to indicate global run.
+        
+        On PostgreSQL the lock is pg_try_advisory_lock held on a dedicated
+        connection for the whole run - it is released automatically if the
+        worker dies, so no stale-lock bookkeeping is needed. Elsewhere
+        (SQLite dev) a RUNNING MonitorJob row with user_id=0 acts as the lock,
+        checked and inserted under a write lock.
+        
+        A MonitorJob row (user_id=0) is always written for status/history.
         Returns job_id if lock acquired, None if another worker is running.
         """
         from models import MonitorJob
         
         SYSTEM_USER_ID = 0  # Sentinel for global jobs
         
-        active_job = db.query(MonitorJob).filter(
+        if db.get_bind().dialect.name == 'postgresql':
+            if not self._try_advisory_lock(db):
+                logger.info("[GLOBAL-SCHED] Another worker holds the global lock - skipping")
+                return None
+            
+            # We hold the lock, so any RUNNING global row is from a dead worker
+            db.query(MonitorJob).filter(
+                MonitorJob.user_id == SYSTEM_USER_ID,
+                MonitorJob.status == 'RUNNING'
+            ).update({
+                MonitorJob.status: 'FAILED',
+                MonitorJob.error_message: 'Stale global job (worker died)',
+                MonitorJob.finished_at: datetime.utcnow(),
+            }, synchronize_session=False)
+            return self._insert_global_job(db)
+        
+        # Check-then-insert runs in ONE transaction that other workers must
+        # wait on, so two workers can't both see "no RUNNING job" and insert
+        running_query = db.query(MonitorJob).filter(
             MonitorJob.user_id == SYSTEM_USER_ID,
             MonitorJob.status == 'RUNNING'
-        ).first()
+        )
+        if db.get_bind().dialect.name == 'sqlite':
+            # No FOR UPDATE on SQLite: take the database write lock up front
+            db.execute(text(f"UPDATE {MonitorJob.__tablename__} SET id = id WHERE 0"))
+        else:
+            running_query = running_query.with_for_update()
+        active_job = running_query.first()
         
         if active_job:
             age = datetime.utcnow() - (active_job.started_at or datetime.utcnow())
             if age > timedelta(minutes=5):
+                # Committed together with the new job row below
                 active_job.status = 'FAILED'
                 active_job.error_message = 'Stale global job (worker timeout)'
                 active_job.finished_at = datetime.utcnow()
-                db.commit()
-                print(f"[GLOBAL-SCHED] Cleaned up stale global job {active_job.id}")
+                logger.info("[GLOBAL-SCHED] Cleaned up stale global job %s", active_job.id)
             else:
-                print(f"[GLOBAL-SCHED] Another worker running global job {active_job.id} - skipping")
+                db.rollback()  # Release the lock taken above
+                logger.info("[GLOBAL-SCHED] Another worker running global job %s - skipping", active_job.id)
                 return None
         
+        return self._insert_global_job(db)
+    
+    def _insert_global_job(self, db) -> Optional[int]:
+        """Insert the RUNNING MonitorJob row for this global run."""
+        from models import MonitorJob
+        
         new_job = MonitorJob(
-            user_id=SYSTEM_USER_ID,
+            user_id=0,
             status='RUNNING',
             started_at=datetime.utcnow(),
             progress=0,
             progress_message='Starting global monitoring...'
         )
         db.add(new_job)
-        db.commit()
+        try:
+            db.commit()
+        except Exception:
+            db.rollback()
+            self._release_advisory_lock()
+            raise
         
         return new_job.id
     
+    def _try_advisory_lock(self, db) -> bool:
+        """
+        Take the PG advisory lock on its own connection (not the session's,
+        which goes back to the pool on every commit). Returns True if acquired.
+        """
+        conn = db.get_bind().connect()
+        try:
+            got = conn.execute(
+                text("SELECT pg_try_advisory_lock(:k)"), {"k": GLOBAL_LOCK_KEY}
+            ).scalar()
+            conn.commit()
+        except Exception:
+            conn.close()
+            raise
+        
+        if not got:
+            conn.close()
+            return False
+        self._lock_conn = conn
+        return True
+    
+    def _release_advisory_lock(self):
+        """Release the PG advisory lock if this worker holds it (idempotent)."""
+        conn, self._lock_conn = self._lock_conn, None
+        if conn is None:
+            return
+        try:
+            conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": GLOBAL_LOCK_KEY})
+            conn.commit()
+        except Exception as e:
+            logger.warning("[GLOBAL-SCHED] Error releasing advisory lock: %s", e)
+        finally:
+            conn.close()
+    
     def _release_global_lock(self, db, job_id: int, success: bool, result: Dict[str, Any]):
         """Release the global DB lock and update job status"""
         from models import MonitorJob
         
-        job = db.query(MonitorJob).filter(MonitorJob.id == job_id).first()
-        if job:
-            job.status = 'SUCCEEDED' if success else 'FAILED'
-            job.finished_at = datetime.utcnow()
-            job.progress = 100
-            job.total_fetched = result.get('total_fetched', 0)
-            job.total_matched = result.get('total_matches', 0)
-            job.total_saved = result.get('total_saved', 0)
-            if not success:
-                job.error_message = result.get('error', 'Unknown error')
-            db.commit()
+        try:
+            job = db.query(MonitorJob).filter(MonitorJob.id == job_id).first()
+            if job:
+                job.status = 'SUCCEEDED' if success else 'FAILED'
+                job.finished_at = datetime.utcnow()
+                job.progress = 100
+                job.total_fetched = result.get('total_fetched', 0)
+                job.total_matched = result.get('total_matches', 0)
+                job.total_saved = result.get('total_saved', 0)
+                if not success:
+                    job.error_message = result.get('error', 'Unknown error')
+                db.commit()
+        finally:
+            self._release_advisory_lock()
     
     # ── Core Monitoring ───────────────────────────────────────────────
     
@@ -320,18 +425,17 @@ class GlobalMonitoringScheduler:
         2. Build keyword→users map
         3. Fetch RSS feeds ONCE
         4. Match against all keywords
-        5. Save articles per-user
+        5. Save articles per-user (streamed, one fetch batch at a time)
         """
         from models import get_db, Source, Keyword, Article
         from keyword_expansion import load_expansions_from_keywords
         from async_monitor_wrapper import run_optimized_monitoring
+        from config import get_effective_save_limit
         
         self._executing = True
         job_id = None
         
-        print(f"\n{'='*60}")
-        print(f"[GLOBAL-SCHED] Starting global monitoring at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        print(f"{'='*60}")
+        logger.info("[GLOBAL-SCHED] Starting global monitoring at %s", datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
         
         db = get_db()
         try:
@@ -343,51 +447,66 @@ class GlobalMonitoringScheduler:
                     self._last_result = {"skipped": True, "reason": "Another worker running"}
                 return
             
-            print(f"[GLOBAL-SCHED] Acquired DB lock (job {job_id})")
+            logger.info("[GLOBAL-SCHED] Acquired DB lock (job %s)", job_id)
             
             # Step 2: Collect ALL enabled keywords from ALL users
-            all_keywords = db.query(Keyword).filter(Keyword.enabled == True).all()
+            # Plain column tuples - no ORM hydration, no translations payload
+            keyword_rows = db.execute(
+                select(
+                    Keyword.id, Keyword.text_ar, Keyword.user_id,
+                    Keyword.translations_updated_at
+                ).where(Keyword.enabled == True)
+            ).all()
             
-            if not all_keywords:
-                print(f"[GLOBAL-SCHED] No enabled keywords for any user - skipping")
+            if not keyword_rows:
+                logger.info("[GLOBAL-SCHED] No enabled keywords for any user - skipping")
                 self._release_global_lock(db, job_id, True, {"skipped": True})
                 with self._status_lock:
                     self._last_run = datetime.utcnow()
                     self._last_result = {"skipped": True, "reason": "No keywords"}
                 return
             
-            # Step 3: Build keyword→users map and deduplicate
+            # Step 3: Build keyword→users map and deduplicate (single pass)
             keyword_user_map: Dict[str, Set[int]] = {}  # {keyword_ar: {user_id, ...}}
-            for kw in all_keywords:
-                if kw.text_ar not in keyword_user_map:
-                    keyword_user_map[kw.text_ar] = set()
-                keyword_user_map[kw.text_ar].add(kw.user_id)
-            
-            # Unique keywords for expansion loading (one per text)
+            # One keyword row per text for expansion loading
             # IMPORTANT: prefer the keyword with the freshest translations
             best_per_text: Dict[str, Any] = {}
-            for kw in all_keywords:
-                existing = best_per_text.get(kw.text_ar)
-                if existing is None:
-                    best_per_text[kw.text_ar] = kw
-                else:
-                    # Prefer the keyword with the most recent translations
-                    kw_ts = getattr(kw, 'translations_updated_at', None)
-                    ex_ts = getattr(existing, 'translations_updated_at', None)
-                    if kw_ts and (not ex_ts or kw_ts > ex_ts):
-                        best_per_text[kw.text_ar] = kw
-            unique_keywords = list(best_per_text.values())
+            all_user_ids: Set[int] = set()
+            for kw_id, text_ar, user_id, updated_at in keyword_rows:
+                all_user_ids.add(user_id)
+                users = keyword_user_map.get(text_ar)
+                if users is None:
+                    keyword_user_map[text_ar] = {user_id}
+                    best_per_text[text_ar] = (kw_id, updated_at)
+                    continue
+                users.add(user_id)
+                # Prefer the keyword with the most recent translations
+                ex_ts = best_per_text[text_ar][1]
+                if updated_at and (not ex_ts or updated_at > ex_ts):
+                    best_per_text[text_ar] = (kw_id, updated_at)
             
-            total_users = len(set(kw.user_id for kw in all_keywords))
-            print(f"[GLOBAL-SCHED] {len(unique_keywords)} unique keywords across {total_users} users")
-            for text, users in keyword_user_map.items():
-                print(f"   • '{text}' → {len(users)} user(s)")
+            # Fetch the translations payload only for the chosen rows.
+            # Rows expose .id/.text_ar/.translations_json/... like Keyword objects.
+            unique_keywords = db.execute(
+                select(
+                    Keyword.id, Keyword.text_ar,
+                    Keyword.translations_json, Keyword.translations_updated_at
+                ).where(Keyword.id.in_([kw_id for kw_id, _ in best_per_text.values()]))
+            ).all()
+            
+            total_users = len(all_user_ids)
+            logger.info("[GLOBAL-SCHED] %s unique keywords across %s users", len(unique_keywords), total_users)
+            if logger.isEnabledFor(logging.DEBUG):
+                for text, users in keyword_user_map.items():
+                    logger.debug("   • '%s' → %s user(s)", text, len(users))
             
             # Step 4: Load keyword expansions (translations to 33 languages)
-            keyword_expansions = load_expansions_from_keywords(unique_keywords)
+            keyword_expansions = self._load_expansions_cached(
+                unique_keywords, load_expansions_from_keywords
+            )
             
             if not keyword_expansions:
-                print(f"[GLOBAL-SCHED] No keyword expansions available - skipping")
+                logger.info("[GLOBAL-SCHED] No keyword expansions available - skipping")
                 self._release_global_lock(db, job_id, True, {"skipped": True})
                 with self._status_lock:
                     self._last_run = datetime.utcnow()
@@ -395,42 +514,53 @@ class GlobalMonitoringScheduler:
                 return
             
             # Step 5: Get all enabled RSS sources
-            sources = db.query(Source).filter(Source.enabled == True).all()
-            sources_list = [{
-                'id': s.id,
-                'country_name': s.country_name,
-                'name': s.name,
-                'url': s.url,
-                'enabled': s.enabled
-            } for s in sources]
+            # Only the columns the fetcher needs, as plain rows (no ORM hydration)
+            source_columns = (Source.id, Source.country_name, Source.name, Source.url, Source.enabled)
+            sources_list = [
+                dict(row._mapping)
+                for row in db.execute(select(*source_columns).where(Source.enabled == True))
+            ]
+            
+            logger.info("[GLOBAL-SCHED] Fetching from %s RSS sources...", len(sources_list))
+            
+            # Step 6+7: Fetch RSS feeds ONCE, match against ALL keywords, and
+            # save each fetch batch's matches per-user as soon as they're found
+            # (never holding every match of the run in memory)
+            save_limit = get_effective_save_limit()
+            total_saved = 0
+            user_save_counts: Dict[int, int] = {}
+            handed_to_save = 0  # Save limit applies across the whole run
             
-            print(f"[GLOBAL-SCHED] Fetching from {len(sources_list)} RSS sources...")
+            def save_batch(batch_matches: list):
+                nonlocal total_saved, handed_to_save
+                if save_limit:
+                    remaining = max(save_limit - handed_to_save, 0)
+                    if len(batch_matches) > remaining:
+                        logger.info("[GLOBAL-SCHED] Applying save limit: %s (skipping %s matches)", save_limit, len(batch_matches) - remaining)
+                        batch_matches = batch_matches[:remaining]
+                if not batch_matches:
+                    return
+                handed_to_save += len(batch_matches)
+                
+                logger.info("[GLOBAL-SCHED] %s matches found - distributing to users...", len(batch_matches))
+                saved, counts = self._save_matches_for_all_users(db, batch_matches, keyword_user_map)
+                total_saved += saved
+                for uid, count in counts.items():
+                    user_save_counts[uid] = user_save_counts.get(uid, 0) + count
             
-            # Step 6: Fetch RSS feeds ONCE and match against ALL keywords
             monitoring_result = run_optimized_monitoring(
                 sources_list,
                 keyword_expansions,
                 max_concurrent=50,
-                max_per_source=30
+                max_per_source=30,
+                on_matches=save_batch
             )
             
-            # Step 7: Save results per-user
-            total_saved = 0
-            user_save_counts: Dict[int, int] = {}
-            
-            if monitoring_result.get('success') and monitoring_result.get('matches'):
-                matches = monitoring_result['matches']
-                print(f"\n[GLOBAL-SCHED] {len(matches)} matches found - distributing to users...")
-                
-                total_saved, user_save_counts = self._save_matches_for_all_users(
-                    db, matches, keyword_user_map
-                )
-            
             # Step 8: Build result summary
             result = {
                 "success": True,
                 "total_fetched": monitoring_result.get('total_fetched', 0),
-                "total_matches": len(monitoring_result.get('matches', [])),
+                "total_matches": monitoring_result.get('total_matches', 0),
                 "total_saved": total_saved,
                 "users_served": len(user_save_counts),
                 "per_user_saves": {str(k): v for k, v in user_save_counts.items()},
@@ -444,19 +574,18 @@ class GlobalMonitoringScheduler:
                 self._run_count += 1
                 self._last_result = result
             
-            print(f"\n{'='*60}")
-            print(f"[GLOBAL-SCHED] COMPLETED")
-            print(f"   Fetched: {result['total_fetched']} articles from {len(sources_list)} sources")
-            print(f"   Matched: {result['total_matches']}")
-            print(f"   Saved:   {total_saved} total across {len(user_save_counts)} users")
-            for uid, count in user_save_counts.items():
-                print(f"      User {uid}: {count} articles")
-            print(f"{'='*60}\n")
+            logger.info(
+                "[GLOBAL-SCHED] COMPLETED - fetched %s articles from %s sources, "
+                "matched %s, saved %s across %s users",
+                result['total_fetched'], len(sources_list), result['total_matches'],
+                total_saved, len(user_save_counts)
+            )
+            if logger.isEnabledFor(logging.DEBUG):
+                for uid, count in user_save_counts.items():
+                    logger.debug("      User %s: %s articles", uid, count)
             
         except Exception as e:
-            print(f"[GLOBAL-SCHED] ERROR: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("[GLOBAL-SCHED] ERROR: %s", e)
             
             error_result = {
                 "success": False,
@@ -472,10 +601,35 @@ class GlobalMonitoringScheduler:
                 self._last_run = datetime.utcnow()
                 self._last_result = error_result
         finally:
+            self._release_advisory_lock()
             db.close()
             self._executing = False
-            gc.collect()
-            print(f"[GLOBAL-SCHED] Memory cleaned (gc.collect)")
+            # Young-generation sweep only; older cycles are left to the normal GC thresholds
+            gc.collect(generation=0)
+    
+    def _load_expansions_cached(self, unique_keywords, loader) -> List[Dict[str, Any]]:
+        """
+        Return keyword expansions, reusing the previous run's result when the
+        keyword set and their translation timestamps are unchanged.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        for kw in sorted(unique_keywords, key=lambda k: k.id):
+            updated_at = kw.translations_updated_at
+            digest.update(f"{kw.id}|{kw.text_ar}|{updated_at.isoformat() if updated_at else ''}\n".encode())
+        key = digest.hexdigest()
+        
+        cached_key, built_at, cached = self._expansion_cache
+        if key == cached_key and built_at and datetime.utcnow() - built_at < EXPANSION_CACHE_MAX_AGE:
+            logger.info("[GLOBAL-SCHED] Keyword set unchanged - reusing %s cached expansions", len(cached))
+            return cached
+        
+        expansions = loader(unique_keywords)
+        # Only cache complete loads; a missing expansion should be retried next run
+        if expansions and len(expansions) == len(unique_keywords):
+            self._expansion_cache = (key, datetime.utcnow(), expansions)
+        else:
+            self._expansion_cache = ("", None, [])
+        return expansions
     
     # ── Multi-User Article Saving ─────────────────────────────────────
     
@@ -489,76 +643,45 @@ class GlobalMonitoringScheduler:
         Save matched articles to ALL users who have the matching keyword.
         
         For each match:
-        1. Translate/prepare the article ONCE (expensive)
-        2. Save to each user who has that keyword (cheap DB insert)
+        1. Work out which users still need it (skip it if none do)
+        2. Translate/prepare the article ONCE (expensive)
+        3. Save to each user who has that keyword (cheap DB insert)
+        
+        The run-wide save limit is applied by the caller (save_batch).
         
         Returns: (total_saved, {user_id: count})
         """
-        from models import Article
-        from multilingual_matcher import detect_article_language
-        from translation_cache import translate_article_to_arabic
-        from async_monitor_wrapper import extract_all_match_contexts, translate_snippet_preserve_keyword
-        from config import get_effective_save_limit, BALANCING_STRATEGY
-        
         total_saved = 0
         user_save_counts: Dict[int, int] = {}
         user_duplicate_counts: Dict[int, int] = {}
         user_eligible_counts: Dict[int, int] = {}
         duplicates = 0
         
-        # Apply save limit
-        limit = get_effective_save_limit()
-        if limit and len(matches) > limit:
-            print(f"[GLOBAL-SCHED] Applying save limit: {limit} (from {len(matches)} matches)")
-            matches = matches[:limit]
+        # In-run memo: the same URL or snippet can appear under several match
+        # tuples, and translation is by far the most expensive step.
+        # Shared by the prepare threads (single dict get/set is atomic).
+        trans_cache: Dict[str, Dict[str, Any]] = {}
+        snippet_cache: Dict[Tuple[str, str, str, str], str] = {}
         
         # Log the keyword→user distribution
         all_user_ids = set()
         for users in keyword_user_map.values():
             all_user_ids.update(users)
-        print(f"[GLOBAL-SCHED] keyword_user_map covers {len(all_user_ids)} users: {sorted(all_user_ids)}")
+        logger.debug("[GLOBAL-SCHED] keyword_user_map covers %s users: %s", len(all_user_ids), sorted(all_user_ids))
         
-        for article, source, matched_keywords in matches:
-            # ── Prepare article ONCE (expensive translation) ──────────
-            detected_lang = detect_article_language(article['title'], article['summary'])
-            
-            translation_result = translate_article_to_arabic(
-                article['title'],
-                article['summary'],
-                detected_lang
-            )
-            
-            title_ar = strip_html_tags(translation_result['title_ar'])
-            summary_ar = strip_html_tags(translation_result['summary_ar'])
-            
-            # Extract and translate match contexts
-            match_contexts = extract_all_match_contexts(
-                article, matched_keywords, words_before=20, words_after=20
-            )
-            
-            for context in match_contexts:
-                snippet = strip_html_tags(context.get('full_snippet', ''))
-                context['full_snippet'] = snippet
-                preserve_text = context.get('preserve_text', '')
-                keyword_arabic = context.get('keyword_ar', '')
-                
-                if snippet and detected_lang != 'ar':
-                    try:
-                        translated_snippet = translate_snippet_preserve_keyword(
-                            snippet, preserve_text, detected_lang, 'ar',
-                            keyword_ar=keyword_arabic
-                        )
-                        context['full_snippet_ar'] = strip_html_tags(translated_snippet)
-                        context['original_matched_text'] = preserve_text
-                    except Exception:
-                        context['full_snippet_ar'] = snippet
-                else:
-                    context['full_snippet_ar'] = snippet
-            
-            # Parse published date
-            published_datetime = self._parse_published_date(article.get('published_at'))
+        # Preload which (url, user_id) pairs already exist - one query per URL
+        # chunk instead of one SELECT per (match, user)
+        existing_pairs = self._load_existing_pairs(
+            db, [article['url'] for article, _, _ in matches], all_user_ids
+        )
+        
+        # ── Decide per match which users still need it (cheap) ──────
+        # Done before any translation so fully-duplicate matches cost nothing
+        to_prepare = []  # [(match, {user_id: that user's matched keywords})]
+        for match in matches:
+            article, _, matched_keywords = match
+            url = article['url']
             
-            # ── Save to EACH user who owns a matched keyword ─────────
             # Build per-user keyword lists: only give each user THEIR keywords
             user_matched_keywords: Dict[int, list] = {}
             for mk in matched_keywords:
@@ -568,78 +691,263 @@ class GlobalMonitoringScheduler:
                         user_matched_keywords[uid] = []
                     user_matched_keywords[uid].append(mk)
             
+            target_keywords: Dict[int, list] = {}
             for user_id, user_kws in user_matched_keywords.items():
                 user_eligible_counts[user_id] = user_eligible_counts.get(user_id, 0) + 1
                 
-                # Per-user duplicate check (composite unique: url + user_id)
-                exists = db.query(Article).filter(
-                    Article.url == article['url'],
-                    Article.user_id == user_id
-                ).first()
-                
-                if exists:
+                # Per-user duplicate check (composite unique: url + user_id);
+                # pairs planned by an earlier match in this batch count too
+                if (url, user_id) in existing_pairs:
                     duplicates += 1
                     user_duplicate_counts[user_id] = user_duplicate_counts.get(user_id, 0) + 1
                     continue
-                
-                # Use this user's first matched keyword as primary
-                user_primary = user_kws[0]['keyword_ar']
-                
-                # Build per-user keywords_info (only their keywords)
-                user_contexts = [c for c in match_contexts if c.get('keyword_ar', '') in [k['keyword_ar'] for k in user_kws]]
-                user_keywords_info = json.dumps({
-                    'primary': user_primary,
-                    'all_matched': [k['keyword_ar'] for k in user_kws],
-                    'match_details': user_kws,
-                    'match_contexts': user_contexts
-                }, ensure_ascii=False)
-                
-                new_article = Article(
-                    country=source['country_name'],
-                    source_name=source['name'],
-                    url=article['url'],
-                    title_original=strip_html_tags(article['title']),
-                    summary_original=strip_html_tags(article['summary']),
-                    original_language=detected_lang,
-                    image_url=article.get('image_url'),
-                    title_ar=title_ar,
-                    summary_ar=summary_ar,
-                    arabic_text=f"{title_ar} {summary_ar}",
-                    keyword=user_primary,
-                    keyword_original=user_primary,
-                    keywords_translations=user_keywords_info,
-                    sentiment_label="محايد",
-                    sentiment_score=None,
-                    published_at=published_datetime,
-                    fetched_at=datetime.utcnow(),
-                    user_id=user_id,
-                )
-                
-                db.add(new_article)
-                try:
-                    db.commit()
-                    total_saved += 1
-                    user_save_counts[user_id] = user_save_counts.get(user_id, 0) + 1
-                except Exception as e:
-                    db.rollback()
-                    print(f"[GLOBAL-SCHED] ⚠️ Save error for user {user_id}: {str(e)[:80]}")
+                target_keywords[user_id] = user_kws
+                existing_pairs.add((url, user_id))
+            
+            if target_keywords:
+                to_prepare.append((match, target_keywords))
+        
+        skipped = len(matches) - len(to_prepare)
+        if skipped:
+            logger.info("[GLOBAL-SCHED] %s matches already saved for all their users - not translated", skipped)
+        
+        # ── Prepare (translate) only what will be saved ─────────────
+        # Translation work overlaps across articles; DB work below stays on this thread
+        with ThreadPoolExecutor(max_workers=PREPARE_WORKERS, thread_name_prefix='global-prepare') as pool:
+            prepared_matches = list(pool.map(
+                lambda item: self._prepare_article(item[0], trans_cache, snippet_cache),
+                to_prepare
+            ))
+        
+        # ── Save to EACH user who owns a matched keyword ─────────
+        for (_, target_keywords), prepared in zip(to_prepare, prepared_matches):
+            for user_id in self._insert_for_users(db, prepared, target_keywords):
+                total_saved += 1
+                user_save_counts[user_id] = user_save_counts.get(user_id, 0) + 1
         
         # Diagnostic summary
-        print(f"\n[GLOBAL-SCHED] 📊 Save diagnostics:")
-        print(f"   Total duplicates skipped: {duplicates}")
-        print(f"   Per-user breakdown:")
-        for uid in sorted(all_user_ids):
-            eligible = user_eligible_counts.get(uid, 0)
-            dupes = user_duplicate_counts.get(uid, 0)
-            saved = user_save_counts.get(uid, 0)
-            if eligible == 0:
-                print(f"      User {uid}: 0 eligible (no matching keywords in this batch)")
-            else:
-                print(f"      User {uid}: {eligible} eligible → {dupes} duplicates, {saved} NEW saved")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[GLOBAL-SCHED] 📊 Save diagnostics - per-user breakdown:")
+            for uid in sorted(all_user_ids):
+                eligible = user_eligible_counts.get(uid, 0)
+                dupes = user_duplicate_counts.get(uid, 0)
+                saved = user_save_counts.get(uid, 0)
+                if eligible == 0:
+                    logger.debug("      User %s: 0 eligible (no matching keywords in this batch)", uid)
+                else:
+                    logger.debug("      User %s: %s eligible → %s duplicates, %s NEW saved", uid, eligible, dupes, saved)
         
-        print(f"[GLOBAL-SCHED] Saved {total_saved} articles, skipped {duplicates} duplicates")
+        logger.info("[GLOBAL-SCHED] Saved %s articles, skipped %s duplicates", total_saved, duplicates)
         return total_saved, user_save_counts
     
+    def _prepare_article(
+        self,
+        match: tuple,
+        trans_cache: Dict[str, Dict[str, Any]],
+        snippet_cache: Dict[Tuple[str, str, str, str], str]
+    ) -> Dict[str, Any]:
+        """
+        Translate + extract contexts for one match (network-bound, thread-safe).
+        
+        Returns:
+            {'base_row': Article column values shared by every user,
+             'match_contexts': translated contexts for all matched keywords}
+        """
+        from multilingual_matcher import detect_article_language
+        from translation_cache import translate_article_to_arabic
+        from async_monitor_wrapper import extract_all_match_contexts, translate_snippets_batch
+        from models import url_hash
+        
+        article, source, matched_keywords = match
+        
+        # ── Prepare article ONCE (expensive translation) ──────────
+        detected_lang = detect_article_language(article['title'], article['summary'])
+        
+        translation_result = trans_cache.get(article['url'])
+        if translation_result is None:
+            translation_result = translate_article_to_arabic(
+                article['title'],
+                article['summary'],
+                detected_lang
+            )
+            trans_cache[article['url']] = translation_result
+        
+        title_ar = strip_html_tags(translation_result['title_ar'])
+        summary_ar = strip_html_tags(translation_result['summary_ar'])
+        
+        # Extract and translate match contexts
+        match_contexts = extract_all_match_contexts(
+            article, matched_keywords, words_before=20, words_after=20
+        )
+        
+        # Snippets not yet translated this run, translated in one batch
+        pending = []
+        for context in match_contexts:
+            snippet = strip_html_tags(context.get('full_snippet', ''))
+            context['full_snippet'] = snippet
+            context['full_snippet_ar'] = snippet
+            
+            if snippet and detected_lang != 'ar':
+                preserve_text = context.get('preserve_text', '')
+                snippet_key = (snippet, detected_lang, preserve_text, context.get('keyword_ar', ''))
+                context['original_matched_text'] = preserve_text
+                if snippet_key in snippet_cache:
+                    context['full_snippet_ar'] = snippet_cache[snippet_key]
+                else:
+                    pending.append((context, snippet_key))
+        
+        if pending:
+            unique_keys = list(dict.fromkeys(key for _, key in pending))
+            translated = translate_snippets_batch(
+                [key[0] for key in unique_keys],
+                [key[2] for key in unique_keys],
+                detected_lang, 'ar',
+                keywords_ar=[key[3] for key in unique_keys]
+            )
+            for key, out in zip(unique_keys, translated):
+                snippet_cache[key] = strip_html_tags(out)
+            for context, key in pending:
+                context['full_snippet_ar'] = snippet_cache[key]
+        
+        # Everything below is identical for every user - bake it once
+        base_row = dict(
+            country=source['country_name'],
+            source_name=source['name'],
+            url=article['url'],
+            url_hash=url_hash(article['url']),
+            title_original=strip_html_tags(article['title']),
+            summary_original=strip_html_tags(article['summary']),
+            original_language=detected_lang,
+            image_url=article.get('image_url'),
+            title_ar=title_ar,
+            summary_ar=summary_ar,
+            arabic_text=f"{title_ar} {summary_ar}",
+            sentiment_label="محايد",
+            sentiment_score=None,
+            published_at=self._parse_published_date(article.get('published_at')),
+        )
+        return {'base_row': base_row, 'match_contexts': match_contexts}
+    
+    def _insert_for_users(
+        self,
+        db,
+        prepared: Dict[str, Any],
+        user_keywords: Dict[int, list]
+    ) -> List[int]:
+        """
+        Save one prepared article to each user in user_keywords
+        ({user_id: that user's matched keyword dicts}).
+        
+        Returns the user_ids whose rows were inserted.
+        """
+        base_row = prepared['base_row']
+        match_contexts = prepared['match_contexts']
+        fetched_at = datetime.utcnow()
+        
+        rows: List[Dict[str, Any]] = []
+        for user_id, user_kws in user_keywords.items():
+            # Use this user's first matched keyword as primary
+            user_primary = user_kws[0]['keyword_ar']
+            
+            # Build per-user keywords_info (only their keywords)
+            user_kw_texts = {k['keyword_ar'] for k in user_kws}
+            user_contexts = [c for c in match_contexts if c.get('keyword_ar', '') in user_kw_texts]
+            user_keywords_info = json.dumps({
+                'primary': user_primary,
+                'all_matched': [k['keyword_ar'] for k in user_kws],
+                'match_details': user_kws,
+                'match_contexts': user_contexts
+            }, ensure_ascii=False)
+            
+            rows.append(dict(
+                base_row,
+                keyword=user_primary,
+                keyword_original=user_primary,
+                keywords_translations=user_keywords_info,
+                fetched_at=fetched_at,
+                user_id=user_id,
+            ))
+        
+        # One INSERT batch + one commit per article (not per user)
+        return self._insert_article_rows(db, rows)
+    
+    @staticmethod
+    def _insert_article_rows(db, rows: List[Dict[str, Any]]) -> List[int]:
+        """
+        Insert Article rows for one matched article in a single batch + commit.
+        
+        Uses Core inserts against the articles table (no ORM instances or
+        unit-of-work flush - these rows are never read back). On PostgreSQL
+        it's INSERT ... ON CONFLICT DO NOTHING on (url_hash, user_id), so concurrent
+        duplicates are dropped by the DB. Elsewhere it's an executemany.
+        If the batch fails, rows are retried one by one, each in its own
+        SAVEPOINT, and the ones that succeed are committed together.
+        
+        Returns the user_ids whose rows were actually inserted.
+        """
+        from models import Article
+        
+        if not rows:
+            return []
+        
+        articles = Article.__table__
+        try:
+            # SAVEPOINT around the batch: a failure only undoes the batch,
+            # not the session's outer transaction
+            with db.begin_nested():
+                if db.get_bind().dialect.name == 'postgresql':
+                    from sqlalchemy.dialects.postgresql import insert as pg_insert
+                    stmt = (
+                        pg_insert(articles)
+                        .values(rows)
+                        .on_conflict_do_nothing(index_elements=['url_hash', 'user_id'])
+                        .returning(articles.c.user_id)
+                    )
+                    inserted = list(db.execute(stmt).scalars())
+                else:
+                    db.execute(articles.insert(), rows)
+                    inserted = [row['user_id'] for row in rows]
+        except Exception as e:
+            if len(rows) == 1:
+                logger.warning("[GLOBAL-SCHED] ⚠️ Save error for user %s: %s", rows[0]['user_id'], str(e)[:80])
+                db.rollback()
+                return []
+            
+            # Batch failed: retry each row in its own SAVEPOINT so one bad row
+            # doesn't drop the rest, then commit the survivors together
+            inserted = []
+            for row in rows:
+                try:
+                    with db.begin_nested():
+                        db.execute(articles.insert(), [row])
+                    inserted.append(row['user_id'])
+                except Exception as e:
+                    logger.warning("[GLOBAL-SCHED] ⚠️ Save error for user %s: %s", row['user_id'], str(e)[:80])
+        
+        db.commit()
+        return inserted
+    
+    @staticmethod
+    def _load_existing_pairs(db, urls: List[str], user_ids: Set[int]) -> Set[Tuple[str, int]]:
+        """Return the (url, user_id) pairs among urls × user_ids already saved."""
+        from models import Article, url_hash
+        
+        existing: Set[Tuple[str, int]] = set()
+        if not urls or not user_ids:
+            return existing
+        
+        # Probe by 8-byte url_hash and confirm the URL itself
+        unique_urls = list(dict.fromkeys(urls))
+        user_id_list = list(user_ids)
+        for i in range(0, len(unique_urls), EXISTING_URL_CHUNK):
+            url_chunk = set(unique_urls[i:i + EXISTING_URL_CHUNK])
+            rows = db.query(Article.url, Article.user_id).filter(
+                Article.url_hash.in_([url_hash(url) for url in url_chunk]),
+                Article.user_id.in_(user_id_list)
+            )
+            existing.update((url, uid) for url, uid in rows if url in url_chunk)
+        return existing
+    
     @staticmethod
     def _parse_published_date(date_val) -> Optional[datetime]:
         """Parse published date from various formats"""
@@ -648,11 +956,14 @@ class GlobalMonitoringScheduler:
         if isinstance(date_val, datetime):
             return date_val
         if isinstance(date_val, str):
-            for fmt in ('%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d'):
+            # Fast path: 'YYYY-MM-DD[T| ]HH:MM:SS...' or a bare 'YYYY-MM-DD'
+            m = _DATE_RE.match(date_val)
+            if m and (m.group(4) is not None or len(date_val) == 10):
+                y, mo, d, h, mi, sec = m.groups()
                 try:
-                    return datetime.strptime(date_val[:19], fmt)
-                except (ValueError, IndexError):
-                    continue
+                    return datetime(int(y), int(mo), int(d), int(h or 0), int(mi or 0), int(sec or 0))
+                except ValueError:
+                    pass
             # Try ISO format
             try:
                 return datetime.fromisoformat(date_val.replace('Z', '+00:00').replace('+00:00', ''))
@@ -661,5 +972,5 @@ class GlobalMonitoringScheduler:
         return None
 
 
-# Global singleton instance
+# The one scheduler instance per process (module import is thread-safe)
 global_scheduler = GlobalMonitoringScheduler()
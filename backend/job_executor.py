@@ -20,13 +20,18 @@ Usage:
     # Cancel a job
     job_executor.cancel_job(job_id, user_id)
 """
+import logging
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional, Dict, Any, Set
 from contextlib import contextmanager
 import traceback
 
+logger = logging.getLogger(__name__)
+
 
 class JobExecutor:
     """
@@ -43,36 +48,37 @@ class JobExecutor:
     JOB_TIMEOUT_SECONDS = 300  # 5 minutes max per job
     RATE_LIMIT_WINDOW = 3600  # 1 hour window for rate limiting
     MAX_JOBS_PER_HOUR = 10    # Max jobs per user per hour
-    
-    _instance = None
-    _lock = threading.Lock()
-    
-    def __new__(cls):
-        """Singleton pattern for global executor"""
-        if cls._instance is None:
-            with cls._lock:
-                if cls._instance is None:
-                    cls._instance = super().__new__(cls)
-                    cls._instance._initialized = False
-        return cls._instance
+    PROGRESS_FLUSH_INTERVAL = 0.5  # Seconds between batched progress writes
+    REAP_INTERVAL = 30  # Seconds between JOB_TIMEOUT_SECONDS checks
     
     def __init__(self):
-        if self._initialized:
-            return
-        self._initialized = True
-        
-        # Threading controls
-        self._global_semaphore = threading.Semaphore(self.MAX_CONCURRENT_JOBS)
+        # Threading controls: one bounded pool runs every job, so its size is
+        # the global concurrency limit and worker threads are reused
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.MAX_CONCURRENT_JOBS,
+            thread_name_prefix="MonitorJob"
+        )
         self._user_locks: Dict[int, threading.Lock] = {}
         self._user_locks_lock = threading.Lock()
         
+        # One lock guards both in-memory job maps; every critical section
+        # is a few dict/set operations, so holding two locks bought nothing
+        self._state_lock = threading.Lock()
+        
         # Active jobs tracking (for cancellation)
-        self._active_jobs: Dict[int, Dict[str, Any]] = {}  # job_id -> {thread, cancel_event, user_id}
-        self._active_jobs_lock = threading.Lock()
+        self._active_jobs: Dict[int, Dict[str, Any]] = {}  # job_id -> {future, cancel_event, user_id}
         
         # Running users (for per-user limits)
         self._running_users: Set[int] = set()
-        self._running_users_lock = threading.Lock()
+        
+        # Live progress per running job, persisted in batches by a flusher thread
+        self._live_progress: Dict[int, Dict[str, Any]] = {}
+        self._pending_progress: Set[int] = set()
+        self._progress_thread: Optional[threading.Thread] = None
+        
+        # Enforces JOB_TIMEOUT_SECONDS; started with the first job (not at
+        # import, so it also exists in forked workers)
+        self._reaper: Optional[threading.Thread] = None
     
     def _get_user_lock(self, user_id: int) -> threading.Lock:
         """Get or create a lock for a specific user"""
@@ -82,7 +88,12 @@ class JobExecutor:
             return self._user_locks[user_id]
     
     def _check_rate_limit(self, db, user_id: int) -> bool:
-        """Check if user has exceeded rate limit"""
+        """
+        Check if user has exceeded rate limit.
+        
+        Counted in the DB (served by ix_monitor_jobs_user_created) so the
+        limit holds across all gunicorn workers.
+        """
         from models import MonitorJob
         
         window_start = datetime.utcnow() - timedelta(seconds=self.RATE_LIMIT_WINDOW)
@@ -93,13 +104,25 @@ class JobExecutor:
         
         return recent_jobs < self.MAX_JOBS_PER_HOUR
     
-    def _get_active_job_for_user(self, db, user_id: int):
-        """Get any active (QUEUED or RUNNING) job for a user"""
+    @staticmethod
+    def _active_job_filter(user_id: int):
+        """WHERE clause for a user's active (QUEUED or RUNNING) job"""
         from models import MonitorJob
         
-        return db.query(MonitorJob).filter(
+        return (
             MonitorJob.user_id == user_id,
             MonitorJob.status.in_(['QUEUED', 'RUNNING'])
+        )
+    
+    def _get_active_job_for_user(self, db, user_id: int):
+        """Get (id, status) of any active (QUEUED or RUNNING) job for a user"""
+        from models import MonitorJob
+        from sqlalchemy import select
+        
+        return db.execute(
+            select(MonitorJob.id, MonitorJob.status)
+            .where(*self._active_job_filter(user_id))
+            .limit(1)
         ).first()
     
     def start_monitoring_job(self, user_id: int) -> Dict[str, Any]:
@@ -133,7 +156,7 @@ class JobExecutor:
                 }
             
             # Check global capacity
-            with self._running_users_lock:
+            with self._state_lock:
                 if len(self._running_users) >= self.MAX_CONCURRENT_JOBS:
                     return {
                         'success': False,
@@ -157,28 +180,29 @@ class JobExecutor:
             # Create cancel event for this job
             cancel_event = threading.Event()
             
-            # Start background thread
-            thread = threading.Thread(
-                target=self._execute_job,
-                args=(job_id, user_id, cancel_event),
-                daemon=True,
-                name=f"MonitorJob-{job_id}"
-            )
-            
-            # Track active job
-            with self._active_jobs_lock:
+            # Track active job and mark user as running (before submitting,
+            # so the job's own cleanup can't run first)
+            with self._state_lock:
                 self._active_jobs[job_id] = {
-                    'thread': thread,
+                    'future': None,
                     'cancel_event': cancel_event,
                     'user_id': user_id,
                     'started': datetime.utcnow()
                 }
-            
-            # Mark user as running
-            with self._running_users_lock:
                 self._running_users.add(user_id)
-            
-            thread.start()
+                if self._reaper is None:
+                    self._reaper = threading.Thread(
+                        target=self._reap_loop,
+                        daemon=True,
+                        name="MonitorJob-reaper"
+                    )
+                    self._reaper.start()
+            
+            # Run on the shared job pool
+            future = self._pool.submit(self._execute_job, job_id, user_id, cancel_event)
+            with self._state_lock:
+                if job_id in self._active_jobs:
+                    self._active_jobs[job_id]['future'] = future
             
             return {
                 'success': True,
@@ -200,37 +224,35 @@ class JobExecutor:
     
     def _execute_job(self, job_id: int, user_id: int, cancel_event: threading.Event):
         """
-        Execute the monitoring job in a background thread.
+        Execute the monitoring job on a job pool thread.
         
         This is where the actual monitoring work happens.
         """
         from models import get_db, MonitorJob, Source, Keyword, Article
+        from sqlalchemy import update
         from keyword_expansion import load_expansions_from_keywords
-        from async_monitor_wrapper import run_optimized_monitoring, save_matched_articles_sync
-        
-        # Acquire global semaphore
-        acquired = self._global_semaphore.acquire(timeout=60)
-        if not acquired:
-            self._fail_job(job_id, "Could not acquire execution slot")
-            self._cleanup_job(job_id, user_id)
-            return
+        from async_monitor_wrapper import run_optimized_monitoring, save_matched_articles_batched
         
         db = get_db()
         try:
-            # Update status to RUNNING
-            job = db.query(MonitorJob).filter(MonitorJob.id == job_id).first()
-            if not job:
-                return
-            
-            job.status = 'RUNNING'
-            job.started_at = datetime.utcnow()
-            job.progress = 5
-            job.progress_message = 'Loading sources and keywords...'
+            # Update status to RUNNING (single UPDATE; no row means no job)
+            started = db.execute(
+                update(MonitorJob)
+                .where(MonitorJob.id == job_id)
+                .values(
+                    status='RUNNING',
+                    started_at=datetime.utcnow(),
+                    progress=5,
+                    progress_message='Loading sources and keywords...'
+                )
+            )
             db.commit()
+            if not started.rowcount:
+                return
             
             # Check cancellation
             if cancel_event.is_set():
-                self._cancel_job_internal(db, job)
+                self._cancel_job_internal(db, job_id)
                 return
             
             # Get sources and keywords
@@ -241,26 +263,22 @@ class JobExecutor:
             ).all()
             
             if not sources:
-                job.status = 'FAILED'
-                job.error_message = 'No enabled sources'
-                job.finished_at = datetime.utcnow()
-                db.commit()
+                self._terminate_job(db, job_id, 'FAILED', 'No enabled sources')
                 return
             
             if not keywords:
-                job.status = 'FAILED'
-                job.error_message = 'No enabled keywords'
-                job.finished_at = datetime.utcnow()
-                db.commit()
+                self._terminate_job(db, job_id, 'FAILED', 'No enabled keywords')
                 return
             
             # Update progress
-            job.progress = 10
-            job.progress_message = f'Loaded {len(sources)} sources, {len(keywords)} keywords'
-            db.commit()
+            self._flush_progress(
+                job_id,
+                progress=10,
+                progress_message=f'Loaded {len(sources)} sources, {len(keywords)} keywords'
+            )
             
             if cancel_event.is_set():
-                self._cancel_job_internal(db, job)
+                self._cancel_job_internal(db, job_id)
                 return
             
             # Convert to dicts
@@ -273,29 +291,26 @@ class JobExecutor:
             } for s in sources]
             
             # Load keyword expansions
-            job.progress = 15
-            job.progress_message = 'Loading keyword expansions...'
-            db.commit()
+            self._flush_progress(job_id, progress=15, progress_message='Loading keyword expansions...')
             
             keyword_expansions = load_expansions_from_keywords(keywords)
             
             if not keyword_expansions:
-                job.status = 'FAILED'
-                job.error_message = 'No keyword expansions found'
-                job.finished_at = datetime.utcnow()
-                db.commit()
+                self._terminate_job(db, job_id, 'FAILED', 'No keyword expansions found')
                 return
             
             if cancel_event.is_set():
-                self._cancel_job_internal(db, job)
+                self._cancel_job_internal(db, job_id)
                 return
             
             # Fetch feeds (this is the slow part)
-            job.progress = 20
-            job.progress_message = f'Fetching {len(sources_list)} RSS feeds...'
-            db.commit()
+            self._flush_progress(
+                job_id,
+                progress=20,
+                progress_message=f'Fetching {len(sources_list)} RSS feeds...'
+            )
             
-            print(f"[JOB {job_id}] Starting RSS fetch for user {user_id}")
+            logger.info("[JOB %s] Starting RSS fetch for user %s", job_id, user_id)
             
             monitoring_result = run_optimized_monitoring(
                 sources_list,
@@ -305,103 +320,219 @@ class JobExecutor:
             )
             
             if cancel_event.is_set():
-                self._cancel_job_internal(db, job)
+                self._cancel_job_internal(db, job_id)
                 return
             
             # Update with fetch results
-            job.total_fetched = monitoring_result.get('total_fetched', 0)
-            job.progress = 60
-            job.progress_message = f'Fetched {job.total_fetched} articles, matching keywords...'
-            db.commit()
+            total_fetched = monitoring_result.get('total_fetched', 0)
+            self._flush_progress(
+                job_id,
+                progress=60,
+                progress_message=f'Fetched {total_fetched} articles, matching keywords...',
+                total_fetched=total_fetched
+            )
             
             matches = monitoring_result.get('matches', [])
-            job.total_matched = len(matches)
+            total_matched = len(matches)
             
             if not matches:
-                job.status = 'SUCCEEDED'
-                job.progress = 100
-                job.progress_message = 'No matching articles found'
-                job.finished_at = datetime.utcnow()
-                db.commit()
-                print(f"[JOB {job_id}] Completed - no matches")
+                self._terminate_job(
+                    db, job_id, 'SUCCEEDED', 'No matching articles found',
+                    total_fetched=total_fetched, total_matched=0
+                )
+                logger.info("[JOB %s] Completed - no matches", job_id)
                 return
             
             if cancel_event.is_set():
-                self._cancel_job_internal(db, job)
+                self._cancel_job_internal(db, job_id)
                 return
             
             # Save matched articles
-            job.progress = 70
-            job.progress_message = f'Saving {len(matches)} matched articles...'
-            db.commit()
+            self._flush_progress(
+                job_id,
+                progress=70,
+                progress_message=f'Saving {len(matches)} matched articles...',
+                total_matched=total_matched
+            )
             
-            saved_ids, save_stats = save_matched_articles_sync(
+            saved_ids, save_stats = save_matched_articles_batched(
                 db,
                 matches,
                 apply_limit=True,
-                user_id=user_id
+                user_id=user_id,
+                on_progress=lambda done, total: self._flush_progress(
+                    job_id,
+                    progress=70 + 25 * done // total,
+                    progress_message=f'Saving matched articles ({done}/{total})...'
+                )
             )
             
             # Final update
-            job.total_saved = len(saved_ids)
-            job.status = 'SUCCEEDED'
-            job.progress = 100
-            job.progress_message = f'Completed: {len(saved_ids)} articles saved'
-            job.finished_at = datetime.utcnow()
-            db.commit()
+            self._terminate_job(
+                db, job_id, 'SUCCEEDED', f'Completed: {len(saved_ids)} articles saved',
+                total_fetched=total_fetched,
+                total_matched=total_matched,
+                total_saved=len(saved_ids)
+            )
             
-            print(f"[JOB {job_id}] Completed - saved {len(saved_ids)} articles")
+            logger.info("[JOB %s] Completed - saved %s articles", job_id, len(saved_ids))
             
         except Exception as e:
-            traceback.print_exc()
-            print(f"[JOB {job_id}] Failed: {str(e)}")
+            logger.exception("[JOB %s] Failed: %s", job_id, e)
             
             try:
-                job = db.query(MonitorJob).filter(MonitorJob.id == job_id).first()
-                if job:
-                    job.status = 'FAILED'
-                    job.error_message = str(e)[:500]  # Truncate long errors
-                    job.finished_at = datetime.utcnow()
-                    db.commit()
+                db.rollback()
+                self._terminate_job(db, job_id, 'FAILED', str(e)[:500])  # Truncate long errors
             except:
                 pass
                 
         finally:
             db.close()
-            self._global_semaphore.release()
             self._cleanup_job(job_id, user_id)
     
-    def _cancel_job_internal(self, db, job):
-        """Internal method to mark job as cancelled"""
-        job.status = 'CANCELLED'
-        job.progress_message = 'Job cancelled by user'
-        job.finished_at = datetime.utcnow()
+    def _terminate_job(self, db, job_id: int, status: str, message: str, **fields) -> bool:
+        """
+        Move a job to a terminal state with one UPDATE and one commit.
+        
+        Args:
+            db: Session to use
+            job_id: Job to finish
+            status: 'SUCCEEDED', 'FAILED' or 'CANCELLED'
+            message: error_message for FAILED, progress_message otherwise
+            **fields: Extra columns to set (e.g. total_saved)
+            
+        Returns:
+            True if the job was still active and got updated
+        """
+        from models import MonitorJob
+        from sqlalchemy import update
+        
+        values = dict(fields, status=status, finished_at=datetime.utcnow())
+        if status == 'FAILED':
+            values['error_message'] = message
+        else:
+            values['progress_message'] = message
+        if status == 'SUCCEEDED':
+            values['progress'] = 100
+        
+        # Only active jobs: the first terminal state wins
+        result = db.execute(
+            update(MonitorJob)
+            .where(MonitorJob.id == job_id, MonitorJob.status.in_(['QUEUED', 'RUNNING']))
+            .values(**values)
+        )
         db.commit()
-        print(f"[JOB {job.id}] Cancelled")
+        return bool(result.rowcount)
+    
+    def _cancel_job_internal(self, db, job_id: int):
+        """Internal method to mark job as cancelled"""
+        self._terminate_job(db, job_id, 'CANCELLED', 'Job cancelled by user')
+        logger.info("[JOB %s] Cancelled", job_id)
     
     def _fail_job(self, job_id: int, error_message: str):
         """Mark a job as failed"""
+        from models import get_db
+        
+        db = get_db()
+        try:
+            self._terminate_job(db, job_id, 'FAILED', error_message)
+        finally:
+            db.close()
+    
+    def _reap_loop(self):
+        """Fail and cancel jobs that have been running longer than JOB_TIMEOUT_SECONDS"""
+        while True:
+            time.sleep(self.REAP_INTERVAL)
+            cutoff = datetime.utcnow() - timedelta(seconds=self.JOB_TIMEOUT_SECONDS)
+            with self._state_lock:
+                expired = [
+                    (job_id, info['cancel_event'])
+                    for job_id, info in self._active_jobs.items()
+                    if info['started'] < cutoff and not info['cancel_event'].is_set()
+                ]
+            
+            for job_id, cancel_event in expired:
+                # Write FAILED first: terminal states only apply to active jobs,
+                # so the job's own CANCELLED update at its next cancellation
+                # checkpoint becomes a no-op
+                try:
+                    self._fail_job(job_id, f"Job timed out after {self.JOB_TIMEOUT_SECONDS}s")
+                    logger.warning("[JOB %s] Timed out - cancelling", job_id)
+                except Exception as e:
+                    logger.warning("[JOB %s] ⚠️ Could not mark timed-out job: %s", job_id, str(e)[:100])
+                cancel_event.set()
+    
+    def _flush_progress(self, job_id: int, **fields):
+        """
+        Record cosmetic progress for a running job.
+        
+        The fields are visible immediately through get_job_status and are
+        written to the DB by the flusher thread, one UPDATE per job every
+        PROGRESS_FLUSH_INTERVAL instead of a commit per call. Status
+        transitions are still committed synchronously by the caller.
+        """
+        with self._state_lock:
+            self._live_progress.setdefault(job_id, {}).update(fields)
+            self._pending_progress.add(job_id)
+            if self._progress_thread is None:
+                self._progress_thread = threading.Thread(
+                    target=self._progress_flush_loop,
+                    daemon=True,
+                    name="MonitorJob-progress"
+                )
+                self._progress_thread.start()
+    
+    def _progress_flush_loop(self):
+        """Background loop persisting batched progress updates"""
+        while True:
+            time.sleep(self.PROGRESS_FLUSH_INTERVAL)
+            with self._state_lock:
+                batch = {
+                    job_id: dict(self._live_progress[job_id])
+                    for job_id in self._pending_progress
+                    if job_id in self._live_progress
+                }
+                self._pending_progress.clear()
+            if batch:
+                self._write_progress(batch)
+    
+    def _write_progress(self, batch: Dict[int, Dict[str, Any]]):
+        """Write one batch of progress updates in a single transaction"""
         from models import get_db, MonitorJob
+        from sqlalchemy import update
         
         db = get_db()
         try:
-            job = db.query(MonitorJob).filter(MonitorJob.id == job_id).first()
-            if job:
-                job.status = 'FAILED'
-                job.error_message = error_message
-                job.finished_at = datetime.utcnow()
-                db.commit()
+            for job_id, fields in batch.items():
+                # Never overwrite a job that already reached a terminal state
+                db.execute(
+                    update(MonitorJob)
+                    .where(MonitorJob.id == job_id, MonitorJob.status.in_(['QUEUED', 'RUNNING']))
+                    .values(**fields)
+                )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning("[JOB] ⚠️ Progress flush failed: %s", str(e)[:100])
         finally:
             db.close()
     
+    def _with_live_progress(self, job_dict: Dict[str, Any]) -> Dict[str, Any]:
+        """Overlay not-yet-persisted progress onto an active job's dict"""
+        if job_dict['status'] in ('QUEUED', 'RUNNING'):
+            with self._state_lock:
+                live = self._live_progress.get(job_dict['id'])
+                if live:
+                    job_dict.update(live)
+        return job_dict
+    
     def _cleanup_job(self, job_id: int, user_id: int):
         """Clean up after job completion"""
-        with self._active_jobs_lock:
-            if job_id in self._active_jobs:
-                del self._active_jobs[job_id]
-        
-        with self._running_users_lock:
+        with self._state_lock:
+            self._active_jobs.pop(job_id, None)
             self._running_users.discard(user_id)
+            self._live_progress.pop(job_id, None)
+            self._pending_progress.discard(job_id)
     
     def get_job_status(self, job_id: int, user_id: int) -> Optional[Dict[str, Any]]:
         """Get status of a specific job (must belong to user)"""
@@ -417,7 +548,7 @@ class JobExecutor:
             if not job:
                 return None
             
-            return job.to_dict()
+            return self._with_live_progress(job.to_dict())
         finally:
             db.close()
     
@@ -438,11 +569,14 @@ class JobExecutor:
     def get_active_job(self, user_id: int) -> Optional[Dict[str, Any]]:
         """Get active job for a user (if any)"""
         from models import get_db, MonitorJob
+        from sqlalchemy import select
         
         db = get_db()
         try:
-            job = self._get_active_job_for_user(db, user_id)
-            return job.to_dict() if job else None
+            job = db.execute(
+                select(MonitorJob).where(*self._active_job_filter(user_id)).limit(1)
+            ).scalar()
+            return self._with_live_progress(job.to_dict()) if job else None
         finally:
             db.close()
     
@@ -451,7 +585,7 @@ class JobExecutor:
         from models import get_db, MonitorJob
         
         # Check if job is in active jobs
-        with self._active_jobs_lock:
+        with self._state_lock:
             if job_id in self._active_jobs:
                 job_info = self._active_jobs[job_id]
                 if job_info['user_id'] != user_id:
@@ -494,11 +628,10 @@ class JobExecutor:
     
     def get_system_status(self) -> Dict[str, Any]:
         """Get overall system status (for admin)"""
-        with self._running_users_lock:
+        # Snapshot both under one lock so the counts agree with each other
+        with self._state_lock:
             running_count = len(self._running_users)
-        
-        with self._active_jobs_lock:
-            active_jobs = list(self._active_jobs.keys())
+            active_jobs = list(self._active_jobs)
         
         return {
             'max_concurrent_jobs': self.MAX_CONCURRENT_JOBS,
@@ -508,5 +641,11 @@ class JobExecutor:
         }
 
 
+@lru_cache(maxsize=None)
+def get_job_executor() -> JobExecutor:
+    """The process-wide executor (created once, no per-call locking)"""
+    return JobExecutor()
+
+
 # Global executor instance
-job_executor = JobExecutor()
+job_executor = get_job_executor()
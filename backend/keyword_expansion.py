@@ -6,79 +6,537 @@ PHASE 2 UPDATE: Translations now stored in DATABASE (keywords.translations_json)
 instead of RAM cache. This fixes the "No keyword expansions" error after restarts.
 """
 import os
-from datetime import datetime, timedelta
+import logging
+import threading
+import time
+import types
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
+from datetime import datetime, timedelta, timezone
+import requests
 from deep_translator import GoogleTranslator
 from arabic_utils import normalize_arabic
 from proper_noun_rules import get_proper_noun_forms, is_known_proper_noun
 import json
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    from google.cloud import translate_v3
+    HAS_CLOUD_TRANSLATE = True
+except ImportError:
+    HAS_CLOUD_TRANSLATE = False
+
+logger = logging.getLogger(__name__)
+
 # Configuration from environment
 # Expanded to cover ALL major languages from our sources (30+ languages)
-TRANSLATE_TARGETS = os.getenv(
-    'TRANSLATE_TARGETS', 
-    'en,fr,es,de,ru,zh-cn,ja,hi,id,pt,tr,ar,ko,it,nl,pl,vi,th,uk,ro,el,cs,sv,hu,fi,da,no,sk,bg,hr,ms,fa,ur'
-).split(',')
+# Normalized once here so expand_keyword doesn't strip/lower per call
+TRANSLATE_TARGETS = tuple(
+    lang.strip().lower()
+    for lang in os.getenv(
+        'TRANSLATE_TARGETS', 
+        'en,fr,es,de,ru,zh-cn,ja,hi,id,pt,tr,ar,ko,it,nl,pl,vi,th,uk,ro,el,cs,sv,hu,fi,da,no,sk,bg,hr,ms,fa,ur'
+    ).split(',')
+)
+TARGET_SET = frozenset(TRANSLATE_TARGETS)
+# Targets that can need a Google request ('ar' is the source text itself)
+REQUEST_TARGETS = tuple(lang for lang in TRANSLATE_TARGETS if lang != 'ar')
 EXPANSION_TTL_DAYS = int(os.getenv('EXPANSION_TTL_DAYS', '365'))
+# Past this age translations are still served but re-expanded in the background
+EXPANSION_REFRESH_DAYS = int(os.getenv('EXPANSION_REFRESH_DAYS', str(EXPANSION_TTL_DAYS * 9 // 10)))
 TRANSLATION_TIMEOUT_S = int(os.getenv('TRANSLATION_TIMEOUT_S', '8'))
+# Google starts answering 429 past a few requests/second per client IP
+TRANSLATE_RATE_PER_S = float(os.getenv('TRANSLATE_RATE_PER_S', '5'))
+TRANSLATE_MAX_ATTEMPTS = int(os.getenv('TRANSLATE_MAX_ATTEMPTS', '4'))
+TRANSLATE_BACKOFF_MAX_S = 30
+# Keyword rows per executemany UPDATE when saving a batch
+BULK_UPDATE_ROWS = 1000
+# Legacy per-language columns kept in sync with translations_json
+_LEGACY_COLUMNS = (
+    ('en', 'text_en'), ('fr', 'text_fr'), ('es', 'text_es'), ('ru', 'text_ru'),
+    ('tr', 'text_tr'), ('zh-cn', 'text_zh'), ('ur', 'text_ur'),
+)
+# The free endpoint rejects texts over 5000 chars; batches are split below that
+TRANSLATE_REQUEST_CHARS = 4500
+# Overall wait for one batch, covering rate limiting and retries
+TRANSLATION_DEADLINE_S = int(os.getenv('TRANSLATION_DEADLINE_S', '60'))
+# Max Google requests in flight per process (TRANSLATION_WORKERS kept as the old name)
+TRANSLATE_CONCURRENCY = int(os.getenv('TRANSLATE_CONCURRENCY', os.getenv('TRANSLATION_WORKERS', '16')))
 
+# Official Cloud Translation API (v3) instead of the free web endpoint when a
+# project is configured and google-cloud-translate is installed
+GOOGLE_CLOUD_PROJECT = os.getenv('GOOGLE_CLOUD_PROJECT', '')
+GOOGLE_CLOUD_TRANSLATE_LOCATION = os.getenv('GOOGLE_CLOUD_TRANSLATE_LOCATION', 'global')
+USE_CLOUD_TRANSLATE = HAS_CLOUD_TRANSLATE and bool(GOOGLE_CLOUD_PROJECT)
+CLOUD_BATCH_SIZE = 128
+# Our codes are lower-cased; Google wants BCP-47 casing
+_GOOGLE_LANG_CODES = {'zh-cn': 'zh-CN'}
 
+# Shared across calls so each keyword doesn't spin up its own threads
+_TRANSLATE_POOL = ThreadPoolExecutor(max_workers=TRANSLATE_CONCURRENCY, thread_name_prefix='kw-translate')
 
-def expand_keyword(keyword_ar, keyword_obj=None, db=None):
+# (expires_at epoch, expansion) keyed by (keyword id, text_ar, translations_updated_at).
+# A new save changes the timestamp, so stale entries are never hit.
+EXPANSION_CACHE_SIZE = 10000
+_EXPANSION_CACHE = OrderedDict()
+_EXPANSION_CACHE_LOCK = threading.Lock()
+
+# Whole expansion lists per keyword-id set, tagged with _expansions_version()
+LOADED_SETS_SIZE = 256
+_LOADED_SETS = OrderedDict()
+
+# Individual translations keyed by (text_ar, lang_code), shared by all keywords
+TRANSLATION_MEMO_SIZE = 20000
+_TRANSLATION_MEMO = OrderedDict()
+_TRANSLATION_MEMO_LOCK = threading.Lock()
+
+# One expansion per Arabic text at a time; later callers wait for its Future
+_INFLIGHT = {}
+_INFLIGHT_LOCK = threading.Lock()
+
+# Background stale-while-revalidate refreshes (keyword ids queued or running)
+_REFRESH_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix='kw-refresh')
+_REFRESHING = set()
+_REFRESHING_LOCK = threading.Lock()
+
+
+def _invalidate_expansions(keyword_id=None):
+    """Drop cached expansions for one keyword (or all when keyword_id is None)"""
+    with _EXPANSION_CACHE_LOCK:
+        _LOADED_SETS.clear()
+        if keyword_id is None:
+            _EXPANSION_CACHE.clear()
+        else:
+            for key in [key for key in _EXPANSION_CACHE if key[0] == keyword_id]:
+                del _EXPANSION_CACHE[key]
+
+
+def _dumps_translations(translations):
+    """Serialize translations for keywords.translations_json (UTF-8, not ASCII-escaped)"""
+    if HAS_ORJSON:
+        return orjson.dumps(translations).decode('utf-8')
+    return json.dumps(translations, ensure_ascii=False)
+
+
+def _loads_translations(translations_json):
+    """Parse keywords.translations_json"""
+    if HAS_ORJSON:
+        return orjson.loads(translations_json)
+    return json.loads(translations_json)
+
+
+_translator_local = threading.local()
+
+
+def _get_session():
     """
-    Expand Arabic keyword to multiple languages and save to database.
+    Keep-alive requests.Session for the calling pool thread.
+    
+    Sessions aren't guaranteed thread-safe, so each pool thread keeps its
+    own connection pool to translate.google.com.
+    """
+    session = getattr(_translator_local, 'session', None)
+    if session is None:
+        session = _translator_local.session = requests.Session()
+    return session
+
+
+class _ThreadSessionRequests:
+    """Stands in for the requests module: get() uses the thread's session, with a timeout"""
+    
+    def get(self, url, **kwargs):
+        kwargs.setdefault('timeout', TRANSLATION_TIMEOUT_S)
+        return _get_session().get(url, **kwargs)
+    
+    def __getattr__(self, name):
+        return getattr(requests, name)
+
+
+class _PooledGoogleTranslator(GoogleTranslator):
+    """
+    GoogleTranslator whose HTTP calls reuse the thread's pooled session.
+    
+    deep_translator calls requests.get() per translation (a fresh TLS
+    connection, no timeout). translate() here is the library's own
+    function, rebound to globals where `requests` is _ThreadSessionRequests,
+    so validation, parsing and retries stay deep_translator's and nothing
+    outside this class is affected.
+    """
+    
+    translate = types.FunctionType(
+        GoogleTranslator.translate.__code__,
+        dict(GoogleTranslator.translate.__globals__, requests=_ThreadSessionRequests()),
+        GoogleTranslator.translate.__name__,
+        GoogleTranslator.translate.__defaults__,
+        GoogleTranslator.translate.__closure__,
+    )
+
+
+def _get_translator(lang_code):
+    """
+    Lazily built Arabic -> lang_code translator.
+    
+    One instance per thread and target: GoogleTranslator keeps the text
+    being translated on the instance, so sharing one across the pool isn't
+    safe.
+    """
+    translators = getattr(_translator_local, 'translators', None)
+    if translators is None:
+        translators = _translator_local.translators = {}
+    translator = translators.get(lang_code)
+    if translator is None:
+        translator = translators[lang_code] = _PooledGoogleTranslator(
+            source='ar', target=_GOOGLE_LANG_CODES.get(lang_code, lang_code)
+        )
+    return translator
+
+
+class _TokenBucket:
+    """Blocking token bucket shared by the translation pool threads"""
+    
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = max(1.0, float(burst))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+_RATE_LIMITER = _TokenBucket(TRANSLATE_RATE_PER_S, TRANSLATE_CONCURRENCY)
+_retryable_errors = None
+
+
+def _get_retryable_errors():
+    """Exceptions worth retrying: 429, other non-2xx replies, network errors"""
+    global _retryable_errors
+    if _retryable_errors is None:
+        errors = [ConnectionError, TimeoutError, requests.ConnectionError, requests.Timeout]
+        try:
+            from deep_translator.exceptions import TooManyRequests, RequestError
+            errors += [TooManyRequests, RequestError]
+        except ImportError:
+            pass
+        if HAS_CLOUD_TRANSLATE:
+            from google.api_core import exceptions as gexc
+            errors += [gexc.TooManyRequests, gexc.ServiceUnavailable,
+                       gexc.InternalServerError, gexc.DeadlineExceeded]
+        _retryable_errors = tuple(errors)
+    return _retryable_errors
+
+
+_cloud_client = None
+_cloud_client_lock = threading.Lock()
+
+
+def _get_cloud_client():
+    """Lazily built TranslationServiceClient (thread-safe, shared by the pool)"""
+    global _cloud_client
+    if _cloud_client is None:
+        with _cloud_client_lock:
+            if _cloud_client is None:
+                _cloud_client = translate_v3.TranslationServiceClient()
+    return _cloud_client
+
+
+def _cloud_translate(texts, lang_code):
+    """
+    Translate a list of Arabic texts into one language via Cloud Translation v3.
+    
+    The API takes a list of contents per call, so no newline joining is
+    needed; lists are sent in chunks of CLOUD_BATCH_SIZE.
+    """
+    parent = f"projects/{GOOGLE_CLOUD_PROJECT}/locations/{GOOGLE_CLOUD_TRANSLATE_LOCATION}"
+    target = _GOOGLE_LANG_CODES.get(lang_code, lang_code)
+    translated = []
+    for start in range(0, len(texts), CLOUD_BATCH_SIZE):
+        chunk = list(texts[start:start + CLOUD_BATCH_SIZE])
+        response = _with_retries(lambda: _get_cloud_client().translate_text(
+            request={
+                'parent': parent,
+                'contents': chunk,
+                'mime_type': 'text/plain',
+                'source_language_code': 'ar',
+                'target_language_code': target,
+            },
+            timeout=TRANSLATION_TIMEOUT_S,
+        ), lang_code)
+        translated.extend(t.translated_text for t in response.translations)
+    return translated
+
+
+def _translate_one(keyword_ar, lang_code):
+    """Single Google Translate request (runs on the translation pool)"""
+    return _with_retries(lambda: _get_translator(lang_code).translate(keyword_ar), lang_code)
+
+
+def _with_retries(request, lang_code):
+    """
+    Run one translation request under the shared rate limit.
+    
+    Requests are paced by a shared token bucket, and 429/5xx/network
+    errors are retried with exponential backoff (1s, 2s, 4s ... capped)
+    so a burst doesn't leave the expansion permanently 'partial'.
+    """
+    retryable = _get_retryable_errors()
+    for attempt in range(1, TRANSLATE_MAX_ATTEMPTS + 1):
+        _RATE_LIMITER.acquire()
+        try:
+            return request()
+        except retryable as e:
+            if attempt == TRANSLATE_MAX_ATTEMPTS:
+                raise
+            delay = min(TRANSLATE_BACKOFF_MAX_S, 2 ** (attempt - 1))
+            logger.debug("      🔁 %s: %s, retry %d in %ss",
+                         lang_code.upper(), type(e).__name__, attempt, delay)
+            time.sleep(delay)
+
+
+def _translate_lines(texts, lang_code):
+    """
+    Translate several keywords into one language with a single request.
+    
+    Keywords are sent newline-joined and the reply is split back per line.
+    If Google merges or splits lines, fall back to one request per keyword
+    so a translation is never attached to the wrong keyword.
     
     Args:
-        keyword_ar: Arabic keyword to expand
-        keyword_obj: Optional Keyword model object to save translations to
-        db: Optional database session (required if keyword_obj provided)
+        texts: Arabic keywords
+        lang_code: Target language code
         
     Returns:
-        dict: {
-            'original_ar': str,
-            'normalized_ar': str,
-            'translations': {'en': '...', 'ru': '...', ...},
-            'updated_at': str (ISO8601),
-            'status': 'success' | 'partial' | 'failed'
-        }
+        list: Translations in the same order as texts
     """
-    print(f"   🔄 Expanding keyword: {keyword_ar}")
+    if USE_CLOUD_TRANSLATE:
+        return _cloud_translate(texts, lang_code)
+    
+    if len(texts) == 1:
+        return [_translate_one(texts[0], lang_code)]
+    
+    translated = _translate_one('\n'.join(texts), lang_code) or ''
+    lines = [line.strip() for line in translated.split('\n')]
+    if len(lines) == len(texts) and all(lines):
+        return lines
     
-    # Normalize Arabic
-    normalized_ar = normalize_arabic(keyword_ar)
+    logger.debug("      ↩️ %s: batch returned %d lines for %d keywords, retrying singly",
+                 lang_code.upper(), len(lines), len(texts))
+    return [_translate_one(text, lang_code) for text in texts]
+
+
+def _request_chunks(texts):
+    """Split texts so each newline-joined request stays under TRANSLATE_REQUEST_CHARS"""
+    chunk, size = [], 0
+    for text in texts:
+        if chunk and size + len(text) + 1 > TRANSLATE_REQUEST_CHARS:
+            yield chunk
+            chunk, size = [], 0
+        chunk.append(text)
+        size += len(text) + 1
+    if chunk:
+        yield chunk
+
+
+def _translate_batch(texts_by_lang):
+    """
+    Translate keywords into target languages, one request per language.
     
+    Google's endpoint takes a single target per request, so the requests
+    are issued concurrently on a shared pool instead of one after another,
+    and every keyword needing the same language shares that request.
+    
+    Args:
+        texts_by_lang: {lang_code: [Arabic keywords]} to request
+        
+    Returns:
+        tuple: ({lang_code: {keyword_ar: translation}}, {lang_code: error})
+    """
+    results = {}
+    errors = {}
+    missing = {}
+    
+    # Texts translated earlier (by any keyword) cost no request
+    with _TRANSLATION_MEMO_LOCK:
+        for lang_code, texts in texts_by_lang.items():
+            for text in texts:
+                translated = _TRANSLATION_MEMO.get((text, lang_code))
+                if translated is None:
+                    missing.setdefault(lang_code, []).append(text)
+                else:
+                    _TRANSLATION_MEMO.move_to_end((text, lang_code))
+                    results.setdefault(lang_code, {})[text] = translated
+    
+    # Large batches are split into request-sized chunks that run in parallel
+    futures = {
+        _TRANSLATE_POOL.submit(_translate_lines, chunk, lang_code): (lang_code, chunk)
+        for lang_code, texts in missing.items()
+        for chunk in _request_chunks(texts)
+    }
+    
+    try:
+        for future in as_completed(futures, timeout=TRANSLATION_DEADLINE_S):
+            lang_code, chunk = futures[future]
+            try:
+                translated = dict(zip(chunk, future.result()))
+            except Exception as e:
+                errors[lang_code] = str(e)[:50]
+                continue
+            results.setdefault(lang_code, {}).update(translated)
+            with _TRANSLATION_MEMO_LOCK:
+                for text, value in translated.items():
+                    if value:
+                        _TRANSLATION_MEMO[(text, lang_code)] = value
+                while len(_TRANSLATION_MEMO) > TRANSLATION_MEMO_SIZE:
+                    _TRANSLATION_MEMO.popitem(last=False)
+    except FuturesTimeout:
+        for future, (lang_code, _) in futures.items():
+            if not future.done():
+                future.cancel()
+                errors.setdefault(lang_code, f"timed out after {TRANSLATION_DEADLINE_S}s")
+    
+    return results, errors
+
+
+def _plan_expansion(keyword_ar):
+    """
+    Fill the translations that need no request (curated proper nouns, 'ar').
+    
+    Returns:
+        tuple: ({lang_code: translation}, [lang codes still to translate])
+    """
     # Check if this is a known proper noun
     proper_noun_forms = get_proper_noun_forms(keyword_ar)
-    is_proper_noun = proper_noun_forms is not None
     
-    if is_proper_noun:
-        print(f"   📌 Known proper noun - using curated translations")
+    if proper_noun_forms is not None:
+        logger.info("   📌 Known proper noun - using curated translations")
+        # Use proper noun forms where available, Google Translate for the rest
+        translations = {
+            lang_code: proper_noun_forms[lang_code]
+            for lang_code in TRANSLATE_TARGETS
+            if proper_noun_forms.get(lang_code) is not None
+        }
+        for lang_code, curated in translations.items():
+            logger.debug("      ✅ %s: %s (curated)", lang_code.upper(), curated)
+    else:
+        translations = {}
     
-    # Translate to target languages
-    translations = {}
+    if 'ar' in TARGET_SET:
+        # Source language - no request needed
+        translations.setdefault('ar', keyword_ar)
+    
+    to_translate = [lang_code for lang_code in REQUEST_TARGETS if lang_code not in translations]
+    
+    return translations, to_translate
+
+
+def _collect_translations(keyword_ar, translations, to_translate, results, errors):
+    """Merge batch results for one keyword, in target order. Returns failed langs."""
     failed_langs = []
+    for lang_code in to_translate:
+        translated = results.get(lang_code, {}).get(keyword_ar)
+        if translated:
+            translations[lang_code] = translated
+            logger.debug("      ✅ %s: %s", lang_code.upper(), translated)
+        else:
+            failed_langs.append(lang_code)
+            logger.debug("      ❌ %s: %s", lang_code.upper(), errors.get(lang_code, 'No result'))
+    return failed_langs
+
+
+def _translate_to_targets(keyword_ar, target_langs):
+    """
+    Translate an Arabic keyword into each target language.
     
-    for target_lang in TRANSLATE_TARGETS:
-        try:
-            lang_code = target_lang.strip().lower()
-            
-            # Use proper noun form if available, otherwise use Google Translate
-            if is_proper_noun and lang_code in proper_noun_forms:
-                translations[lang_code] = proper_noun_forms[lang_code]
-                print(f"      ✅ {lang_code.upper()}: {proper_noun_forms[lang_code]} (curated)")
-            else:
-                translated = GoogleTranslator(source='ar', target=lang_code).translate(keyword_ar)
-                
-                if translated:
-                    translations[lang_code] = translated
-                    print(f"      ✅ {lang_code.upper()}: {translated}")
-                else:
-                    failed_langs.append(lang_code)
-                    print(f"      ❌ {lang_code.upper()}: No result")
-                
-        except Exception as e:
-            failed_langs.append(target_lang)
-            print(f"      ❌ {target_lang.upper()}: {str(e)[:50]}")
+    Args:
+        keyword_ar: Arabic keyword
+        target_langs: Normalized language codes to request
+        
+    Returns:
+        tuple: ({lang_code: translation}, [failed lang codes])
+    """
+    results, errors = _translate_batch({lang_code: [keyword_ar] for lang_code in target_langs})
+    translations = {}
+    failed_langs = _collect_translations(keyword_ar, translations, target_langs, results, errors)
+    return translations, failed_langs
+
+
+def _all_failed(to_translate, failed_langs):
+    """True when every language that needed a request failed"""
+    return bool(to_translate) and len(failed_langs) == len(to_translate)
+
+
+def _translation_columns(translations, updated_at):
+    """Keyword column values for a set of translations"""
+    return {
+        'translations_json': _dumps_translations(translations),
+        'translations_updated_at': updated_at,
+        # Also update legacy columns for backward compatibility
+        **{
+            column: translations[lang_code][:200] if translations.get(lang_code) else None
+            for lang_code, column in _LEGACY_COLUMNS
+        },
+    }
+
+
+def _save_translations_bulk(db, rows):
+    """
+    Write translations for many keywords with executemany UPDATEs and one commit.
+    
+    Bypasses the ORM unit of work (no per-row flush or identity-map
+    bookkeeping); objects already loaded in db are expired by the commit.
+    
+    Args:
+        db: Database session
+        rows: [{'_id': keyword id, **_translation_columns(...)}]
+    """
+    from models import Keyword
+    from sqlalchemy import bindparam, update
+    
+    columns = [column for column in rows[0] if column != '_id']
+    stmt = (
+        update(Keyword)
+        .where(Keyword.id == bindparam('_id'))
+        .values({column: bindparam(column) for column in columns})
+        .execution_options(synchronize_session=False)
+    )
+    try:
+        for start in range(0, len(rows), BULK_UPDATE_ROWS):
+            db.connection().execute(stmt, rows[start:start + BULK_UPDATE_ROWS])
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.warning("   ⚠️ Failed to save to database: %s", e)
+        return
+    for row in rows:
+        _invalidate_expansions(row['_id'])
+    logger.info("   💾 Saved translations for %d keywords", len(rows))
+
+
+def _finish_expansion(keyword_ar, translations, failed_langs, keyword_obj=None, db=None,
+                      updated_at=None, persist=True):
+    """
+    Build the expansion dict and persist it on keyword_obj when given.
     
+    updated_at is passed for reused translations so the copy keeps the
+    original's age and still expires on schedule. persist=False (every
+    request failed) keeps the result out of the database, so the keyword
+    is retried on the next load instead of being stuck until the TTL.
+    """
     # Determine status
     if len(translations) == len(TRANSLATE_TARGETS):
         status = 'success'
@@ -87,12 +545,12 @@ def expand_keyword(keyword_ar, keyword_obj=None, db=None):
     else:
         status = 'failed'
     
-    now = datetime.utcnow()
+    now = updated_at or datetime.utcnow()
     
     # Create expansion result
     expansion = {
         'original_ar': keyword_ar,
-        'normalized_ar': normalized_ar,
+        'normalized_ar': normalize_arabic(keyword_ar),
         'translations': translations,
         'updated_at': now.isoformat(),
         'status': status,
@@ -100,42 +558,206 @@ def expand_keyword(keyword_ar, keyword_obj=None, db=None):
     }
     
     # Save to database if keyword object provided
-    if keyword_obj and db:
+    if keyword_obj and db and not persist:
+        logger.warning("   ⚠️ All translation requests failed - not saving, will retry later")
+    elif keyword_obj and db:
         try:
-            keyword_obj.translations_json = json.dumps(translations, ensure_ascii=False)
-            keyword_obj.translations_updated_at = now
-            # Also update legacy columns for backward compatibility
-            keyword_obj.text_en = translations.get('en', '')[:200] if translations.get('en') else None
-            keyword_obj.text_fr = translations.get('fr', '')[:200] if translations.get('fr') else None
-            keyword_obj.text_es = translations.get('es', '')[:200] if translations.get('es') else None
-            keyword_obj.text_ru = translations.get('ru', '')[:200] if translations.get('ru') else None
-            keyword_obj.text_tr = translations.get('tr', '')[:200] if translations.get('tr') else None
-            keyword_obj.text_zh = translations.get('zh-cn', '')[:200] if translations.get('zh-cn') else None
-            keyword_obj.text_ur = translations.get('ur', '')[:200] if translations.get('ur') else None
+            for column, value in _translation_columns(translations, now).items():
+                setattr(keyword_obj, column, value)
+            _invalidate_expansions(keyword_obj.id)
             db.commit()
-            print(f"   💾 Saved translations to database")
+            logger.info("   💾 Saved translations to database")
         except Exception as e:
-            print(f"   ⚠️ Failed to save to database: {e}")
+            logger.warning("   ⚠️ Failed to save to database: %s", e)
     
-    print(f"   ✅ Expansion complete: {status} ({len(translations)}/{len(TRANSLATE_TARGETS)} languages)")
+    logger.info("   ✅ Expansion complete: %s (%d/%d languages)", status, len(translations), len(TRANSLATE_TARGETS))
     
     return expansion
 
 
-def get_expansion_from_db(keyword_obj):
+def _shared_translations(db, texts_ar, exclude_ids=()):
     """
-    Get expansion from database for a Keyword object.
+    Fresh, complete translations already stored for the same Arabic text.
+    
+    Keywords are per-user, so the same text is often added by several
+    users (and survives restarts in the keywords table). Reusing another
+    row's translations costs one query instead of a full expansion.
     
     Args:
-        keyword_obj: Keyword model object
+        db: Database session
+        texts_ar: Arabic keywords about to be expanded
+        exclude_ids: Keyword ids not to reuse (the rows being refreshed)
         
     Returns:
-        Expansion dict or None if not available
+        dict: {text_ar: ({lang_code: translation}, translations_updated_at)}
     """
-    # Defensive: Check if column exists (handles pre-migration state)
-    translations_json = getattr(keyword_obj, 'translations_json', None)
-    translations_updated_at = getattr(keyword_obj, 'translations_updated_at', None)
+    from models import Keyword
     
+    cutoff = datetime.utcnow() - timedelta(days=EXPANSION_TTL_DAYS)
+    query = db.query(Keyword.text_ar, Keyword.translations_json, Keyword.translations_updated_at).filter(
+        Keyword.text_ar.in_(set(texts_ar)),
+        Keyword.translations_json.isnot(None),
+        Keyword.translations_updated_at > cutoff,
+    )
+    exclude_ids = [kw_id for kw_id in exclude_ids if kw_id is not None]
+    if exclude_ids:
+        query = query.filter(Keyword.id.notin_(exclude_ids))
+    
+    shared = {}
+    for text_ar, translations_json, updated_at in query.order_by(Keyword.translations_updated_at.desc()):
+        if text_ar in shared:
+            continue
+        try:
+            translations = _loads_translations(translations_json)
+        except ValueError:
+            continue
+        # Only reuse rows covering every current target
+        if TARGET_SET.issubset(translations):
+            shared[text_ar] = (translations, updated_at)
+    return shared
+
+
+def expand_keyword(keyword_ar, keyword_obj=None, db=None):
+    """
+    Expand Arabic keyword to multiple languages and save to database.
+    
+    Args:
+        keyword_ar: Arabic keyword to expand
+        keyword_obj: Optional Keyword model object to save translations to
+        db: Optional database session (required if keyword_obj provided)
+        
+    Returns:
+        dict: {
+            'original_ar': str,
+            'normalized_ar': str,
+            'translations': {'en': '...', 'ru': '...', ...},
+            'updated_at': str (ISO8601),
+            'status': 'success' | 'partial' | 'failed'
+        }
+    """
+    logger.info("   🔄 Expanding keyword: %s", keyword_ar)
+    
+    # Single-flight: a concurrent expansion of the same text is reused
+    with _INFLIGHT_LOCK:
+        inflight = _INFLIGHT.get(keyword_ar)
+        if inflight is None:
+            inflight = _INFLIGHT[keyword_ar] = Future()
+            owner = True
+        else:
+            owner = False
+    
+    if not owner:
+        logger.info("   ⏳ Waiting for in-flight expansion of the same keyword")
+        expansion, persist = inflight.result()
+        return _finish_expansion(
+            keyword_ar, dict(expansion['translations']), list(expansion['failed_langs'] or []),
+            keyword_obj, db, datetime.fromisoformat(expansion['updated_at']), persist
+        )
+    
+    try:
+        expansion, persist = _expand_keyword(keyword_ar, keyword_obj, db)
+    except BaseException as e:
+        inflight.set_exception(e)
+        raise
+    else:
+        inflight.set_result((expansion, persist))
+    finally:
+        with _INFLIGHT_LOCK:
+            _INFLIGHT.pop(keyword_ar, None)
+    return expansion
+
+
+def _expand_keyword(keyword_ar, keyword_obj, db):
+    """expand_keyword body, run by the single-flight owner. Returns (expansion, persisted)"""
+    if db is not None:
+        exclude = [keyword_obj.id] if keyword_obj is not None else []
+        shared = _shared_translations(db, [keyword_ar], exclude).get(keyword_ar)
+        if shared:
+            logger.info("   ♻️ Reusing stored translations of the same keyword")
+            translations, updated_at = shared
+            return _finish_expansion(keyword_ar, dict(translations), [], keyword_obj, db, updated_at), True
+    
+    translations, to_translate = _plan_expansion(keyword_ar)
+    
+    # All network calls for this keyword in one place
+    translated_map, failed_langs = _translate_to_targets(keyword_ar, to_translate)
+    translations.update(translated_map)
+    
+    persist = not _all_failed(to_translate, failed_langs)
+    return _finish_expansion(keyword_ar, translations, failed_langs, keyword_obj, db, persist=persist), persist
+
+
+def expand_keywords(keyword_objs, db, reuse_shared=True):
+    """
+    Expand several Keyword rows at once and save each to the database.
+    
+    Each target language costs one request for the whole batch (keywords
+    newline-joined) rather than one request per keyword, and all rows are
+    written with executemany UPDATEs in a single commit.
+    
+    Args:
+        keyword_objs: Keyword model objects to expand
+        db: Database session the objects belong to
+        reuse_shared: Copy other users' stored translations of the same text
+            when fresh (off for background refreshes, which want new ones)
+        
+    Returns:
+        list: Expansions in the same order as keyword_objs
+    """
+    logger.info("   🔄 Expanding %d keywords in one batch", len(keyword_objs))
+    
+    shared = _shared_translations(
+        db, [kw.text_ar for kw in keyword_objs], [kw.id for kw in keyword_objs]
+    ) if reuse_shared else {}
+    if shared:
+        logger.info("   ♻️ Reusing stored translations for %d keywords", len(shared))
+    
+    plans = [
+        (kw, dict(shared[kw.text_ar][0]), []) if kw.text_ar in shared else (kw, *_plan_expansion(kw.text_ar))
+        for kw in keyword_objs
+    ]
+    
+    texts_by_lang = {}
+    for kw, _, to_translate in plans:
+        for lang_code in to_translate:
+            texts = texts_by_lang.setdefault(lang_code, [])
+            if kw.text_ar not in texts:
+                texts.append(kw.text_ar)
+    
+    results, errors = _translate_batch(texts_by_lang)
+    
+    expansions = []
+    rows = []
+    for kw, translations, to_translate in plans:
+        failed_langs = _collect_translations(kw.text_ar, translations, to_translate, results, errors)
+        updated_at = shared[kw.text_ar][1] if kw.text_ar in shared else None
+        expansion = _finish_expansion(kw.text_ar, translations, failed_langs, updated_at=updated_at)
+        if _all_failed(to_translate, failed_langs):
+            logger.warning("   ⚠️ All translation requests failed for %s - not saving", kw.text_ar)
+        else:
+            rows.append({
+                '_id': kw.id,
+                **_translation_columns(translations, datetime.fromisoformat(expansion['updated_at'])),
+            })
+        expansions.append(expansion)
+    
+    if rows:
+        _save_translations_bulk(db, rows)
+    return expansions
+
+
+def _build_expansion(text_ar, translations_json, translations_updated_at):
+    """
+    Build an expansion dict from the stored keyword columns.
+    
+    Args:
+        text_ar: Arabic keyword text
+        translations_json: JSON-encoded translations (or None)
+        translations_updated_at: When the translations were saved (or None)
+        
+    Returns:
+        Expansion dict or None if missing/expired/invalid
+    """
     if not translations_json:
         return None
     
@@ -144,16 +766,16 @@ def get_expansion_from_db(keyword_obj):
         try:
             age = datetime.utcnow() - translations_updated_at
             if age > timedelta(days=EXPANSION_TTL_DAYS):
-                print(f"   ⏰ Translations expired for: {keyword_obj.text_ar}")
+                logger.info("   ⏰ Translations expired for: %s", text_ar)
                 return None
         except (TypeError, AttributeError):
             pass  # Handle edge cases with datetime comparison
     
     try:
-        translations = json.loads(translations_json)
+        translations = _loads_translations(translations_json)
         return {
-            'original_ar': keyword_obj.text_ar,
-            'normalized_ar': normalize_arabic(keyword_obj.text_ar),
+            'original_ar': text_ar,
+            'normalized_ar': normalize_arabic(text_ar),
             'translations': translations,
             'updated_at': translations_updated_at.isoformat() if translations_updated_at else None,
             'status': 'success' if len(translations) >= 10 else 'partial'
@@ -162,6 +784,198 @@ def get_expansion_from_db(keyword_obj):
         return None
 
 
+def get_expansion_from_db(keyword_obj):
+    """
+    Get expansion from database for a Keyword object.
+    
+    Args:
+        keyword_obj: Keyword model object
+        
+    Returns:
+        Expansion dict or None if not available
+    """
+    # Defensive: Check if column exists (handles pre-migration state)
+    return _build_expansion(
+        keyword_obj.text_ar,
+        getattr(keyword_obj, 'translations_json', None),
+        getattr(keyword_obj, 'translations_updated_at', None)
+    )
+
+
+def _expires_at_epoch(translations_updated_at):
+    """Hard-expiry time of stored translations, as a UTC epoch (computed once per entry)"""
+    updated = translations_updated_at.replace(tzinfo=timezone.utc).timestamp()
+    return updated + EXPANSION_TTL_DAYS * 86400
+
+
+def _cached_expansion(kw_id, text_ar, translations_json, translations_updated_at):
+    """
+    _build_expansion with an LRU cache across job runs.
+    
+    Rows without a translations timestamp can't be told apart from an
+    update, so they are always rebuilt. Each entry stores its expiry epoch
+    when it is built; a hit is one float compare, and reads never move it
+    (only a new save, i.e. a new key, does).
+    
+    Returns:
+        Expansion dict or None if not available
+    """
+    if translations_updated_at is None:
+        return _build_expansion(text_ar, translations_json, translations_updated_at)
+    
+    key = (kw_id, text_ar, translations_updated_at)
+    now = time.time()
+    with _EXPANSION_CACHE_LOCK:
+        entry = _EXPANSION_CACHE.get(key)
+        if entry is not None:
+            if entry[0] > now:
+                _EXPANSION_CACHE.move_to_end(key)
+                return entry[1]
+            del _EXPANSION_CACHE[key]
+    
+    expansion = _build_expansion(text_ar, translations_json, translations_updated_at)
+    if expansion:
+        with _EXPANSION_CACHE_LOCK:
+            _EXPANSION_CACHE[key] = (_expires_at_epoch(translations_updated_at), expansion)
+            if len(_EXPANSION_CACHE) > EXPANSION_CACHE_SIZE:
+                _EXPANSION_CACHE.popitem(last=False)
+    return expansion
+
+
+def _keyword_identities(keywords):
+    """
+    Primary keys of ORM Keyword objects without touching their attributes.
+    
+    Returns:
+        tuple: ([id or None per keyword], session the objects are attached to or None)
+    """
+    from models import Keyword
+    from sqlalchemy import inspect
+    
+    ids = []
+    session = None
+    for kw in keywords:
+        state = inspect(kw) if isinstance(kw, Keyword) else None
+        ids.append(state.identity[0] if state is not None and state.identity else None)
+        if session is None and state is not None:
+            session = state.session
+    return ids, session
+
+
+def _expansions_version(session, ids):
+    """
+    Cheap fingerprint of the stored translations for a set of keywords.
+    
+    One aggregate query: (count, MAX(translations_updated_at)) over rows that
+    have timestamped translations. Returns None when the set can't be
+    fingerprinted - some keyword lacks translations/timestamp, or the
+    oldest ones have expired and need a refresh.
+    """
+    from models import get_db, Keyword
+    from sqlalchemy import select, func
+    
+    db = session or get_db()
+    try:
+        count, newest, oldest = db.execute(
+            select(
+                func.count(Keyword.translations_updated_at),
+                func.max(Keyword.translations_updated_at),
+                func.min(Keyword.translations_updated_at)
+            ).where(Keyword.id.in_(ids), Keyword.translations_json.isnot(None))
+        ).one()
+    finally:
+        if session is None:
+            db.close()
+    
+    if count != len(set(ids)) or oldest is None:
+        return None
+    # Due for a background refresh (or expired): let the full path handle it
+    if datetime.utcnow() - oldest > timedelta(days=EXPANSION_REFRESH_DAYS):
+        return None
+    return (count, newest)
+
+
+def _refresh_in_background(keyword_ids):
+    """
+    Queue a re-expansion of keywords whose translations are getting old.
+    
+    Callers keep using the current translations meanwhile; ids already
+    queued or running are skipped.
+    """
+    with _REFRESHING_LOCK:
+        keyword_ids = [kw_id for kw_id in keyword_ids if kw_id not in _REFRESHING]
+        _REFRESHING.update(keyword_ids)
+    if keyword_ids:
+        logger.info("🔁 Refreshing translations in background for %d keywords", len(keyword_ids))
+        _REFRESH_POOL.submit(_refresh_keywords, keyword_ids)
+
+
+def _refresh_keywords(keyword_ids):
+    """Background job for _refresh_in_background"""
+    from models import get_db, Keyword
+    
+    db = get_db()
+    try:
+        keywords = db.query(Keyword).filter(Keyword.id.in_(keyword_ids)).all()
+        if keywords:
+            expand_keywords(keywords, db, reuse_shared=False)
+    except Exception as e:
+        logger.warning("   ❌ Background refresh error: %.80s", e)
+    finally:
+        db.close()
+        with _REFRESHING_LOCK:
+            _REFRESHING.difference_update(keyword_ids)
+
+
+def _load_keyword_columns(keywords, ids, session):
+    """
+    Get (id, text_ar, translations_json, translations_updated_at) per keyword.
+    
+    ORM Keyword objects are usually expired by the time they get here (the
+    caller committed job progress in between), so reading their attributes
+    would issue one lazy SELECT per keyword. Their columns are fetched in a
+    single IN query instead. Plain rows are used as they are.
+    
+    Args:
+        keywords: Keyword objects or rows with the same attributes
+        ids: Output of _keyword_identities(keywords)
+        session: Output of _keyword_identities(keywords)
+        
+    Returns:
+        List of column tuples, same order as input
+    """
+    from models import get_db, Keyword
+    from sqlalchemy import select
+    
+    loaded = {}
+    wanted = [kw_id for kw_id in ids if kw_id is not None]
+    if wanted:
+        # Reuse the caller's session when the objects are still attached
+        db = session or get_db()
+        try:
+            loaded = {
+                row.id: tuple(row)
+                for row in db.execute(
+                    select(
+                        Keyword.id, Keyword.text_ar,
+                        Keyword.translations_json, Keyword.translations_updated_at
+                    ).where(Keyword.id.in_(wanted))
+                )
+            }
+        finally:
+            if session is None:
+                db.close()
+    
+    return [
+        loaded.get(kw_id) or (
+            kw.id, kw.text_ar,
+            getattr(kw, 'translations_json', None),
+            getattr(kw, 'translations_updated_at', None)
+        )
+        for kw, kw_id in zip(keywords, ids)
+    ]
+
+
 def get_all_expansions():
     """
     Get all expansions from database.
@@ -171,16 +985,25 @@ def get_all_expansions():
     """
     from models import get_db, Keyword
     
+    from sqlalchemy import or_
+    
+    # Expired rows are filtered by the database (one cutoff per call)
+    # instead of being loaded and age-checked one by one
+    cutoff = datetime.utcnow() - timedelta(days=EXPANSION_TTL_DAYS)
+    
     db = get_db()
     try:
-        keywords = db.query(Keyword).filter(
+        rows = db.query(
+            Keyword.id, Keyword.text_ar, Keyword.translations_json, Keyword.translations_updated_at
+        ).filter(
             Keyword.enabled == True,
-            Keyword.translations_json.isnot(None)
-        ).all()
+            Keyword.translations_json.isnot(None),
+            or_(Keyword.translations_updated_at.is_(None), Keyword.translations_updated_at > cutoff)
+        )
         
         expansions = []
-        for kw in keywords:
-            expansion = get_expansion_from_db(kw)
+        for kw_id, text_ar, translations_json, translations_updated_at in rows:
+            expansion = _cached_expansion(kw_id, text_ar, translations_json, translations_updated_at)
             if expansion:
                 expansions.append(expansion)
         
@@ -200,7 +1023,8 @@ def clear_expansion_cache():
             Keyword.translations_updated_at: None
         })
         db.commit()
-        print("🧹 Cleared all keyword translations from database")
+        _invalidate_expansions()
+        logger.info("🧹 Cleared all keyword translations from database")
     finally:
         db.close()
 
@@ -215,59 +1039,99 @@ def load_expansions_from_keywords(keywords, auto_refresh=True):
     Args:
         keywords: List of Keyword objects with text_ar and translations_json fields
         auto_refresh: If True, auto-expand keywords with missing/expired translations
+            (and refresh aging ones in the background)
         
     Returns:
         List of expansions (skips keywords only if auto-refresh also fails)
     """
+    ids, session = _keyword_identities(keywords)
+    
+    # Nothing changed since the last load of this exact keyword set?
+    cache_key = tuple(ids) if ids and None not in ids else None
+    version = _expansions_version(session, ids) if cache_key else None
+    if version is not None:
+        with _EXPANSION_CACHE_LOCK:
+            cached = _LOADED_SETS.get(cache_key)
+        if cached and cached[0] == version:
+            return list(cached[1])
+    
     expansions = []
     skipped = []
     refreshed = []
+    stale = []
+    aging = []
+    refresh_cutoff = datetime.utcnow() - timedelta(days=EXPANSION_REFRESH_DAYS)
     
-    for kw in keywords:
+    for kw_id, text_ar, translations_json, translations_updated_at in _load_keyword_columns(keywords, ids, session):
         # Load from DATABASE
-        expansion = get_expansion_from_db(kw)
+        expansion = _cached_expansion(kw_id, text_ar, translations_json, translations_updated_at)
         
         if expansion:
             expansions.append(expansion)
+            # Still valid but old: serve it now, refresh it off the hot path
+            if auto_refresh and kw_id is not None and translations_updated_at \
+                    and translations_updated_at < refresh_cutoff:
+                aging.append(kw_id)
         elif auto_refresh:
-            # Auto-refresh: re-expand the keyword instead of silently dropping it
-            print(f"🔄 Auto-refreshing expired/missing translations for: {kw.text_ar}")
+            # Refreshed together below; keep the slot so order is preserved
+            stale.append((len(expansions), kw_id, text_ar))
+            expansions.append(None)
+        else:
+            skipped.append(text_ar)
+            logger.warning("⚠️  Keyword '%s' has no translations (skipping)", text_ar)
+    
+    if aging:
+        _refresh_in_background(aging)
+    
+    if stale:
+        # Auto-refresh: re-expand the keywords instead of silently dropping them
+        logger.info("🔄 Auto-refreshing expired/missing translations for: %s", ', '.join(t for _, _, t in stale[:5]))
+        try:
+            from models import get_db
+            db = get_db()
             try:
-                from models import get_db
-                db = get_db()
-                try:
-                    # Re-fetch the keyword object in this session
-                    from models import Keyword as KW
-                    kw_fresh = db.query(KW).filter(KW.id == kw.id).first()
-                    if kw_fresh:
-                        new_expansion = expand_keyword(kw_fresh.text_ar, keyword_obj=kw_fresh, db=db)
-                        if new_expansion and new_expansion.get('status') != 'failed':
-                            expansions.append(new_expansion)
-                            refreshed.append(kw.text_ar)
-                            print(f"   ✅ Refreshed '{kw.text_ar}' successfully")
-                        else:
-                            skipped.append(kw.text_ar)
-                            print(f"   ❌ Refresh failed for '{kw.text_ar}'")
+                # Re-fetch the keyword objects in this session
+                from models import Keyword as KW
+                fresh = {kw.id: kw for kw in db.query(KW).filter(KW.id.in_([kw_id for _, kw_id, _ in stale]))}
+                to_expand = [fresh[kw_id] for _, kw_id, _ in stale if kw_id in fresh]
+                new_expansions = dict(zip(
+                    [kw.id for kw in to_expand],
+                    expand_keywords(to_expand, db) if to_expand else []
+                ))
+                for slot, kw_id, text_ar in stale:
+                    new_expansion = new_expansions.get(kw_id)
+                    if new_expansion and new_expansion.get('status') != 'failed':
+                        expansions[slot] = new_expansion
+                        refreshed.append(text_ar)
+                        logger.info("   ✅ Refreshed '%s' successfully", text_ar)
                     else:
-                        skipped.append(kw.text_ar)
-                finally:
-                    db.close()
-            except Exception as e:
-                skipped.append(kw.text_ar)
-                print(f"   ❌ Auto-refresh error for '{kw.text_ar}': {str(e)[:80]}")
-        else:
-            skipped.append(kw.text_ar)
-            print(f"⚠️  Keyword '{kw.text_ar}' has no translations (skipping)")
+                        skipped.append(text_ar)
+                        logger.warning("   ❌ Refresh failed for '%s'", text_ar)
+            finally:
+                db.close()
+        except Exception as e:
+            skipped.extend(text_ar for slot, _, text_ar in stale if expansions[slot] is None)
+            logger.warning("   ❌ Auto-refresh error: %.80s", e)
+        expansions = [expansion for expansion in expansions if expansion is not None]
+    
+    if version is not None and not refreshed and not skipped:
+        with _EXPANSION_CACHE_LOCK:
+            _LOADED_SETS[cache_key] = (version, list(expansions))
+            _LOADED_SETS.move_to_end(cache_key)
+            if len(_LOADED_SETS) > LOADED_SETS_SIZE:
+                _LOADED_SETS.popitem(last=False)
     
     if refreshed:
-        print(f"\n🔄 Auto-refreshed {len(refreshed)} keywords: {', '.join(refreshed[:5])}")
+        logger.info("🔄 Auto-refreshed %d keywords: %s", len(refreshed), ', '.join(refreshed[:5]))
     
     if skipped:
-        print(f"\n⚠️  {len(skipped)} keywords skipped (no translations in database)")
-        print(f"   Skipped: {', '.join(skipped[:5])}")
-        if len(skipped) > 5:
-            print(f"   ... and {len(skipped) - 5} more")
-        print(f"   → To fix: Re-add these keywords via frontend to generate translations\n")
+        more = f" ... and {len(skipped) - 5} more" if len(skipped) > 5 else ""
+        logger.warning(
+            "⚠️  %d keywords skipped (no translations in database)\n"
+            "   Skipped: %s%s\n"
+            "   → To fix: Re-add these keywords via frontend to generate translations",
+            len(skipped), ', '.join(skipped[:5]), more
+        )
     
     return expansions
 
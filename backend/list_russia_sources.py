@@ -1,15 +1,16 @@
 from models import SessionLocal, Source
 
 db = SessionLocal()
-sources = db.query(Source).filter(Source.country_name == 'روسيا').all()
+# Only the printed columns (uses ix_sources_country_name)
+sources = db.query(Source.name, Source.url, Source.enabled).filter(Source.country_name == 'روسيا').all()
 
 print("="*80)
 print("SOURCES FROM RUSSIA")
 print("="*80)
-for s in sources:
-    print(f"• {s.name}")
-    print(f"  URL: {s.url}")
-    print(f"  Enabled: {s.enabled}")
+for name, url, enabled in sources:
+    print(f"• {name}")
+    print(f"  URL: {url}")
+    print(f"  Enabled: {enabled}")
     print()
 
 db.close()
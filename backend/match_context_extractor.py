@@ -7,10 +7,15 @@ exactly why an article matched a keyword.
 Returns: N lines before match + matched text + N lines after match
 """
 import re
-from typing import Optional, Dict, List
+import logging
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Optional, Dict, List, Iterable, Tuple
 from text_normalization import normalize_text
 from utils import strip_html_tags
 
+logger = logging.getLogger(__name__)
+
 
 def translate_snippet_preserve_keyword(
     snippet: str,
@@ -35,46 +40,154 @@ def translate_snippet_preserve_keyword(
     if not snippet or source_lang == target_lang:
         return snippet
     
-    try:
-        from translation_cache import translate_to_arabic_cached
+    # All fragments of the snippet go out together instead of one request each
+    return translate_snippets_batch(
+        [snippet], [keyword_marker], source_lang, target_lang, keywords_ar=[keyword_ar]
+    )[0]
+
+
+def translate_snippets_batch(
+    snippets: List[str],
+    keyword_markers: List[str],
+    source_lang: str,
+    target_lang: str = 'ar',
+    keywords_ar: Optional[List[str]] = None
+) -> List[str]:
+    """
+    Batch version of translate_snippet_preserve_keyword for one article.
+    
+    All the plain-text parts of all snippets are translated together
+    (one request per ~4.5k chars instead of one per part), then each
+    snippet is reassembled with its **keyword** replaced by the Arabic one.
+    
+    Args:
+        snippets: Texts with **keyword** markers
+        keyword_markers: Matched keyword text per snippet (kept for parity)
+        source_lang: Source language code
+        target_lang: Target language code
+        keywords_ar: Arabic keyword per snippet
         
-        # Split the snippet by **keyword** markers
-        parts = snippet.split('**')
+    Returns:
+        Translated snippets, same order as input (original snippet on failure)
+    """
+    if source_lang == target_lang:
+        return list(snippets)
+    
+    keywords_ar = keywords_ar or [None] * len(snippets)
+    
+    try:
+        from translation_cache import translate_many_to_arabic
         
-        if len(parts) < 3:
-            # No keyword markers, translate as is
-            result = translate_to_arabic_cached(snippet, source_lang)
-            return result.get('translated', snippet) if isinstance(result, dict) else snippet
+        split_snippets = [(snippet or '').split('**') for snippet in snippets]
         
-        # parts[0] = text before keyword
-        # parts[1] = keyword
-        # parts[2] = text after keyword
-        # parts[3+] = additional markers if any
+        # Collect every plain-text part (even indexes) that needs translating
+        texts = [
+            part
+            for parts in split_snippets
+            for i, part in enumerate(parts)
+            if i % 2 == 0 and part.strip()
+        ]
+        translated = dict(zip(texts, translate_many_to_arabic(texts, source_lang)))
         
-        translated_parts = []
-        for i, part in enumerate(parts):
-            if i % 2 == 1:
-                # Odd index = keyword (inside ** markers)
-                # Replace with Arabic keyword if provided, otherwise keep original
-                if keyword_ar and source_lang != 'ar':
-                    translated_parts.append(f"**{keyword_ar}**")
-                else:
-                    translated_parts.append(f"**{part}**")
+        results = []
+        for snippet, parts, keyword_ar in zip(snippets, split_snippets, keywords_ar):
+            if not snippet:
+                results.append(snippet)
+            elif len(parts) < 3:
+                # No keyword markers, translated as is
+                results.append(translated.get(snippet, snippet))
             else:
-                # Even index = regular text
-                if part.strip():
-                    result = translate_to_arabic_cached(part, source_lang)
-                    # Extract the 'translated' field from the result dict
-                    translated_text = result.get('translated', part) if isinstance(result, dict) else part
-                    translated_parts.append(translated_text)
-                else:
-                    translated_parts.append(part)
-        
-        return ' '.join(translated_parts)
+                translated_parts = []
+                for i, part in enumerate(parts):
+                    if i % 2 == 1:
+                        use_ar = keyword_ar and source_lang != 'ar'
+                        translated_parts.append(f"**{keyword_ar if use_ar else part}**")
+                    elif part.strip():
+                        translated_parts.append(translated[part])
+                    else:
+                        translated_parts.append(part)
+                results.append(' '.join(translated_parts))
+        return results
         
     except Exception as e:
-        print(f"      ⚠️  Translation error: {e}")
-        return snippet  # Return original if translation fails
+        logger.warning("      ⚠️  Batch translation error: %s", e)
+        return list(snippets)  # Return originals if translation fails
+
+
+_WORD_RE = re.compile(r'\S+')
+
+
+def split_word_spans(text: str) -> Tuple[List[Tuple[int, int]], List[int]]:
+    """
+    Word (start, end) offsets for the whole text, plus the start offsets
+    alone for bisecting. Computed once per article and shared by all
+    matched keywords.
+    """
+    spans = [m.span() for m in _WORD_RE.finditer(text)]
+    return spans, [start for start, _ in spans]
+
+
+@lru_cache(maxsize=256)
+def _variants_pattern(variants_lower: tuple):
+    """
+    One compiled pattern for a set of variants (longest first).
+    
+    The alternation sits in a lookahead so the scan is tried at every
+    position instead of skipping past overlapping matches. Case is
+    ignored by the regex engine, so the article is never lower-cased.
+    """
+    alternation = '|'.join(re.escape(v) for v in sorted(variants_lower, key=len, reverse=True))
+    return re.compile(f'(?=({alternation}))', re.IGNORECASE)
+
+
+@lru_cache(maxsize=1024)
+def _variant_pattern(variant_lower: str):
+    """Case-insensitive pattern for a single variant"""
+    return re.compile(re.escape(variant_lower), re.IGNORECASE)
+
+
+def _find_variant(text: str, variant: str) -> int:
+    """
+    Case-insensitive text.find(variant) without copying the text.
+    
+    Caseless scripts (Arabic, CJK) use a plain find; cased variants use a
+    cached IGNORECASE pattern.
+    """
+    variant_lower = variant.lower()
+    if variant_lower == variant.upper():
+        return text.find(variant)
+    match = _variant_pattern(variant_lower).search(text)
+    return match.start() if match else -1
+
+
+def find_first_occurrences(text: str, variants_lower: Iterable[str]) -> Dict[str, int]:
+    """
+    Locate the first occurrence of every variant in a single pass.
+    
+    Equivalent to text.lower().find(v) for each variant, but the text is
+    scanned once by the regex engine however many keywords matched.
+    
+    Args:
+        text: Article text (matched case-insensitively)
+        variants_lower: Lower-cased variants to look for
+        
+    Returns:
+        Dict of variant -> start offset (variants not found are omitted)
+    """
+    pending = {v for v in variants_lower if v}
+    positions = {}
+    if not pending:
+        return positions
+    
+    for match in _variants_pattern(tuple(sorted(pending))).finditer(text):
+        longest = match.group(1).lower()
+        # Every other variant starting here is a prefix of the longest one
+        for variant in [v for v in pending if longest.startswith(v)]:
+            positions[variant] = match.start()
+            pending.discard(variant)
+        if not pending:
+            break
+    return positions
 
 
 def extract_match_context(
@@ -83,7 +196,9 @@ def extract_match_context(
     match_position: int,
     words_before: int = 20,
     words_after: int = 20,
-    max_chars_per_line: int = 100
+    max_chars_per_line: int = 100,
+    keyword_start: Optional[int] = None,
+    word_spans: Optional[Tuple[List[Tuple[int, int]], List[int]]] = None
 ) -> Dict[str, str]:
     """
     Extract context around a keyword match using WORD COUNT for better context.
@@ -95,6 +210,8 @@ def extract_match_context(
         words_before: Number of WORDS before match (default: 20)
         words_after: Number of WORDS after match (default: 20)
         max_chars_per_line: Max characters per line (for splitting)
+        keyword_start: Offset of the variant if already located (-1 = not found)
+        word_spans: split_word_spans(article_text), if already computed
         
     Returns:
         Dict with:
@@ -111,11 +228,9 @@ def extract_match_context(
             'full_snippet': article_text[:200] if article_text else ''
         }
     
-    # Find the keyword in the text (case-insensitive)
-    matched_variant_lower = matched_variant.lower()
-    article_text_lower = article_text.lower()
-    
-    keyword_start = article_text_lower.find(matched_variant_lower)
+    if keyword_start is None:
+        # Find the keyword in the text (case-insensitive)
+        keyword_start = _find_variant(article_text, matched_variant)
     
     if keyword_start == -1:
         # Fallback: keyword not found
@@ -129,64 +244,36 @@ def extract_match_context(
     keyword_end = keyword_start + len(matched_variant)
     actual_matched_text = article_text[keyword_start:keyword_end]
     
-    # Extract text before keyword
-    text_before = article_text[:keyword_start]
-    # Extract text after keyword
-    text_after = article_text[keyword_end:]
-    
-    # Split into words (handles both Arabic and English)
-    # For Arabic: split by spaces and Arabic punctuation
-    # For English: split by spaces and punctuation
-    def split_into_words(text):
-        """Split text into words, preserving punctuation context"""
-        # Replace multiple spaces with single space
-        text = re.sub(r'\s+', ' ', text)
-        # Split by spaces
-        words = text.split()
-        return words
-    
-    words_before_list = split_into_words(text_before)
-    words_after_list = split_into_words(text_after)
-    
-    # Take last N words before keyword
-    if len(words_before_list) > words_before:
-        selected_before = words_before_list[-words_before:]
-        has_more_before = True
-    else:
-        selected_before = words_before_list
-        has_more_before = False
-    
-    # Take first N words after keyword
-    if len(words_after_list) > words_after:
-        selected_after = words_after_list[:words_after]
-        has_more_after = True
-    else:
-        selected_after = words_after_list
-        has_more_after = False
+    if word_spans is None:
+        word_spans = split_word_spans(article_text)
+    spans, starts = word_spans
+    
+    # Words fully before the keyword (a word running into it is clipped)
+    i = bisect_left(starts, keyword_start)
+    before_spans = spans[max(0, i - words_before):i]
+    selected_before = [article_text[s:min(e, keyword_start)] for s, e in before_spans]
+    has_more_before = i > words_before
+    
+    # Words after the keyword, starting with the tail of a word it ends inside
+    j = bisect_left(starts, keyword_end)
+    after_spans = spans[j:j + words_after + 1]
+    if j > 0 and spans[j - 1][1] > keyword_end:
+        after_spans = [(keyword_end, spans[j - 1][1])] + after_spans
+    selected_after = [article_text[s:e] for s, e in after_spans[:words_after]]
+    has_more_after = len(after_spans) > words_after
     
     # Build contexts
     before_context = ' '.join(selected_before).strip()
     after_context = ' '.join(selected_after).strip()
     
-    # Build full snippet with [...] markers
-    parts = []
-    
-    if has_more_before:
-        parts.append('[...]')
-    
-    if before_context:
-        parts.append(before_context)
-    
-    # Add the keyword with ** markers for highlighting
-    parts.append(f"**{actual_matched_text}**")
-    
-    if after_context:
-        parts.append(after_context)
-    
-    if has_more_after:
-        parts.append('[...]')
-    
-    full_snippet = ' '.join(parts)
+    # Build full snippet: [...]? before? **keyword** after? [...]?
+    full_snippet = (
+        f"{'[...] ' if has_more_before else ''}"
+        f"{before_context + ' ' if before_context else ''}"
+        f"**{actual_matched_text}**"
+        f"{' ' + after_context if after_context else ''}"
+        f"{' [...]' if has_more_after else ''}"
+    )
     
     return {
         'before_context': before_context,
@@ -223,12 +310,25 @@ def extract_all_match_contexts(
     full_text = strip_html_tags(f"{title}. {summary}")
     if content:
         full_text += f" {strip_html_tags(content)}"
-    
-    # Debug: print what text we have
-    print(f"      📝 Extracting context from text length: {len(full_text)} chars")
-    print(f"         - Title: {len(title)} chars")
-    print(f"         - Summary: {len(summary)} chars")
-    print(f"         - Content: {len(content)} chars")
+    # Word offsets computed once here and shared by every matched keyword
+    word_spans = split_word_spans(full_text)
+    
+    # Debug: what text we have
+    logger.debug("      📝 Extracting context from text length: %d chars "
+                 "(title %d, summary %d, content %d)",
+                 len(full_text), len(title), len(summary), len(content))
+    
+    # Lower-case each variant once, then locate every first-variant in
+    # one case-insensitive pass over the article
+    variants_lower = {
+        variant: variant.lower()
+        for variant in (
+            match_info['matched_variants'][0].get('text', '')
+            for match_info in matched_keywords
+            if match_info.get('matched_variants')
+        )
+    }
+    positions = find_first_occurrences(full_text, set(variants_lower.values()))
     
     contexts = []
     
@@ -244,14 +344,16 @@ def extract_all_match_contexts(
         variant_text = first_variant.get('text', '')
         match_position = first_variant.get('matched_at', 0)
         
-        print(f"      🔍 Looking for variant: '{variant_text}' (keyword: {keyword_ar})")
+        logger.debug("      🔍 Looking for variant: '%s' (keyword: %s)", variant_text, keyword_ar)
         
         context = extract_match_context(
             full_text,
             variant_text,
             match_position,
             words_before,
-            words_after
+            words_after,
+            keyword_start=positions.get(variants_lower.get(variant_text, ''), -1),
+            word_spans=word_spans
         )
         
         context['keyword_ar'] = keyword_ar
@@ -260,7 +362,7 @@ def extract_all_match_contexts(
         # Store original matched text for preserving during translation
         context['preserve_text'] = context.get('matched_text', variant_text)
         
-        print(f"      ✅ Extracted snippet: {context['full_snippet'][:100]}...")
+        logger.debug("      ✅ Extracted snippet: %.100s...", context['full_snippet'])
         
         contexts.append(context)
     
@@ -0,0 +1,57 @@
+"""
+Migration: BRIN indexes on articles.created_at / articles.fetched_at
+
+Articles are append-only and timestamped on insert, so physical order
+tracks time and a BRIN index (one summary per 32 pages) answers
+time-range filters at a fraction of a btree's size. New databases get
+these from models.py; this builds them on existing ones without blocking
+writes.
+
+Run this on Render shell: python backend/migrate_article_brin_indexes.py
+"""
+import os
+import sys
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import text
+
+from models import engine, DATABASE_URL
+
+BRIN_INDEXES = [
+    ("ix_articles_created_brin", "created_at"),
+    ("ix_articles_fetched_brin", "fetched_at"),
+]
+
+def run_migration():
+    print("=" * 60)
+    print("Migration: BRIN indexes on article timestamps")
+    print("=" * 60)
+
+    # Only run on PostgreSQL
+    if 'postgresql' not in DATABASE_URL and 'postgres' not in DATABASE_URL:
+        print("⚠️  This migration is for PostgreSQL only.")
+        print(f"   Current DB: {DATABASE_URL[:50]}...")
+        print("   Skipping migration.")
+        return
+
+    # CONCURRENTLY can't run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for idx_name, column in BRIN_INDEXES:
+            sql = (f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {idx_name} "
+                   f"ON articles USING brin ({column}) WITH (pages_per_range = 32);")
+            print(f"Running: {sql}")
+            try:
+                conn.execute(text(sql))
+                print("  ✅ Done")
+            except Exception as e:
+                print(f"  ❌ Error: {e}")
+
+    print()
+    print("=" * 60)
+    print("✅ BRIN Migration Complete")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    run_migration()
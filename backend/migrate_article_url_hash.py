@@ -0,0 +1,196 @@
+"""
+Migration: Backfill articles.url_hash and make (url_hash, user_id) unique
+
+The url_hash column (64-bit BLAKE2b of the URL) lets duplicate checks
+compare 8-byte keys instead of whole URLs. New rows get it on insert and
+app startup adds the column; this script:
+1. Fills it in for older rows
+2. Builds the unique (url_hash, user_id) index CONCURRENTLY and attaches
+   it as uq_articles_url_hash_user (the global scheduler's ON CONFLICT
+   target)
+3. Makes url_hash NOT NULL without a long table scan under lock
+4. Drops the plain (url_hash, user_id) index and the (url, user_id)
+   unique constraint it supersedes, so no btree holds the full URL
+
+Run it before deploying code whose ON CONFLICT targets (url_hash, user_id).
+
+Run this on Render shell: python backend/migrate_article_url_hash.py
+"""
+import os
+import sys
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from models import engine, Article, DATABASE_URL, url_hash
+from sqlalchemy import bindparam, select, text, update
+
+# Rows hashed and written per transaction
+BATCH_SIZE = 5000
+
+# Give up waiting for the table lock quickly instead of queueing every
+# other query on articles behind a pending ALTER
+LOCK_TIMEOUT = '2s'
+
+UNIQUE_NAME = 'uq_articles_url_hash_user'
+
+def _create_unique_index_pg(conn):
+    """Build the unique index CONCURRENTLY (rebuilding it if a previous run left it invalid)"""
+    valid = conn.execute(text("""
+        SELECT i.indisvalid FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE c.relname = :name
+    """), {"name": UNIQUE_NAME}).scalar()
+    if valid is False:
+        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {UNIQUE_NAME}"))
+    conn.execute(text(
+        f"CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {UNIQUE_NAME} "
+        f"ON articles (url_hash, user_id)"
+    ))
+
+def _finish_pg(conn):
+    """Attach the index as a constraint and set NOT NULL, each under a short lock_timeout"""
+    attached = conn.execute(text("""
+        SELECT 1 FROM pg_constraint
+        WHERE conname = :name AND conrelid = 'articles'::regclass
+    """), {"name": UNIQUE_NAME}).scalar()
+    if not attached:
+        conn.execute(text(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'"))
+        conn.execute(text(
+            f"ALTER TABLE articles ADD CONSTRAINT {UNIQUE_NAME} UNIQUE USING INDEX {UNIQUE_NAME}"
+        ))
+        conn.commit()
+
+    nullable = conn.execute(text("""
+        SELECT is_nullable FROM information_schema.columns
+        WHERE table_name = 'articles' AND column_name = 'url_hash'
+    """)).scalar()
+    conn.commit()
+    if nullable == 'NO':
+        return
+
+    # SET NOT NULL reuses a validated CHECK instead of scanning the table
+    # under ACCESS EXCLUSIVE; VALIDATE itself doesn't block writes
+    conn.execute(text(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'"))
+    conn.execute(text("ALTER TABLE articles DROP CONSTRAINT IF EXISTS articles_url_hash_not_null"))
+    conn.execute(text(
+        "ALTER TABLE articles ADD CONSTRAINT articles_url_hash_not_null "
+        "CHECK (url_hash IS NOT NULL) NOT VALID"
+    ))
+    conn.commit()
+    conn.execute(text("ALTER TABLE articles VALIDATE CONSTRAINT articles_url_hash_not_null"))
+    conn.commit()
+    conn.execute(text(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'"))
+    conn.execute(text("ALTER TABLE articles ALTER COLUMN url_hash SET NOT NULL"))
+    conn.execute(text("ALTER TABLE articles DROP CONSTRAINT articles_url_hash_not_null"))
+    conn.commit()
+
+def _drop_url_unique_pg(conn):
+    """Drop uq_article_url_user, whether models created it as a constraint or startup as an index"""
+    is_constraint = conn.execute(text("""
+        SELECT 1 FROM pg_constraint
+        WHERE conname = 'uq_article_url_user' AND conrelid = 'articles'::regclass
+    """)).scalar()
+    if is_constraint:
+        conn.execute(text(f"SET lock_timeout = '{LOCK_TIMEOUT}'"))
+        conn.execute(text("ALTER TABLE articles DROP CONSTRAINT uq_article_url_user"))
+    else:
+        conn.execute(text("DROP INDEX CONCURRENTLY IF EXISTS uq_article_url_user"))
+
+def run_migration():
+    print("=" * 60)
+    print("Migration: Backfill articles.url_hash")
+    print("=" * 60)
+
+    is_postgres = 'postgresql' in DATABASE_URL or 'postgres' in DATABASE_URL
+
+    # Step 1: Add the column if app startup hasn't yet
+    print("\n[Step 1] Adding url_hash column...")
+    with engine.connect() as conn:
+        try:
+            if is_postgres:
+                conn.execute(text(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'"))
+                conn.execute(text("ALTER TABLE articles ADD COLUMN IF NOT EXISTS url_hash BIGINT"))
+            else:
+                columns = [row[1] for row in conn.execute(text("PRAGMA table_info(articles)"))]
+                if 'url_hash' not in columns:
+                    conn.execute(text("ALTER TABLE articles ADD COLUMN url_hash BIGINT"))
+            conn.commit()
+            print("   ✅ Column ready")
+        except Exception as e:
+            print(f"   ❌ Error: {e}")
+            return
+
+    # Step 2: Hash in Python (BLAKE2b isn't available in SQL), keyset-paged by id
+    print("\n[Step 2] Backfilling url_hash...")
+    stmt = (
+        update(Article)
+        .where(Article.id == bindparam('_id'))
+        .values(url_hash=bindparam('url_hash'))
+    )
+    total = 0
+    last_id = 0
+    with engine.connect() as conn:
+        while True:
+            rows = conn.execute(
+                select(Article.id, Article.url)
+                .where(Article.url_hash.is_(None), Article.id > last_id)
+                .order_by(Article.id)
+                .limit(BATCH_SIZE)
+            ).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            conn.execute(stmt, [{'_id': row.id, 'url_hash': url_hash(row.url)} for row in rows])
+            conn.commit()
+            total += len(rows)
+            print(f"   ✅ {total} rows hashed")
+
+    # Step 3: Unique (url_hash, user_id), replacing the plain index
+    # (CONCURRENTLY needs autocommit)
+    print("\n[Step 3] Creating unique (url_hash, user_id) index...")
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        try:
+            if is_postgres:
+                _create_unique_index_pg(conn)
+                conn.execute(text("DROP INDEX CONCURRENTLY IF EXISTS ix_articles_url_hash_user"))
+            else:
+                conn.execute(text(
+                    f"CREATE UNIQUE INDEX IF NOT EXISTS {UNIQUE_NAME} ON articles (url_hash, user_id)"
+                ))
+                conn.execute(text("DROP INDEX IF EXISTS ix_articles_url_hash_user"))
+            print("   ✅ Index ready")
+        except Exception as e:
+            print(f"   ❌ Error: {e}")
+            return
+
+    # Step 4: NOT NULL (SQLite can't alter a column; the app always sets it)
+    if is_postgres:
+        print("\n[Step 4] Setting url_hash NOT NULL...")
+        with engine.connect() as conn:
+            try:
+                _finish_pg(conn)
+                print("   ✅ Constraints ready")
+            except Exception as e:
+                conn.rollback()
+                print(f"   ❌ Error: {e}")
+
+    # Step 5: URL uniqueness now lives on (url_hash, user_id)
+    print("\n[Step 5] Dropping (url, user_id) unique constraint...")
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        try:
+            if is_postgres:
+                _drop_url_unique_pg(conn)
+            else:
+                # A table-level UNIQUE is rebuilt away by app startup
+                conn.execute(text("DROP INDEX IF EXISTS uq_article_url_user"))
+            print("   ✅ Done")
+        except Exception as e:
+            print(f"   ❌ Error: {e}")
+
+    print("\n" + "=" * 60)
+    print(f"Migration Complete! Backfilled {total} articles")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    run_migration()
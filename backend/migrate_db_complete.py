@@ -3,17 +3,38 @@ Complete Database Migration Script
 Handles all migrations from v1 to latest version
 Idempotent - safe to run multiple times
 """
-import sqlite3
+from sqlite_migration import get_sqlite_conn
+
+
+def _existing_columns(cursor, table):
+    """Column names of a table, read once instead of probing with ALTERs"""
+    return {row[1] for row in cursor.execute(f"PRAGMA table_info({table})")}
+
+
+def _add_missing_columns(cursor, table, columns):
+    """ALTER in only the columns the table doesn't have yet"""
+    existing = _existing_columns(cursor, table)
+    for col_name, col_type in columns:
+        if col_name in existing:
+            print(f"   ⏭️ {table}.{col_name} already exists")
+        else:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {col_name} {col_type}")
+            print(f"   ✅ Added {table}.{col_name}")
+
 
 def migrate_complete():
     """Run all migrations in order"""
-    conn = sqlite3.connect('ain_news.db')
+    # Autocommit mode so the explicit BEGIN/COMMIT below is the only transaction
+    conn = get_sqlite_conn('ain_news.db')
     cursor = conn.cursor()
     
     print("🔄 Running complete database migration...")
     print("=" * 60)
     
     try:
+        # One write transaction for every ALTER and UPDATE
+        cursor.execute("BEGIN IMMEDIATE")
+        
         # ========== MIGRATION 1: Add translation columns to keywords ==========
         print("\n📝 Migration 1: Adding keyword translation columns...")
         
@@ -27,15 +48,7 @@ def migrate_complete():
             ('text_es', 'VARCHAR(200)')
         ]
         
-        for col_name, col_type in keyword_columns:
-            try:
-                cursor.execute(f"ALTER TABLE keywords ADD COLUMN {col_name} {col_type}")
-                print(f"   ✅ Added keywords.{col_name}")
-            except sqlite3.OperationalError as e:
-                if 'duplicate column name' in str(e):
-                    print(f"   ⏭️ keywords.{col_name} already exists")
-                else:
-                    raise
+        _add_missing_columns(cursor, 'keywords', keyword_columns)
         
         # ========== MIGRATION 2: Add new columns to articles ==========
         print("\n📝 Migration 2: Adding article schema columns...")
@@ -50,15 +63,7 @@ def migrate_complete():
             ('fetched_at', 'DATETIME'),
         ]
         
-        for col_name, col_type in article_columns:
-            try:
-                cursor.execute(f"ALTER TABLE articles ADD COLUMN {col_name} {col_type}")
-                print(f"   ✅ Added articles.{col_name}")
-            except sqlite3.OperationalError as e:
-                if 'duplicate column name' in str(e):
-                    print(f"   ⏭️ articles.{col_name} already exists")
-                else:
-                    raise
+        _add_missing_columns(cursor, 'articles', article_columns)
         
         # ========== MIGRATION 3: Migrate existing data ==========
         print("\n📝 Migration 3: Migrating existing data to new columns...")
@@ -75,7 +80,7 @@ def migrate_complete():
             print(f"   ⚠️ Data migration warning (may be expected for new DB): {e}")
         
         # ========== COMMIT ALL CHANGES ==========
-        conn.commit()
+        cursor.execute("COMMIT")
         
         print("\n" + "=" * 60)
         print("✅ Complete migration finished successfully!")
@@ -99,7 +104,8 @@ def migrate_complete():
     except Exception as e:
         print(f"\n❌ Migration failed: {str(e)}")
         print("   Rolling back changes...")
-        conn.rollback()
+        if conn.in_transaction:
+            cursor.execute("ROLLBACK")
         raise
     finally:
         conn.close()
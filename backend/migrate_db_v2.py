@@ -4,13 +4,19 @@ Run this to add new columns to articles table
 """
 import sqlite3
 
+from sqlite_migration import get_sqlite_conn
+
 def migrate():
-    conn = sqlite3.connect('ain_news.db')
+    # Autocommit mode so the explicit BEGIN/COMMIT below is the only transaction
+    conn = get_sqlite_conn('ain_news.db')
     cursor = conn.cursor()
     
     print("🔄 Migrating database to v2...")
     
     try:
+        # One write transaction (one fsync) for every ALTER and UPDATE
+        cursor.execute("BEGIN IMMEDIATE")
+        
         # Rename old columns and add new ones for articles table
         print("📝 Updating articles table schema...")
         
@@ -29,7 +35,8 @@ def migrate():
                 cursor.execute(f"ALTER TABLE articles ADD COLUMN {col_name} {col_type}")
                 print(f"   ✅ Added {col_name}")
             except sqlite3.OperationalError as e:
-                if 'duplicate column name' in str(e):
+                # Duplicates are a generic SQLITE_ERROR; the message prefix is fixed
+                if e.sqlite_errorcode == sqlite3.SQLITE_ERROR and str(e).startswith('duplicate column name'):
                     print(f"   ⏭️ {col_name} already exists")
                 else:
                     raise
@@ -46,12 +53,13 @@ def migrate():
         except Exception as e:
             print(f"   ⚠️ Data migration error (may be expected if fresh DB): {e}")
         
-        conn.commit()
+        cursor.execute("COMMIT")
         print("\n✅ Migration v2 completed successfully!")
         
     except Exception as e:
         print(f"\n❌ Migration failed: {str(e)}")
-        conn.rollback()
+        if conn.in_transaction:
+            cursor.execute("ROLLBACK")
     finally:
         conn.close()
 
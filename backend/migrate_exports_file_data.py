@@ -18,72 +18,86 @@ DATABASE_URL = os.environ.get('DATABASE_URL', 'sqlite:///./news_monitor.db')
 if DATABASE_URL.startswith('postgres://'):
     DATABASE_URL = DATABASE_URL.replace('postgres://', 'postgresql://', 1)
 
-def table_exists(conn, table_name, is_postgres):
-    """Check if a table exists in the database."""
-    try:
-        if is_postgres:
-            result = conn.execute(text(
-                "SELECT EXISTS (SELECT FROM information_schema.tables WHERE table_name = :table)"
-            ), {"table": table_name})
-            return result.scalar()
-        else:
-            result = conn.execute(text(
-                f"SELECT name FROM sqlite_master WHERE type='table' AND name='{table_name}'"
-            ))
-            return result.fetchone() is not None
-    except Exception:
-        return False
+# Set once the column is confirmed, so repeat calls in this process are free
+_MIGRATION_DONE = False
 
-def column_exists(conn, table_name, column_name, is_postgres):
-    """Check if a column exists in a table."""
+def schema_state(conn, table_name, column_name, is_postgres):
+    """Check table and column existence in one round-trip. Returns (table, column)."""
     try:
         if is_postgres:
-            result = conn.execute(text("""
-                SELECT column_name FROM information_schema.columns 
-                WHERE table_name = :table AND column_name = :column
-            """), {"table": table_name, "column": column_name})
-            return result.fetchone() is not None
+            row = conn.execute(text("""
+                SELECT to_regclass(:table) IS NOT NULL,
+                       EXISTS (SELECT 1 FROM information_schema.columns
+                               WHERE table_name = :table AND column_name = :column)
+            """), {"table": table_name, "column": column_name}).fetchone()
+            return bool(row[0]), bool(row[1])
         else:
+            # PRAGMA table_info returns no rows for a missing table
             result = conn.execute(text(f"PRAGMA table_info({table_name})"))
             columns = [row[1] for row in result.fetchall()]
-            return column_name in columns
+            return bool(columns), column_name in columns
     except Exception:
-        return False
+        return False, False
+
+# SQLSTATEs meaning the column (or table) is already there
+DUPLICATE_COLUMN = '42701'
+DUPLICATE_TABLE = '42P07'
+
+def is_already_exists(exc):
+    """Classify a DB error by SQLSTATE (PostgreSQL) or SQLite error code, not message text."""
+    orig = getattr(exc, 'orig', None)
+    code = getattr(orig, 'pgcode', None) or getattr(orig, 'sqlstate', None)
+    if code:
+        return code in (DUPLICATE_COLUMN, DUPLICATE_TABLE)
+    # SQLite has no SQLSTATE; duplicates are a generic SQLITE_ERROR (1)
+    return (getattr(orig, 'sqlite_errorcode', None) == 1
+            and str(orig).startswith('duplicate column'))
 
 def run_migration(silent=False):
     """Run the migration. Returns True on success."""
+    global _MIGRATION_DONE
+    
     def log(msg):
         if not silent:
             print(msg)
     
+    if _MIGRATION_DONE:
+        return True
+    
     log("🔄 Running exports file_data migration...")
     engine = create_engine(DATABASE_URL)
     is_postgres = 'postgresql' in DATABASE_URL
     
     with engine.connect() as conn:
+        has_table, has_column = schema_state(conn, 'exports', 'file_data', is_postgres)
+        
         # Check if exports table exists
-        if not table_exists(conn, 'exports', is_postgres):
+        if not has_table:
             log("⚠️  Exports table doesn't exist yet. Will be created by init_db.")
             return True
         
         # Check if column already exists
-        if column_exists(conn, 'exports', 'file_data', is_postgres):
+        if has_column:
             log("✅ Column 'file_data' already exists.")
+            _MIGRATION_DONE = True
             return True
         
         # Add the column
         try:
             if is_postgres:
+                # Catalog-only change; fail fast rather than queue behind long queries
+                conn.execute(text("SET LOCAL lock_timeout = '2s'"))
                 conn.execute(text("ALTER TABLE exports ADD COLUMN file_data BYTEA"))
             else:
                 conn.execute(text("ALTER TABLE exports ADD COLUMN file_data BLOB"))
             conn.commit()
             log("✅ Successfully added 'file_data' column to exports table.")
+            _MIGRATION_DONE = True
             return True
         except (OperationalError, ProgrammingError) as e:
-            err_str = str(e).lower()
-            if 'duplicate column' in err_str or 'already exists' in err_str:
+            if is_already_exists(e):
                 log("✅ Column 'file_data' already exists.")
+                _MIGRATION_DONE = True
                 return True
             log(f"❌ Migration failed: {e}")
             return False
@@ -4,19 +4,52 @@ Phase 1 of the stability fix plan
 
 This migration increases:
 - sources.url: 500 -> 2000
-- articles.url: 500 -> 2000  
-- articles.image_url: 1000 -> 2000
+- articles.url: 500 -> TEXT
+- articles.image_url: 1000 -> TEXT
+
+and drops the old single-column indexes on articles.url: duplicate
+checks use url_hash instead (see migrate_article_url_hash.py).
 
 Run this on Render shell: python backend/migrate_increase_url_columns.py
 """
 import os
 import sys
+import time
 
 # Add backend to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+from sqlalchemy import text
+
 from models import engine, DATABASE_URL
 
+# Give up waiting for the table lock quickly (and retry) instead of queueing
+# every other query on the table behind a pending ALTER
+LOCK_TIMEOUT = '2s'
+LOCK_RETRIES = 5
+LOCK_NOT_AVAILABLE = '55P03'
+
+def _alter_with_lock_timeout(conn, sql):
+    """
+    Run one ALTER under a short lock_timeout, retrying with backoff.
+    
+    VARCHAR -> TEXT only touches the catalog, so the ACCESS EXCLUSIVE lock
+    is held for milliseconds; the risk is waiting for it behind a long
+    query while blocking everyone queued after us.
+    """
+    for attempt in range(1, LOCK_RETRIES + 1):
+        try:
+            conn.execute(text(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'"))
+            conn.execute(text(sql))
+            conn.commit()
+            return
+        except Exception as e:
+            conn.rollback()
+            if getattr(getattr(e, 'orig', None), 'pgcode', None) != LOCK_NOT_AVAILABLE or attempt == LOCK_RETRIES:
+                raise
+            print(f"  ⏳ Table busy, retrying ({attempt}/{LOCK_RETRIES})...")
+            time.sleep(2 ** attempt)
+
 def run_migration():
     print("=" * 60)
     print("Migration: Increase URL Column Sizes")
@@ -32,25 +65,58 @@ def run_migration():
     print(f"Database: PostgreSQL")
     print()
     
+    # (column type, information_schema data_type, character_maximum_length)
     migrations = [
-        ("sources", "url", "VARCHAR(2000)"),
-        ("articles", "url", "VARCHAR(2000)"),
-        ("articles", "image_url", "VARCHAR(2000)"),
+        ("sources", "url", "VARCHAR(2000)", "character varying", 2000),
+        ("articles", "url", "TEXT", "text", None),
+        ("articles", "image_url", "TEXT", "text", None),
     ]
     
     with engine.connect() as conn:
-        for table, column, new_type in migrations:
-            sql = f'ALTER TABLE {table} ALTER COLUMN {column} TYPE {new_type};'
+        # One ALTER per table: a single ACCESS EXCLUSIVE lock and table pass
+        # instead of one per column. Columns already at their target type
+        # are skipped, so re-runs don't take the lock at all.
+        by_table = {}
+        for table, column, new_type, data_type, max_length in migrations:
+            current = conn.execute(text("""
+                SELECT data_type, character_maximum_length FROM information_schema.columns
+                WHERE table_name = :table AND column_name = :column
+            """), {"table": table, "column": column}).first()
+            if current is None:
+                print(f"  ⏭️  {table}.{column} doesn't exist")
+            elif tuple(current) == (data_type, max_length):
+                print(f"  ⏭️  {table}.{column} already {new_type}")
+            else:
+                by_table.setdefault(table, []).append((column, new_type))
+        conn.rollback()
+        
+        for table, columns in by_table.items():
+            clauses = ', '.join(
+                f'ALTER COLUMN {column} TYPE {new_type}' for column, new_type in columns
+            )
+            sql = f'ALTER TABLE {table} {clauses};'
+            print(f"Running: {sql}")
+            try:
+                _alter_with_lock_timeout(conn, sql)
+                for column, new_type in columns:
+                    print(f"  ✅ {table}.{column} -> {new_type}")
+            except Exception as e:
+                print(f"  ❌ Error: {e}")
+    
+    # CONCURRENTLY can't run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for sql in (
+            "DROP INDEX CONCURRENTLY IF EXISTS ix_articles_url;",
+            # Hash indexes on url from earlier versions of this migration
+            "DROP INDEX CONCURRENTLY IF EXISTS ix_articles_url_hash;",
+            "DROP INDEX CONCURRENTLY IF EXISTS ix_articles_url_hashidx;",
+        ):
             print(f"Running: {sql}")
             try:
-                conn.execute(sql)
-                conn.commit()
-                print(f"  ✅ {table}.{column} -> {new_type}")
+                conn.execute(text(sql))
+                print("  ✅ Done")
             except Exception as e:
-                if "already" in str(e).lower():
-                    print(f"  ⏭️  Already migrated")
-                else:
-                    print(f"  ❌ Error: {e}")
+                print(f"  ❌ Error: {e}")
     
     print()
     print("=" * 60)
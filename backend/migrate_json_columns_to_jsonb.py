@@ -0,0 +1,107 @@
+"""
+Migration: Store JSON text columns as JSONB on PostgreSQL
+
+Converts the columns declared as JSONText in models.py from TEXT to JSONB:
+- keywords.translations_json (+ GIN index for key lookups)
+- articles.keywords_translations, user_articles.keywords_translations
+- audit_log.meta_json, monitor_jobs.meta_json
+- exports.filters_json, search_history.filters_json
+
+Empty strings become NULL and any value that isn't valid JSON is kept as
+a JSON string, so the conversion never fails on old rows.
+
+Each ALTER rewrites its table under an exclusive lock - run off-peak.
+Run this on Render shell: python backend/migrate_json_columns_to_jsonb.py
+"""
+import os
+import sys
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import text
+
+from models import engine, DATABASE_URL
+
+JSON_COLUMNS = [
+    ("keywords", "translations_json"),
+    ("articles", "keywords_translations"),
+    ("user_articles", "keywords_translations"),
+    ("audit_log", "meta_json"),
+    ("monitor_jobs", "meta_json"),
+    ("exports", "filters_json"),
+    ("search_history", "filters_json"),
+]
+
+# Session-local helper: cast text to jsonb, falling back to a JSON string
+TRY_JSONB = """
+    CREATE FUNCTION pg_temp.try_jsonb(value text) RETURNS jsonb AS $$
+    BEGIN
+        IF value IS NULL OR value = '' THEN
+            RETURN NULL;
+        END IF;
+        RETURN value::jsonb;
+    EXCEPTION WHEN invalid_text_representation THEN
+        RETURN to_jsonb(value);
+    END;
+    $$ LANGUAGE plpgsql IMMUTABLE
+"""
+
+def run_migration():
+    print("=" * 60)
+    print("Migration: JSON text columns -> JSONB")
+    print("=" * 60)
+
+    # Only run on PostgreSQL
+    if 'postgresql' not in DATABASE_URL and 'postgres' not in DATABASE_URL:
+        print("⚠️  This migration is for PostgreSQL only.")
+        print(f"   Current DB: {DATABASE_URL[:50]}...")
+        print("   Skipping migration.")
+        return
+
+    with engine.connect() as conn:
+        conn.execute(text(TRY_JSONB))
+        conn.commit()
+
+        for table, column in JSON_COLUMNS:
+            data_type = conn.execute(text("""
+                SELECT data_type FROM information_schema.columns
+                WHERE table_name = :table AND column_name = :column
+            """), {"table": table, "column": column}).scalar()
+            if data_type is None:
+                print(f"  ⏭️  {table}.{column} doesn't exist")
+                continue
+            if data_type == 'jsonb':
+                print(f"  ⏭️  {table}.{column} already JSONB")
+                continue
+
+            sql = (f"ALTER TABLE {table} ALTER COLUMN {column} TYPE JSONB "
+                   f"USING pg_temp.try_jsonb({column})")
+            print(f"Running: {sql}")
+            try:
+                conn.execute(text("SET LOCAL lock_timeout = '2s'"))
+                conn.execute(text(sql))
+                conn.commit()
+                print(f"  ✅ {table}.{column} -> JSONB")
+            except Exception as e:
+                conn.rollback()
+                print(f"  ❌ Error: {e}")
+
+    # CONCURRENTLY can't run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        sql = ("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_keywords_translations_gin "
+               "ON keywords USING gin (translations_json jsonb_path_ops);")
+        print(f"Running: {sql}")
+        try:
+            conn.execute(text(sql))
+            print("  ✅ Done")
+        except Exception as e:
+            print(f"  ❌ Error: {e}")
+
+    print()
+    print("=" * 60)
+    print("✅ JSONB Migration Complete")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    run_migration()
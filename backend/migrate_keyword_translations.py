@@ -9,15 +9,20 @@ This migration:
 
 Run this on Render shell: python backend/migrate_keyword_translations.py
 """
+import logging
 import os
 import sys
 
 # Add backend to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+from config import LOG_LEVEL
 from models import engine, get_db, Keyword, DATABASE_URL
-from keyword_expansion import expand_keyword
-from sqlalchemy import text
+from keyword_expansion import expand_keywords
+from sqlalchemy import or_, text
+
+# Keywords translated and committed together
+BATCH_SIZE = 500
 
 def run_migration():
     print("=" * 60)
@@ -34,8 +39,13 @@ def run_migration():
         if is_postgres:
             # PostgreSQL syntax
             try:
-                conn.execute(text("ALTER TABLE keywords ADD COLUMN IF NOT EXISTS translations_json TEXT"))
-                conn.execute(text("ALTER TABLE keywords ADD COLUMN IF NOT EXISTS translations_updated_at TIMESTAMP"))
+                # Nullable columns without defaults are catalog-only; just don't
+                # queue behind long queries holding the table
+                conn.execute(text("SET LOCAL lock_timeout = '2s'"))
+                conn.execute(text(
+                    "ALTER TABLE keywords ADD COLUMN IF NOT EXISTS translations_json TEXT, "
+                    "ADD COLUMN IF NOT EXISTS translations_updated_at TIMESTAMP"
+                ))
                 conn.commit()
                 print("   ✅ Columns added (PostgreSQL)")
             except Exception as e:
@@ -67,35 +77,51 @@ def run_migration():
     
     db = get_db()
     try:
-        keywords = db.query(Keyword).filter(Keyword.enabled == True).all()
-        print(f"   Found {len(keywords)} enabled keywords")
+        enabled = db.query(Keyword).filter(Keyword.enabled == True)
+        untranslated = or_(Keyword.translations_json.is_(None), Keyword.translations_json == '')
+        total = enabled.count()
+        pending_total = enabled.filter(untranslated).count()
+        print(f"   Found {total} enabled keywords")
         
-        success_count = 0
+        # Skip if already has translations
+        success_count = total - pending_total
         fail_count = 0
+        print(f"   ⏭️ {success_count} already have translations, skipping")
         
-        for i, kw in enumerate(keywords, 1):
-            print(f"\n   [{i}/{len(keywords)}] {kw.text_ar}")
+        # Keyset pages of (id, text_ar) only: memory stays flat however many
+        # keywords there are, and the per-batch commits don't invalidate an
+        # open cursor. Each page costs one concurrent request per language
+        # (not per keyword) and one commit.
+        done = 0
+        last_id = 0
+        while True:
+            chunk = (
+                enabled.filter(untranslated, Keyword.id > last_id)
+                .with_entities(Keyword.id, Keyword.text_ar)
+                .order_by(Keyword.id)
+                .limit(BATCH_SIZE)
+                .all()
+            )
+            if not chunk:
+                break
+            last_id = chunk[-1].id
+            print(f"\n   [{done + 1}-{done + len(chunk)}/{pending_total}] Translating batch...")
+            done += len(chunk)
             
-            # Skip if already has translations
-            if kw.translations_json:
-                print(f"      ⏭️ Already has translations, skipping")
-                success_count += 1
+            try:
+                expansions = expand_keywords(chunk, db)
+            except Exception as e:
+                db.rollback()
+                fail_count += len(chunk)
+                print(f"      ❌ Error: {str(e)[:50]}")
                 continue
             
-            try:
-                # Expand and save to database
-                expansion = expand_keyword(kw.text_ar, keyword_obj=kw, db=db)
-                
+            for kw, expansion in zip(chunk, expansions):
                 if expansion['status'] in ['success', 'partial']:
                     success_count += 1
-                    print(f"      ✅ Translated to {len(expansion['translations'])} languages")
                 else:
                     fail_count += 1
-                    print(f"      ❌ Translation failed")
-                    
-            except Exception as e:
-                fail_count += 1
-                print(f"      ❌ Error: {str(e)[:50]}")
+                    print(f"      ❌ Translation failed: {kw.text_ar}")
         
         print(f"\n" + "=" * 60)
         print(f"Migration Complete!")
@@ -107,4 +133,6 @@ def run_migration():
         db.close()
 
 if __name__ == "__main__":
+    # keyword_expansion reports translation progress and failures via logging
+    logging.basicConfig(level=LOG_LEVEL)
     run_migration()
@@ -1,6 +1,7 @@
-import sqlite3
 import os
 
+from sqlite_migration import get_sqlite_conn
+
 DB_PATH = "ain_news.db"
 
 
@@ -9,7 +10,8 @@ def main():
         print(f"DB not found at {DB_PATH}")
         return
 
-    conn = sqlite3.connect(DB_PATH)
+    # Autocommit mode so the explicit BEGIN/COMMIT below is the only transaction
+    conn = get_sqlite_conn(DB_PATH)
     cur = conn.cursor()
 
     print("1) Inspect existing keywords schema...")
@@ -19,7 +21,22 @@ def main():
     for c in cols:
         print("    ", c)
 
-    print("\n2) Create new table keywords_new with per-user unique constraint...")
+    try:
+        cur.execute("BEGIN IMMEDIATE")
+        _rebuild_keywords(cur)
+        cur.execute("COMMIT")
+    except Exception:
+        if conn.in_transaction:
+            cur.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+    print("\n✅ Migration complete. 'keywords' is now unique per (user_id, text_ar).")
+
+
+def _rebuild_keywords(cur):
+    """Copy keywords into a per-user table; indexes are built after the copy"""
+    print("\n2) Create new table keywords_new...")
     cur.execute(
         """
         CREATE TABLE IF NOT EXISTS keywords_new (
@@ -34,8 +51,7 @@ def main():
             text_ru VARCHAR(200),
             text_es VARCHAR(200),
             enabled BOOLEAN DEFAULT 1,
-            created_at DATETIME,
-            UNIQUE(user_id, text_ar)
+            created_at DATETIME
         );
         """
     )
@@ -60,9 +76,12 @@ def main():
     print("5) Rename keywords_new -> keywords...")
     cur.execute("ALTER TABLE keywords_new RENAME TO keywords;")
 
-    conn.commit()
-    conn.close()
-    print("\n✅ Migration complete. 'keywords' is now unique per (user_id, text_ar).")
+    print("6) Create (user_id, id) index for ownership lookups...")
+    cur.execute("CREATE INDEX IF NOT EXISTS ix_keywords_user_id_id ON keywords(user_id, id);")
+
+    # Built once over the copied rows instead of maintained row by row
+    print("7) Create per-user unique index on (user_id, text_ar)...")
+    cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS ux_keywords_user_text ON keywords(user_id, text_ar);")
 
 
 if __name__ == "__main__":
@@ -5,16 +5,52 @@ All tables in the DB must have a corresponding model here to prevent schema mism
 
 IMPORTANT: Do not modify table structures here without a migration plan.
 """
+import hashlib
+import json
 import os
-from sqlalchemy import create_engine, Column, Integer, String, Boolean, DateTime, Text, ForeignKey, UniqueConstraint, LargeBinary
+from functools import lru_cache
+from sqlalchemy import create_engine, Column, Integer, BigInteger, String, Boolean, DateTime, Text, ForeignKey, UniqueConstraint, Index, LargeBinary
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.types import TypeDecorator
 from datetime import datetime
 from flask_login import UserMixin
 
 Base = declarative_base()
 
 
+class JSONText(TypeDecorator):
+    """JSON document stored as JSONB on PostgreSQL and TEXT elsewhere.
+    
+    Application code keeps reading and writing JSON strings on every
+    backend; on PostgreSQL the value is validated, stored in binary form
+    and can be GIN-indexed and queried with jsonb operators.
+    """
+    impl = Text
+    cache_ok = True
+    
+    def load_dialect_impl(self, dialect):
+        if dialect.name == 'postgresql':
+            return dialect.type_descriptor(JSONB(none_as_null=True))
+        return dialect.type_descriptor(Text())
+    
+    def process_bind_param(self, value, dialect):
+        if dialect.name != 'postgresql' or not isinstance(value, str):
+            return value
+        if not value:
+            return None  # '' isn't a JSON document
+        try:
+            return json.loads(value)
+        except ValueError:
+            return value  # Free text (e.g. a str() fallback) kept as a JSON string
+    
+    def process_result_value(self, value, dialect):
+        if value is None or isinstance(value, str):
+            return value
+        return json.dumps(value, ensure_ascii=False)
+
+
 class User(UserMixin, Base):
     __tablename__ = 'users'
 
@@ -43,7 +79,7 @@ class Source(Base):
     
     id = Column(Integer, primary_key=True)
     country_id = Column(Integer, nullable=False)
-    country_name = Column(String(100), nullable=False)
+    country_name = Column(String(100), nullable=False, index=True)
     name = Column(String(200), nullable=False)
     url = Column(String(2000), nullable=False, unique=True)
     enabled = Column(Boolean, default=True)
@@ -53,11 +89,16 @@ class Source(Base):
 
 class Keyword(Base):
     __tablename__ = 'keywords'
+    __table_args__ = (
+        # jsonb containment/key lookups on translations (PostgreSQL only)
+        Index('ix_keywords_translations_gin', 'translations_json', postgresql_using='gin',
+              postgresql_ops={'translations_json': 'jsonb_path_ops'}).ddl_if(dialect='postgresql'),
+    )
     
     id = Column(Integer, primary_key=True)
     # Owner (null for legacy/global; backfill to admin)
     user_id = Column(Integer, ForeignKey('users.id'), nullable=True, index=True)
-    text_ar = Column(String(200), nullable=False)
+    text_ar = Column(String(200), nullable=False, index=True)
     
     # Translations in different languages (legacy columns - kept for compatibility)
     text_en = Column(String(200), nullable=True)  # English
@@ -69,16 +110,40 @@ class Keyword(Base):
     text_es = Column(String(200), nullable=True)  # Spanish
     
     # NEW: All translations as JSON (supports 33+ languages)
-    translations_json = Column(Text, nullable=True)  # {"en": "...", "fr": "...", ...}
+    translations_json = Column(JSONText, nullable=True)  # {"en": "...", "fr": "...", ...}
     translations_updated_at = Column(DateTime, nullable=True)  # When translations were last updated
     
     enabled = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+def url_hash(url):
+    """Signed 64-bit BLAKE2b of a URL, for fixed-size duplicate probes"""
+    return int.from_bytes(hashlib.blake2b(url.encode('utf-8'), digest_size=8).digest(), 'little', signed=True)
+
+
+def _default_url_hash(context):
+    """Fill url_hash on inserts that don't set it explicitly"""
+    url = context.get_current_parameters().get('url')
+    return url_hash(url) if url is not None else None
+
+
 class Article(Base):
     __tablename__ = 'articles'
     __table_args__ = (
-        UniqueConstraint('url', 'user_id', name='uq_article_url_user'),
+        # Dashboard listing: user-scoped, optionally by keyword, newest first
+        Index('ix_articles_user_created', 'user_id', 'created_at'),
+        Index('ix_articles_user_kw_created', 'user_id', 'keyword_original', 'created_at'),
+        # Per-user uniqueness on the 8-byte url_hash: duplicate probes and
+        # ON CONFLICT compare fixed-size keys, and no btree holds the full
+        # (uncapped) URL (existing databases: migrate_article_url_hash.py)
+        UniqueConstraint('url_hash', 'user_id', name='uq_articles_url_hash_user'),
+        # Time-range filters on append-only timestamps: BRIN is a few pages
+        # where a btree is GBs (PostgreSQL only; the btree on created_at
+        # still serves ORDER BY ... LIMIT)
+        Index('ix_articles_created_brin', 'created_at', postgresql_using='brin',
+              postgresql_with={'pages_per_range': 32}).ddl_if(dialect='postgresql'),
+        Index('ix_articles_fetched_brin', 'fetched_at', postgresql_using='brin',
+              postgresql_with={'pages_per_range': 32}).ddl_if(dialect='postgresql'),
     )
     
     id = Column(Integer, primary_key=True)
@@ -86,13 +151,14 @@ class Article(Base):
     # Source info
     country = Column(String(100), nullable=False, index=True)
     source_name = Column(String(200), nullable=False, index=True)
-    url = Column(String(2000), nullable=False, index=True)
+    url = Column(Text, nullable=False)
+    url_hash = Column(BigInteger, nullable=False, default=_default_url_hash)  # url_hash(url)
     
     # Original content
     title_original = Column(Text, nullable=False)
     summary_original = Column(Text, nullable=True)
     original_language = Column(String(10), nullable=True)  # Detected language (en, ar, fr, etc.)
-    image_url = Column(String(2000), nullable=True)  # Article image/thumbnail
+    image_url = Column(Text, nullable=True)  # Article image/thumbnail
     
     # Arabic translation
     title_ar = Column(Text, nullable=True)
@@ -102,7 +168,7 @@ class Article(Base):
     # Keywords
     keyword = Column(String(200), nullable=True)  # OLD - deprecated but kept for compatibility
     keyword_original = Column(String(200), nullable=True, index=True)  # NEW - Arabic keyword that matched
-    keywords_translations = Column(Text, nullable=True)  # JSON of all translations
+    keywords_translations = Column(JSONText, nullable=True)  # JSON of all translations
     
     # Sentiment
     sentiment = Column(String(50), nullable=True)  # OLD - deprecated but kept for compatibility
@@ -125,7 +191,7 @@ class AuditLog(Base):
     user_id = Column(Integer, ForeignKey('users.id'), nullable=True, index=True)
     admin_id = Column(Integer, ForeignKey('users.id'), nullable=True, index=True)
     action = Column(String(100), nullable=False)
-    meta_json = Column(Text, nullable=True)
+    meta_json = Column(JSONText, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
 
@@ -134,7 +200,7 @@ class ExportRecord(Base):
 
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey('users.id'), nullable=False, index=True)
-    filters_json = Column(Text, nullable=True)
+    filters_json = Column(JSONText, nullable=True)
     article_count = Column(Integer, default=0)
     filename = Column(String(255), nullable=True)  # Original filename
     stored_filename = Column(String(255), nullable=True)  # UUID filename on disk (legacy)
@@ -166,7 +232,7 @@ class SearchHistory(Base):
     user_id = Column(Integer, ForeignKey('users.id'), nullable=False, index=True)
     search_type = Column(String(50), nullable=False)  # 'keyword', 'direct', 'headlines'
     query = Column(Text, nullable=True)  # Search query or keyword
-    filters_json = Column(Text, nullable=True)  # JSON of applied filters
+    filters_json = Column(JSONText, nullable=True)  # JSON of applied filters
     results_count = Column(Integer, default=0)
     created_at = Column(DateTime, default=datetime.utcnow)
 
@@ -196,7 +262,7 @@ class UserArticle(Base):
     article_id = Column(Integer, ForeignKey('articles.id'), nullable=False, index=True)
     keyword_id = Column(Integer, ForeignKey('keywords.id'), nullable=True)
     keyword_original = Column(String(200), nullable=True)
-    keywords_translations = Column(Text, nullable=True)
+    keywords_translations = Column(JSONText, nullable=True)
     sentiment_label = Column(String(50), nullable=True)
     sentiment_score = Column(String(20), nullable=True)
     is_read = Column(Boolean, default=False)
@@ -249,6 +315,16 @@ class UserSource(Base):
 # Monitor Jobs - Background Job Tracking
 # ==============================================================================
 
+@lru_cache(maxsize=1024)
+def _isoformat(dt):
+    """ISO string for a job timestamp, shared across polls.
+    
+    Status polls load a fresh MonitorJob per request, so per-instance
+    caching never hits; the timestamps themselves repeat on every poll.
+    """
+    return dt.isoformat()
+
+
 class MonitorJob(Base):
     """
     Tracks monitoring job execution for async/background processing.
@@ -262,6 +338,12 @@ class MonitorJob(Base):
     - Persistence across server restarts
     """
     __tablename__ = 'monitor_jobs'
+    __table_args__ = (
+        # Active-job lookup filters on both (see JobExecutor._active_job_filter)
+        Index('ix_monitor_jobs_user_status', 'user_id', 'status'),
+        # Hourly rate-limit count (see JobExecutor._check_rate_limit)
+        Index('ix_monitor_jobs_user_created', 'user_id', 'created_at'),
+    )
 
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey('users.id'), nullable=False, index=True)
@@ -287,7 +369,7 @@ class MonitorJob(Base):
     error_message = Column(Text, nullable=True)
     
     # Metadata (JSON)
-    meta_json = Column(Text, nullable=True)  # Additional stats/info
+    meta_json = Column(JSONText, nullable=True)  # Additional stats/info
     
     def to_dict(self):
         """Convert to dictionary for JSON response"""
@@ -297,9 +379,9 @@ class MonitorJob(Base):
             'status': self.status,
             'progress': self.progress,
             'progress_message': self.progress_message,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'started_at': self.started_at.isoformat() if self.started_at else None,
-            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'created_at': _isoformat(self.created_at) if self.created_at else None,
+            'started_at': _isoformat(self.started_at) if self.started_at else None,
+            'finished_at': _isoformat(self.finished_at) if self.finished_at else None,
             'total_fetched': self.total_fetched,
             'total_matched': self.total_matched,
             'total_saved': self.total_saved,
@@ -340,7 +422,12 @@ if 'postgresql' in DATABASE_URL:
         "pool_timeout": 30,     # Wait max 30s for a connection
     })
 
-engine = create_engine(DATABASE_URL, connect_args=_connect_args, **_pool_kwargs)
+# JSONText columns on PostgreSQL: keep Arabic readable instead of \uXXXX escapes
+_json_kwargs = {}
+if 'postgresql' in DATABASE_URL:
+    _json_kwargs["json_serializer"] = lambda obj: json.dumps(obj, ensure_ascii=False)
+
+engine = create_engine(DATABASE_URL, connect_args=_connect_args, **_pool_kwargs, **_json_kwargs)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
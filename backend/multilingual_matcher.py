@@ -14,6 +14,7 @@ No early exits that skip keywords.
 import re
 import json
 import logging
+from dataclasses import dataclass
 from typing import List, Dict, Tuple, Optional
 from langdetect import detect, LangDetectException
 
@@ -135,6 +136,76 @@ def get_all_keyword_variants(keyword_expansion: dict, prefer_proper_nouns: bool
     return unique_variants
 
 
+@dataclass(frozen=True, slots=True)
+class CompiledVariant:
+    """One keyword variant with its search pattern built up front."""
+    text: str
+    lang: str
+    pattern: re.Pattern
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledKeyword:
+    """Article-independent matching data for one keyword expansion."""
+    keyword_ar: str
+    variants: Tuple[CompiledVariant, ...]
+
+
+def build_variant_pattern(variant: str, variant_lang: str) -> Optional[re.Pattern]:
+    """
+    Normalize a variant and pick its matching strategy.
+    
+    - Arabic: Arabic-aware pattern with clitics
+    - Latin scripts: word boundary matching
+    - CJK / other scripts: substring matching
+    
+    Returns:
+        Compiled pattern, or None if the variant normalizes to nothing
+    """
+    if not variant:
+        return None
+    
+    # Normalize the variant using same pipeline as article text
+    variant_normalized = normalize_keyword_variant(variant, variant_lang)
+    
+    if not variant_normalized:
+        return None
+    
+    if variant_lang == 'ar' or is_arabic_text(variant):
+        return build_arabic_pattern(variant_normalized)
+    if is_latin_script(variant):
+        # Example: "France" won't match inside "Francesco"
+        return build_word_boundary_pattern(variant_normalized)
+    return build_substring_pattern(variant_normalized)
+
+
+def compile_keyword_expansions(keyword_expansions: List[dict]) -> List[CompiledKeyword]:
+    """
+    Build variants and patterns for every keyword once per matching run.
+    
+    They only depend on the keyword, so matching N articles no longer
+    rebuilds (and re-normalizes) them N times.
+    
+    Args:
+        keyword_expansions: List of expansion dicts
+        
+    Returns:
+        List of CompiledKeyword, same order as keyword_expansions
+    """
+    compiled = []
+    for expansion in keyword_expansions:
+        keyword_ar = expansion.get('original_ar', 'Unknown')
+        variants = []
+        for variant, variant_lang in get_all_keyword_variants(expansion):
+            pattern = build_variant_pattern(variant, variant_lang)
+            if pattern is not None:
+                variants.append(CompiledVariant(variant, variant_lang, pattern))
+        if not variants:
+            logger.debug(f"No variants for keyword: {keyword_ar}")
+        compiled.append(CompiledKeyword(keyword_ar, tuple(variants)))
+    return compiled
+
+
 def match_variant_in_text(
     variant: str,
     variant_lang: str,
@@ -158,40 +229,16 @@ def match_variant_in_text(
     Returns:
         Tuple of (matched_text, position) if found, None otherwise
     """
-    if not variant or not article_text_normalized:
+    if not article_text_normalized:
         return None
     
-    # Normalize the variant using same pipeline as article text
-    variant_normalized = normalize_keyword_variant(variant, variant_lang)
-    
-    if not variant_normalized:
+    pattern = build_variant_pattern(variant, variant_lang)
+    if pattern is None:
         return None
     
-    # Strategy 1: Arabic matching (Arabic-aware pattern)
-    if variant_lang == 'ar' or is_arabic_text(variant):
-        # Use Arabic-aware pattern that handles clitics and definite articles
-        pattern = build_arabic_pattern(variant_normalized)
-        if pattern:
-            match = pattern.search(article_text_normalized)
-            if match:
-                return (match.group(), match.start())
-    
-    # Strategy 2: Latin script matching (word boundaries)
-    elif is_latin_script(variant):
-        # Use word boundary pattern to avoid partial matches
-        # Example: "France" won't match inside "Francesco"
-        pattern = build_word_boundary_pattern(variant_normalized)
-        match = pattern.search(article_text_normalized)
-        if match:
-            return (match.group(), match.start())
-    
-    # Strategy 3: CJK or other scripts (substring matching)
-    else:
-        # For CJK and other scripts without word boundaries
-        pattern = build_substring_pattern(variant_normalized)
-        match = pattern.search(article_text_normalized)
-        if match:
-            return (match.group(), match.start())
+    match = pattern.search(article_text_normalized)
+    if match:
+        return (match.group(), match.start())
     
     return None
 
@@ -199,7 +246,8 @@ def match_variant_in_text(
 def match_article_against_keywords(
     article: dict,
     keyword_expansions: List[dict],
-    source_name: str = ""
+    source_name: str = "",
+    compiled_keywords: Optional[List[CompiledKeyword]] = None
 ) -> List[dict]:
     """
     Match an article against ALL expanded keywords using STRICT lexical matching.
@@ -214,6 +262,8 @@ def match_article_against_keywords(
         article: Article dict with 'title', 'summary'/'description', 'content'
         keyword_expansions: List of expansion dicts
         source_name: Source name for logging
+        compiled_keywords: compile_keyword_expansions(keyword_expansions), when
+            matching many articles against the same keywords
         
     Returns:
         List of matched keywords with details:
@@ -247,38 +297,27 @@ def match_article_against_keywords(
         logger.debug("Article text is empty after normalization")
         return []
     
+    if compiled_keywords is None:
+        compiled_keywords = compile_keyword_expansions(keyword_expansions)
+    
     # Test ALL keywords (CRITICAL: no early exit)
     matches = []
     
-    for expansion in keyword_expansions:
-        keyword_ar = expansion.get('original_ar', 'Unknown')
-        
-        # Get ALL variants for this keyword
-        variants = get_all_keyword_variants(expansion)
-        
-        if not variants:
-            logger.debug(f"No variants for keyword: {keyword_ar}")
-            continue
+    for compiled in compiled_keywords:
+        keyword_ar = compiled.keyword_ar
         
         # Test each variant
         matched_variants = []
-        matched_positions = []
         
-        for variant, variant_lang in variants:
-            match_result = match_variant_in_text(
-                variant,
-                variant_lang,
-                article_text_normalized,
-                detected_lang
-            )
+        for variant in compiled.variants:
+            match = variant.pattern.search(article_text_normalized)
             
-            if match_result:
-                matched_text, position = match_result
+            if match:
                 matched_variants.append({
-                    'text': variant,
-                    'lang': variant_lang,
-                    'matched_at': position,
-                    'matched_form': matched_text
+                    'text': variant.text,
+                    'lang': variant.lang,
+                    'matched_at': match.start(),
+                    'matched_form': match.group()
                 })
         
         # If any variant matched, record this keyword as a match
@@ -358,6 +397,9 @@ def match_articles_with_keywords_with_stats(
         
         articles = limited_articles
     
+    # Variants/patterns depend only on the keywords - build them once
+    compiled_keywords = compile_keyword_expansions(keyword_expansions)
+    
     # Match each article against ALL keywords
     for article in articles:
         source_name = article.get('source_name', 'Unknown')
@@ -372,7 +414,8 @@ def match_articles_with_keywords_with_stats(
         matched_keywords = match_article_against_keywords(
             article,
             keyword_expansions,
-            source_name
+            source_name,
+            compiled_keywords=compiled_keywords
         )
         
         # If any keywords matched, add to results
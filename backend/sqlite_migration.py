@@ -0,0 +1,33 @@
+"""
+sqlite3 connection helper for the raw-SQL migration scripts
+
+Kept out of models.py so a migration doesn't build the app's SQLAlchemy
+engine just to open its own connection.
+
+Only per-connection PRAGMAs are set here. journal_mode is stored in the
+database file, so it is left to the app's engine.
+"""
+import sqlite3
+
+# Per-connection bulk-work settings; none of these persist in the file
+_SQLITE_MIGRATION_PRAGMAS = """
+    PRAGMA busy_timeout=5000;
+    PRAGMA foreign_keys=OFF;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA mmap_size=268435456;
+    PRAGMA cache_size=-200000;
+    PRAGMA temp_store=MEMORY;
+"""
+
+
+def get_sqlite_conn(path='ain_news.db'):
+    """Open a tuned sqlite3 connection for migration scripts.
+    
+    Autocommit mode (isolation_level=None), so callers issue their own
+    BEGIN IMMEDIATE/COMMIT. Waits up to 5s for a lock held by the running
+    app and keeps foreign key checks off (as SQLite requires for table
+    rebuilds), with 256MB memory-mapped I/O and a ~200MB page cache.
+    """
+    conn = sqlite3.connect(path, isolation_level=None)
+    conn.executescript(_SQLITE_MIGRATION_PRAGMAS)
+    return conn
@@ -0,0 +1,60 @@
+"""
+Tests for the keyword expansion cache TTL
+
+These tests verify:
+- Reading a cached expansion never extends its expiry
+- Expired entries are dropped instead of served
+
+Run with: pytest tests/test_keyword_expansion.py -v
+"""
+import pytest
+import sys
+import os
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("deep_translator")
+
+import keyword_expansion as ke
+
+
+@pytest.fixture(autouse=True)
+def clean_cache():
+    """Start every test with an empty expansion cache"""
+    ke._invalidate_expansions()
+    yield
+    ke._invalidate_expansions()
+
+
+class TestExpansionCacheTTL:
+    """Cache hits must not move the TTL"""
+
+    def test_reads_do_not_extend_expiry(self):
+        """expires_at is fixed when the entry is built, however often it is read"""
+        updated_at = datetime.utcnow() - timedelta(days=1)
+        key = (1, 'النفط', updated_at)
+
+        first = ke._cached_expansion(1, 'النفط', '{"en": "oil"}', updated_at)
+        assert first['translations'] == {'en': 'oil'}
+        expires_at = ke._EXPANSION_CACHE[key][0]
+        assert expires_at == ke._expires_at_epoch(updated_at)
+
+        for _ in range(100):
+            assert ke._cached_expansion(1, 'النفط', '{"en": "oil"}', updated_at) is first
+
+        assert ke._EXPANSION_CACHE[key][0] == expires_at
+
+    def test_expired_entry_is_not_served(self, monkeypatch):
+        """Once past expires_at the entry is dropped and the row rebuilt (and rejected)"""
+        updated_at = datetime.utcnow() - timedelta(days=1)
+        key = (2, 'غزة', updated_at)
+
+        assert ke._cached_expansion(2, 'غزة', '{"en": "Gaza"}', updated_at) is not None
+        expires_at = ke._EXPANSION_CACHE[key][0]
+
+        monkeypatch.setattr(ke.time, 'time', lambda: expires_at + 1)
+        monkeypatch.setattr(ke, 'EXPANSION_TTL_DAYS', 0)
+
+        assert ke._cached_expansion(2, 'غزة', '{"en": "Gaza"}', updated_at) is None
+        assert key not in ke._EXPANSION_CACHE
@@ -283,6 +283,40 @@ class TestScopingHelper:
         assert len(results) == 1
         assert results[0].text_ar == "كلمة أ"
 
+    def test_automatic_user_scoping(self, db, user_a, user_b):
+        """enable_automatic_user_scoping should scope SELECTs inside a request"""
+        from flask import Flask
+        from flask_login import LoginManager, login_user
+        from sqlalchemy import event
+        import db_scoping
+
+        db.add_all([
+            Keyword(user_id=user_a.id, text_ar="كلمة أ", enabled=True),
+            Keyword(user_id=user_b.id, text_ar="كلمة ب", enabled=True),
+        ])
+        db.commit()
+
+        app = Flask(__name__)
+        app.secret_key = "test"
+        login_manager = LoginManager(app)
+        login_manager.user_loader(lambda uid: db.get(User, int(uid)))
+
+        db_scoping.enable_automatic_user_scoping(TestSession)
+        try:
+            # Outside a request nothing is filtered
+            assert db.query(Keyword).count() == 2
+
+            with app.test_request_context():
+                login_user(user_a)
+                results = db.query(Keyword).all()
+                assert [k.text_ar for k in results] == ["كلمة أ"]
+
+                # Explicit opt-out (e.g. admin listings)
+                unscoped = db.query(Keyword).execution_options(skip_user_scope=True).all()
+                assert len(unscoped) == 2
+        finally:
+            event.remove(TestSession, 'do_orm_execute', db_scoping._apply_user_scope)
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -85,6 +85,62 @@ def translate_to_arabic(text, source_lang='auto'):
         }
 
 
+# Max characters per joined Google Translate request (API limit is 5000)
+BATCH_MAX_CHARS = 4500
+
+
+def translate_many_to_arabic(texts, source_lang='auto'):
+    """
+    Translate several short texts to Arabic with as few requests as possible.
+    
+    Unique texts are joined with newlines into requests of up to
+    BATCH_MAX_CHARS and split back afterwards. If a response doesn't split
+    into the expected number of lines, that chunk falls back to one
+    request per text.
+    
+    Args:
+        texts: List of texts to translate
+        source_lang: Source language code (default: auto-detect)
+        
+    Returns:
+        list: Translated texts, same order/length as input (original text on failure)
+    """
+    translated = {}
+    pending = []
+    for text in dict.fromkeys(texts):
+        if not text or not text.strip() or is_arabic_text(text):
+            translated[text] = text
+        elif '\n' in text or len(text) > BATCH_MAX_CHARS:
+            translated[text] = translate_to_arabic(text, source_lang)['translated']
+        else:
+            pending.append(text)
+    
+    # Pack pending texts into newline-joined chunks
+    chunks, chunk, size = [], [], 0
+    for text in pending:
+        if chunk and size + len(text) + 1 > BATCH_MAX_CHARS:
+            chunks.append(chunk)
+            chunk, size = [], 0
+        chunk.append(text)
+        size += len(text) + 1
+    if chunk:
+        chunks.append(chunk)
+    
+    for chunk in chunks:
+        lines = None
+        if len(chunk) > 1:
+            result = translate_to_arabic('\n'.join(chunk), source_lang)
+            if result['translation_status'] == 'success':
+                lines = result['translated'].split('\n')
+        if lines is not None and len(lines) == len(chunk):
+            translated.update(zip(chunk, (line.strip() for line in lines)))
+        else:
+            for text in chunk:
+                translated[text] = translate_to_arabic(text, source_lang)['translated']
+    
+    return [translated[text] for text in texts]
+
+
 # Backward compatibility alias
 def translate_to_arabic_cached(text, source_lang='auto'):
     """Alias for backward compatibility - now just calls translate_to_arabic"""
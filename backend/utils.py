@@ -5,16 +5,23 @@ import re
 from datetime import datetime
 from bs4 import BeautifulSoup
 
+_TAG_RE = re.compile(r'<[^>]+>')
+_ENTITY_RE = re.compile(r'&nbsp;|&amp;|&lt;|&gt;|&quot;|&#\d+;')
+
+
 def strip_html_tags(text):
     """Simple regex-based HTML tag stripper - removes ALL HTML tags.
     Use as a fast safety net after clean_html_content or on any text
     that might still contain stray HTML."""
     if not text:
         return ""
-    text = re.sub(r'<[^>]+>', ' ', str(text))
-    text = re.sub(r'&nbsp;|&amp;|&lt;|&gt;|&quot;|&#\d+;', ' ', text)
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
+    text = str(text)
+    # Plain text (the common case after translation) only needs whitespace collapsed
+    if '<' in text:
+        text = _TAG_RE.sub(' ', text)
+    if '&' in text:
+        text = _ENTITY_RE.sub(' ', text)
+    return ' '.join(text.split())
 
 
 def clean_html_content(html_text):